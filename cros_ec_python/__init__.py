@@ -4,7 +4,10 @@
 
 from .cros_ec import get_cros_ec, DeviceTypes
 from .baseclass import CrosEcClass
-from .commands import memmap, general, features, pwm, leds, thermal, framework_laptop
+from .commands import (
+    memmap, general, features, pwm, leds, thermal, framework_laptop, events, mkbp, flash, system, console, motion_sense,
+    battery, usb
+)
 from .exceptions import ECError
 from .devices.lpc import CrosEcLpc
 match __import__("os").name:
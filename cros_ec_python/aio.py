@@ -0,0 +1,232 @@
+"""
+An asyncio front-end for any `cros_ec_python.baseclass.CrosEcClass` object.
+
+Every device class is blocking, and some commands (especially over LPC) can take a while,
+which would stall every other coroutine if called from the event loop.
+`AsyncCrosEc` runs them on a dedicated single thread per device instead,
+so requests still reach the EC one at a time and in the order they were made.
+
+## Example
+
+```python
+import asyncio
+from cros_ec_python import get_cros_ec
+from cros_ec_python.aio import AsyncCrosEc
+
+async def main():
+    async with AsyncCrosEc(get_cros_ec(), timeout=1) as ec:
+        # Raw commands and memmap reads
+        print(await ec.command(0, 0x0001, 4, 4, b"\\xa0\\xb0\\xc0\\xd0"))
+        print(await ec.memmap(0x20, 2))
+
+        # Any function from `cros_ec_python.commands` can be awaited
+        print(await ec.general.hello(42))
+        print(await ec.memmap_cmds.get_temps())
+
+        # Or call any function that takes the EC as its first argument
+        print(await ec.call(my_function, "arg"))
+
+asyncio.run(main())
+```
+"""
+
+import asyncio
+import functools
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+
+__all__ = ["AsyncCrosEc"]
+
+_DEFAULT = object()
+
+
+class _AsyncModule:
+    """
+    Wraps a `cros_ec_python.commands` module, so each function returns an awaitable.
+    """
+
+    def __init__(self, aec: "AsyncCrosEc", module):
+        self._aec = aec
+        self._module = module
+
+    def __getattr__(self, name: str) -> Callable:
+        func = getattr(self._module, name)
+        if not callable(func):
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self._aec.call(func, *args, **kwargs)
+
+        return wrapper
+
+
+class AsyncCrosEc:
+    """
+    Awaitable wrapper around a CrosEc object. Blocking calls are run on a single worker thread per device.
+
+    Command modules are available as attributes, e.g. `await aec.pwm.pwm_get_fan_rpm()`.
+    As `memmap` is taken by the raw memmap method, the `cros_ec_python.commands.memmap` module is available as `memmap_cmds`.
+    """
+
+    def __init__(self, ec: CrosEcClass, timeout: float | None = None):
+        """
+        Create the async wrapper.
+        :param ec: The CrOS_EC object to wrap.
+        :param timeout: Default timeout in seconds for each request, including the time spent queued. None to wait forever.
+        """
+        self.ec: CrosEcClass = ec
+        """The wrapped CrOS_EC object."""
+
+        self.timeout: float | None = timeout
+        """Default timeout in seconds for each request."""
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=type(ec).__name__)
+        self._modules: dict[str, _AsyncModule] = {}
+
+    def __getattr__(self, name: str) -> _AsyncModule:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self._modules:
+            module_name = "memmap" if name == "memmap_cmds" else name
+            try:
+                module = importlib.import_module(f"{__package__}.commands.{module_name}")
+            except ModuleNotFoundError:
+                raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
+            self._modules[name] = _AsyncModule(self, module)
+        return self._modules[name]
+
+    async def run(self, func: Callable, *args, timeout: float | None = _DEFAULT, **kwargs) -> Any:
+        """
+        Run any blocking function on the device's worker thread.
+
+        If the timeout expires or the task is cancelled before the request has started, it is removed from the queue.
+        A request that has already started will still run to completion on the worker thread.
+        :param func: The function to run.
+        :param args: Positional arguments for the function.
+        :param timeout: Timeout in seconds, overrides the default `timeout`.
+        :param kwargs: Keyword arguments for the function.
+        :return: The return value of the function.
+        """
+        if timeout is _DEFAULT:
+            timeout = self.timeout
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    async def call(self, func: Callable, *args, timeout: float | None = _DEFAULT, **kwargs) -> Any:
+        """
+        Run a command function that takes the EC as its first argument, such as those in `cros_ec_python.commands`.
+        :param func: The function to run, called as `func(ec, *args, **kwargs)`.
+        :param args: Positional arguments for the function, after the EC.
+        :param timeout: Timeout in seconds, overrides the default `timeout`.
+        :param kwargs: Keyword arguments for the function.
+        :return: The return value of the function.
+        """
+        return await self.run(func, self.ec, *args, timeout=timeout, **kwargs)
+
+    async def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+        timeout: float | None = _DEFAULT,
+    ) -> bytes:
+        """
+        Send a command to the EC and return the response.
+        :param version: Command version number (often 0).
+        :param command: Command to send (EC_CMD_...).
+        :param outsize: Outgoing length in bytes.
+        :param insize: Max number of bytes to accept from the EC.
+        :param data: Outgoing data to EC.
+        :param warn: Whether to warn if the response size is not as expected. Default is True.
+        :param timeout: Timeout in seconds, overrides the default `timeout`.
+        :return: Response from the EC.
+        """
+        return await self.run(self.ec.command, version, command, outsize, insize, data, warn, timeout=timeout)
+
+    async def memmap(self, offset: Int32, num_bytes: Int32, timeout: float | None = _DEFAULT) -> bytes:
+        """
+        Read memory from the EC.
+        :param offset: Offset to read from.
+        :param num_bytes: Number of bytes to read.
+        :param timeout: Timeout in seconds, overrides the default `timeout`.
+        :return: Bytes read from the EC.
+        """
+        return await self.run(self.ec.memmap, offset, num_bytes, timeout=timeout)
+
+    async def mkbp_events(self, interval: float = 0.02, ack: bool = False) -> AsyncIterator[dict]:
+        """
+        Yield MKBP events as they arrive.
+
+        If the device can deliver events itself (`cros_ec_python.devices.dev.CrosEcDev` opened with `events=True`,
+        with an event mask set with `CrosEcDev.event_mask`), its file descriptor is watched with `loop.add_reader`,
+        so nothing runs until the kernel has an event.
+        Otherwise the EC is polled on the worker thread with `cros_ec_python.watch.MkbpEventPump`.
+        :param interval: Time between polls in seconds, when polling is needed.
+        :param ack: Acknowledge `EC_HOST_EVENT_MKBP` after draining when polling, see `MkbpEventPump`.
+        :return: An async iterator of events parsed with `cros_ec_python.commands.mkbp.parse_event`.
+        """
+        if getattr(self.ec, "events_enabled", False):
+            loop = asyncio.get_running_loop()
+            event_queue: asyncio.Queue = asyncio.Queue()
+            fd = self.ec.fileno()
+
+            def on_readable():
+                try:
+                    event = self.ec.read_event(timeout=0)
+                except Exception as e:
+                    # Stop watching, otherwise a broken fd stays readable and this is called in a busy loop
+                    loop.remove_reader(fd)
+                    event_queue.put_nowait(e)
+                    return
+                if event is not None:
+                    event_queue.put_nowait(event)
+
+            loop.add_reader(fd, on_readable)
+            try:
+                while True:
+                    event = await event_queue.get()
+                    if isinstance(event, Exception):
+                        raise event
+                    yield event
+            finally:
+                loop.remove_reader(fd)
+        else:
+            from .watch import MkbpEventPump
+
+            pump = MkbpEventPump(self.ec, interval, ack=ack)
+            while True:
+                for event in await self.run(pump.poll, timeout=None):
+                    yield event
+                await asyncio.sleep(interval)
+
+    def cancel_pending(self) -> None:
+        """
+        Cancel every request that is still waiting in the queue, and stop accepting new ones.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def close(self) -> None:
+        """
+        Wait for the running request to finish, and shut down the worker thread.
+        Queued requests still run, use `cancel_pending` to drop them instead.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -7,6 +7,7 @@ See `cros_ec_python.devices` for a few examples of a class that inherits from th
 """
 
 import abc
+import threading
 
 from .constants.COMMON import *
 
@@ -16,6 +17,18 @@ class CrosEcClass(metaclass=abc.ABCMeta):
     Base class for CrOS EC devices to inherit from.
     """
 
+    max_payload_size: int | None = None
+    """
+    The largest command payload the interface itself can carry, in either direction. None if only the EC limits it.
+    See `cros_ec_python.capabilities.EcCapabilities.max_response_size` for the limit to use.
+    """
+
+    waits_in_progress: bool = False
+    """
+    True if the interface itself waits for commands that return EC_RES_IN_PROGRESS and fetches their result,
+    so EC_RES_IN_PROGRESS only reaches the caller once it has given up.
+    """
+
     @staticmethod
     @abc.abstractmethod
     def detect() -> bool:
@@ -69,3 +82,35 @@ class CrosEcClass(metaclass=abc.ABCMeta):
         :return: Bytes read from the EC.
         """
         pass
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        A re-entrant lock for this device. Hold it to stop other threads sending requests in between yours.
+        Devices take it around each request where a request isn't atomic, e.g. the separate port writes on LPC.
+        """
+        if "_lock" not in self.__dict__:
+            self.__dict__.setdefault("_lock", threading.RLock())
+        return self.__dict__["_lock"]
+
+    @property
+    def capabilities(self):
+        """
+        The `cros_ec_python.capabilities.EcCapabilities` of this device, read lazily and cached.
+        """
+        if "_capabilities" not in self.__dict__:
+            from .capabilities import EcCapabilities
+
+            self.__dict__.setdefault("_capabilities", EcCapabilities(self))
+        return self.__dict__["_capabilities"]
+
+    def batch(self, stop_on_error: bool = False):
+        """
+        Queue several requests and run them back-to-back under one acquisition of `lock`.
+        See `cros_ec_python.batch` for an example.
+        :param stop_on_error: Stop at the first request that raises an exception, and raise it.
+        :return: A `cros_ec_python.batch.Batch`, use it as a context manager to run it on exit.
+        """
+        from .batch import Batch
+
+        return Batch(self, stop_on_error)
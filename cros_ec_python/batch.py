@@ -0,0 +1,154 @@
+"""
+Run several EC requests back-to-back as one batch.
+
+Every request made through a batch runs while holding the device lock (`CrosEcClass.lock`),
+so other threads can't interleave their own requests, and the lock is only taken once for the whole batch.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, general, memmap
+
+ec = get_cros_ec()
+
+with ec.batch() as b:
+    version = b.call(general.get_version)
+    temps = b.call(memmap.get_temps)
+    raw = b.command(0, general.EC_CMD_HELLO, 4, 4, b"\\xa0\\xb0\\xc0\\xd0")
+    switches = b.memmap(0x30, 1)
+
+# The batch runs when the with block exits
+print(version.result(), temps.result(), raw.result(), switches.result())
+print(b.results)
+```
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+
+__all__ = ["Batch"]
+
+
+class Batch:
+    """
+    A queue of requests to run together, usually created with `CrosEcClass.batch`.
+
+    Each queued request returns a `concurrent.futures.Future`, which is resolved once the batch has run.
+    """
+
+    def __init__(self, ec: CrosEcClass, stop_on_error: bool = False):
+        """
+        Create an empty batch.
+        :param ec: The CrOS_EC object to run the requests on.
+        :param stop_on_error: Stop at the first request that raises an exception, and raise it from `run`.
+        Remaining requests are cancelled.
+        """
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object to run the requests on."""
+
+        self.stop_on_error: bool = stop_on_error
+        """Stop at the first request that raises an exception."""
+
+        self.results: list[Any] = []
+        """
+        The result of each request from the last `run`, in the order they were queued.
+        Requests that raised hold the exception instead, and cancelled requests hold None.
+        """
+
+        self._queue: list[tuple[Future, Callable, tuple, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def call(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a function that takes the EC as its first argument, such as those in `cros_ec_python.commands`.
+        :param func: The function to run, called as `func(ec, *args, **kwargs)`.
+        :param args: Positional arguments for the function, after the EC.
+        :param kwargs: Keyword arguments for the function.
+        :return: A future for the return value of the function.
+        """
+        future = Future()
+        self._queue.append((future, func, (self.ec, *args), kwargs))
+        return future
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> Future:
+        """
+        Queue a command, see `CrosEcClass.command`.
+        :param version: Command version number (often 0).
+        :param command: Command to send (EC_CMD_...).
+        :param outsize: Outgoing length in bytes.
+        :param insize: Max number of bytes to accept from the EC.
+        :param data: Outgoing data to EC.
+        :param warn: Whether to warn if the response size is not as expected. Default is True.
+        :return: A future for the response from the EC.
+        """
+        future = Future()
+        self._queue.append((future, self.ec.command, (version, command, outsize, insize, data, warn), {}))
+        return future
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> Future:
+        """
+        Queue a memmap read, see `CrosEcClass.memmap`.
+        :param offset: Offset to read from.
+        :param num_bytes: Number of bytes to read.
+        :return: A future for the bytes read from the EC.
+        """
+        future = Future()
+        self._queue.append((future, self.ec.memmap, (offset, num_bytes), {}))
+        return future
+
+    def run(self) -> list[Any]:
+        """
+        Run every queued request in order while holding the device lock, then empty the queue.
+        :return: The results, see `results`.
+        """
+        queue, self._queue = self._queue, []
+        self.results = []
+        error = None
+        with self.ec.lock:
+            for future, func, args, kwargs in queue:
+                if error is not None:
+                    future.cancel()
+                    self.results.append(None)
+                    continue
+                if not future.set_running_or_notify_cancel():
+                    self.results.append(None)
+                    continue
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    future.set_exception(e)
+                    self.results.append(e)
+                    if self.stop_on_error:
+                        error = e
+                else:
+                    future.set_result(result)
+                    self.results.append(result)
+
+        if error is not None:
+            raise error
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.run()
+        else:
+            # Don't run anything if the with block failed
+            for future, *_ in self._queue:
+                future.cancel()
+            self._queue = []
@@ -0,0 +1,166 @@
+"""
+A per-device cache of what the EC supports.
+
+Feature flags and supported command versions don't change while the EC is running,
+so there is no need to ask for them more than once. Every device has one `EcCapabilities`,
+available as `cros_ec_python.baseclass.CrosEcClass.capabilities`.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, pwm
+from cros_ec_python.commands.features import EcFeatureCode
+
+ec = get_cros_ec()
+
+if ec.capabilities.has_feature(EcFeatureCode.EC_FEATURE_PWM_FAN):
+    print("Fan control supported")
+
+# Highest supported version of a command, None if it isn't supported at all
+print(ec.capabilities.max_version(pwm.EC_CMD_PWM_SET_FAN_DUTY))
+
+# Largest response payload the EC can send in one command
+print(ec.capabilities.max_response_size)
+```
+"""
+
+import threading
+from typing import Final
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+from .commands import features, general
+from .commands.features import EcFeatureCode
+from .exceptions import ECError
+
+__all__ = ["EcCapabilities"]
+
+# sizeof(struct ec_host_request) and sizeof(struct ec_host_response)
+EC_HOST_REQUEST_HEADER_SIZE: Final = 8
+EC_HOST_RESPONSE_HEADER_SIZE: Final = 8
+
+# Payload size used when the EC can't report its limits, the largest that works everywhere
+EC_DEFAULT_PAYLOAD_SIZE: Final = 0xEC
+
+
+class EcCapabilities:
+    """
+    Lazily read and cached EC capabilities. Call `refresh` if the EC has been reset or has jumped to another image.
+    """
+
+    def __init__(self, ec: CrosEcClass):
+        """
+        Create an empty cache, nothing is read until it is needed.
+        :param ec: The CrOS_EC object.
+        """
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self._features: UInt64 | None = None
+        self._protocol_info: dict[str, int] | None = None
+        self._cmd_versions: dict[int, UInt32 | None] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """
+        Drop everything cached, so it is read again from the EC.
+        """
+        with self._lock:
+            self._features = None
+            self._protocol_info = None
+            self._cmd_versions.clear()
+
+    @property
+    def features(self) -> UInt64:
+        """
+        The feature bitmask from `cros_ec_python.commands.features.get_features`, 0 if the EC doesn't support it.
+        """
+        with self._lock:
+            if self._features is None:
+                try:
+                    self._features = features.get_features(self.ec)
+                except ECError as e:
+                    if e.status != EcStatus.EC_RES_INVALID_COMMAND.value:
+                        raise e
+                    self._features = 0
+            return self._features
+
+    @property
+    def protocol_info(self) -> dict[str, int]:
+        """
+        The protocol info from `cros_ec_python.commands.general.get_protocol_info`, empty if the EC doesn't support it.
+        """
+        with self._lock:
+            if self._protocol_info is None:
+                try:
+                    self._protocol_info = general.get_protocol_info(self.ec)
+                except ECError as e:
+                    if e.status != EcStatus.EC_RES_INVALID_COMMAND.value:
+                        raise e
+                    self._protocol_info = {}
+            return self._protocol_info
+
+    @property
+    def max_request_size(self) -> int:
+        """
+        The largest request payload the EC accepts in one command, not including the protocol header.
+        Also limited by the interface, see `cros_ec_python.baseclass.CrosEcClass.max_payload_size`.
+        """
+        packet = self.protocol_info.get("max_request_packet_size")
+        return self._limit(packet - EC_HOST_REQUEST_HEADER_SIZE if packet else EC_DEFAULT_PAYLOAD_SIZE)
+
+    @property
+    def max_response_size(self) -> int:
+        """
+        The largest response payload the EC sends in one command, not including the protocol header.
+        Also limited by the interface, see `cros_ec_python.baseclass.CrosEcClass.max_payload_size`.
+        """
+        packet = self.protocol_info.get("max_response_packet_size")
+        return self._limit(packet - EC_HOST_RESPONSE_HEADER_SIZE if packet else EC_DEFAULT_PAYLOAD_SIZE)
+
+    def _limit(self, size: int) -> int:
+        # The interface can have a smaller buffer than the EC
+        transport = self.ec.max_payload_size
+        return size if transport is None else min(size, transport)
+
+    def has_feature(self, feature: EcFeatureCode) -> bool:
+        """
+        Check if the EC supports a feature.
+        :param feature: The feature to check.
+        :return: True if the feature is supported.
+        """
+        return bool(self.features & BIT(feature.value))
+
+    def cmd_versions(self, cmd: UInt16) -> UInt32 | None:
+        """
+        Get the supported versions of a command, see `cros_ec_python.commands.general.get_cmd_versions`.
+        :param cmd: The command (EC_CMD_...).
+        :return: The supported versions as a bitmask, None if the command is not supported.
+        """
+        with self._lock:
+            if cmd not in self._cmd_versions:
+                self._cmd_versions[cmd] = general.get_cmd_versions(self.ec, cmd)
+            return self._cmd_versions[cmd]
+
+    def supports(self, cmd: UInt16, version: int = 0) -> bool:
+        """
+        Check if the EC supports a command version.
+        :param cmd: The command (EC_CMD_...).
+        :param version: The command version.
+        :return: True if the command version is supported.
+        """
+        versions = self.cmd_versions(cmd)
+        return versions is not None and bool(versions & BIT(version))
+
+    def max_version(self, cmd: UInt16, limit: int = 31) -> int | None:
+        """
+        Get the highest supported version of a command.
+        :param cmd: The command (EC_CMD_...).
+        :param limit: The highest version the caller understands.
+        :return: The highest supported version up to `limit`, None if no version is supported.
+        """
+        versions = self.cmd_versions(cmd)
+        if not versions:
+            return None
+        supported = [v for v in range(limit + 1) if versions & BIT(v)]
+        return max(supported) if supported else None
@@ -0,0 +1,330 @@
+"""
+A charge policy engine for Framework laptops.
+
+Policies are an ordered list of `ChargeRule`s, each with a `ChargeTarget` and a `Condition` built from the battery state,
+like "hold at 60% while on AC" or "charge to 100% on weekday mornings". The first matching rule wins.
+
+Battery state comes from the shared `cros_ec_python.watch.EcWatch`, so the engine doesn't make any reads of its own
+after the first snapshot, and the EC is only written to when the chosen target actually changes.
+
+## Example
+
+```python
+from datetime import time
+from cros_ec_python import get_cros_ec
+from cros_ec_python.charge_policy import ChargePolicy, ChargeRule, ChargeTarget, on_ac, schedule
+
+ec = get_cros_ec()
+
+policy = ChargePolicy(ec, [
+    # Top up before the commute
+    ChargeRule(ChargeTarget(100), when=schedule(time(6), time(8), weekdays={0, 1, 2, 3, 4}), name="morning"),
+    # Docked all day, hold at 60%
+    ChargeRule(ChargeTarget(60), when=on_ac(), name="docked"),
+], default=ChargeTarget(80))
+
+with policy:
+    input("Press enter to stop...")
+```
+"""
+
+import datetime
+import threading
+import warnings
+from typing import Any, Callable, Final
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+from .commands import memmap, framework_laptop
+from .watch import _Poller, EcWatch, Subscription
+
+__all__ = [
+    "ChargePolicy", "ChargeRule", "ChargeTarget", "Condition",
+    "on_ac", "on_battery", "schedule", "charge_at_least", "charge_below", "cycle_count_at_least",
+]
+
+_WATCHED_FIELDS: Final = (
+    "ac_present", "charging", "discharging", "capacity", "last_full_charge_capacity", "cycle_count", "batt_present",
+)
+
+
+class Condition:
+    """
+    A test on the battery state, combine conditions with `&`, `|` and `~`.
+    """
+
+    def __init__(self, check: Callable[[dict[str, Any]], bool], description: str = "condition"):
+        """
+        Create a condition.
+        :param check: Called with the state from `ChargePolicy.state`, returns True if the condition matches.
+        :param description: A description for debugging.
+        """
+        self.check: Callable[[dict[str, Any]], bool] = check
+        self.description: str = description
+
+    def __call__(self, state: dict[str, Any]) -> bool:
+        return bool(self.check(state))
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return Condition(lambda state: self(state) and other(state), f"({self} & {other})")
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return Condition(lambda state: self(state) or other(state), f"({self} | {other})")
+
+    def __invert__(self) -> "Condition":
+        return Condition(lambda state: not self(state), f"~{self}")
+
+    def __repr__(self) -> str:
+        return self.description
+
+
+def on_ac() -> Condition:
+    """
+    Matches while AC power is connected.
+    """
+    return Condition(lambda state: state["ac_present"], "on_ac")
+
+
+def on_battery() -> Condition:
+    """
+    Matches while running from the battery.
+    """
+    return Condition(lambda state: not state["ac_present"], "on_battery")
+
+
+def charge_at_least(percent: int | float) -> Condition:
+    """
+    Matches while the battery is at or above a charge level.
+    :param percent: The charge level, as a percentage of the last full charge capacity.
+    """
+    return Condition(lambda state: state["percent"] >= percent, f"charge_at_least({percent})")
+
+
+def charge_below(percent: int | float) -> Condition:
+    """
+    Matches while the battery is below a charge level.
+    :param percent: The charge level, as a percentage of the last full charge capacity.
+    """
+    return Condition(lambda state: state["percent"] < percent, f"charge_below({percent})")
+
+
+def cycle_count_at_least(cycles: int) -> Condition:
+    """
+    Matches once the battery has been through a number of charge cycles.
+    :param cycles: The cycle count.
+    """
+    return Condition(lambda state: state["cycle_count"] >= cycles, f"cycle_count_at_least({cycles})")
+
+
+def schedule(start: datetime.time, end: datetime.time, weekdays: set[int] | None = None) -> Condition:
+    """
+    Matches between two times of day. If `end` is before `start`, the window runs past midnight.
+    :param start: The start of the window.
+    :param end: The end of the window.
+    :param weekdays: The days the window starts on, 0 is Monday. None for every day.
+    """
+
+    def check(state: dict[str, Any]) -> bool:
+        now: datetime.datetime = state["time"]
+        current = now.time()
+        if start <= end:
+            day = now.weekday()
+            inside = start <= current < end
+        else:
+            # Past midnight counts as the day the window started on
+            day = now.weekday() if current >= start else (now.weekday() - 1) % 7
+            inside = current >= start or current < end
+        return inside and (weekdays is None or day in weekdays)
+
+    return Condition(check, f"schedule({start}, {end})")
+
+
+class ChargeTarget:
+    """
+    The charge settings to apply while a rule matches.
+    """
+
+    def __init__(
+        self,
+        max: UInt8 = 100,
+        min: UInt8 = 0,
+        override: bool = False,
+        extender: dict[str, bool | int] | None = None,
+    ):
+        """
+        Create a charge target.
+        :param max: The charge limit in percent.
+        :param min: The minimum charge in percent, see `framework_laptop.set_charge_limit`.
+        :param override: Charge to full once when this target is first applied, see `framework_laptop.override_charge_limit`.
+        :param extender: Battery extender settings, as keyword arguments for `framework_laptop.set_battery_extender`.
+        None leaves the battery extender alone.
+        """
+        self.max: UInt8 = max
+        self.min: UInt8 = min
+        self.override: bool = override
+        self.extender: dict[str, bool | int] | None = extender
+
+    def __repr__(self) -> str:
+        return f"ChargeTarget(max={self.max}, min={self.min}, override={self.override}, extender={self.extender})"
+
+
+class ChargeRule:
+    """
+    A `ChargeTarget` and the `Condition` it applies under.
+    """
+
+    def __init__(self, target: ChargeTarget, when: Condition | None = None, name: str | None = None):
+        """
+        Create a rule.
+        :param target: The charge settings to apply.
+        :param when: The condition, None always matches.
+        :param name: A name for debugging.
+        """
+        self.target: ChargeTarget = target
+        self.when: Condition | None = when
+        self.name: str = name or repr(when)
+
+    def __repr__(self) -> str:
+        return f"ChargeRule({self.name})"
+
+
+class ChargePolicy(_Poller):
+    """
+    Applies the first matching `ChargeRule` whenever the battery state changes, and every `interval` for schedules.
+    """
+
+    def __init__(
+        self,
+        ec: CrosEcClass,
+        rules: list[ChargeRule],
+        default: ChargeTarget | None = None,
+        interval: float = 60,
+        watch: EcWatch | None = None,
+    ):
+        """
+        Create a charge policy, call `start` to begin applying it.
+        :param ec: The CrOS_EC object.
+        :param rules: The rules, in order of priority.
+        :param default: The target used when no rule matches. None leaves the settings alone.
+        :param interval: Seconds between re-evaluations, for time based conditions.
+        :param watch: The watcher to take battery state from. Default is `EcWatch.shared`.
+        """
+        super().__init__(interval)
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.rules: list[ChargeRule] = rules
+        """The rules, in order of priority."""
+
+        self.default: ChargeTarget | None = default
+        """The target used when no rule matches."""
+
+        self.watch: EcWatch = EcWatch.shared(ec) if watch is None else watch
+        """The watcher battery state is taken from."""
+
+        self.active: ChargeRule | ChargeTarget | None = None
+        """The rule (or default target) currently applied."""
+
+        self.writes: int = 0
+        """The number of writes made to the EC."""
+
+        self._battery: dict[str, Any] = {}
+        self._limit: tuple[int, int] | None = None
+        self._extender: dict[str, bool | int] | None = None
+        self._subs: list[Subscription] = []
+        self._lock = threading.RLock()
+
+    @property
+    def state(self) -> dict[str, Any]:
+        """
+        The state conditions are evaluated against. The battery values from `memmap.get_battery_values`,
+        `percent` (charge as a percentage of the last full charge capacity), and `time` (the current local time).
+        """
+        with self._lock:
+            state = dict(self._battery)
+        full = state.get("last_full_charge_capacity") or 0
+        state["percent"] = state.get("capacity", 0) * 100 / full if full else 0
+        state["time"] = datetime.datetime.now()
+        return state
+
+    def evaluate(self) -> ChargeRule | ChargeTarget | None:
+        """
+        Find the rule that should be applied now, without applying it.
+        :return: The first matching rule, or the default target if none match.
+        """
+        state = self.state
+        for rule in self.rules:
+            if rule.when is None or rule.when(state):
+                return rule
+        return self.default
+
+    def apply(self, target: ChargeTarget, transition: bool = True) -> None:
+        """
+        Apply a charge target, only writing settings that differ from what the EC has.
+        :param target: The target to apply.
+        :param transition: True if this is a new target, so a one-shot override is sent.
+        """
+        with self._lock:
+            if self._limit is None:
+                self._limit = tuple(framework_laptop.get_charge_limit(self.ec))
+
+            if self._limit != (target.max, target.min):
+                framework_laptop.set_charge_limit(self.ec, target.max, target.min)
+                self._limit = (target.max, target.min)
+                self.writes += 1
+
+            if target.extender is not None and target.extender != self._extender:
+                framework_laptop.set_battery_extender(self.ec, **target.extender)
+                self._extender = dict(target.extender)
+                self.writes += 1
+
+            if target.override and transition:
+                framework_laptop.override_charge_limit(self.ec)
+                self.writes += 1
+
+    def poll(self) -> None:
+        """
+        Evaluate the rules, and apply the result if it has changed.
+        This is called automatically by the background thread, and whenever the battery state changes.
+        """
+        with self._lock:
+            if not self._battery:
+                self._battery = memmap.get_battery_values(self.ec)
+
+            if not self._battery.get("batt_present", False):
+                return
+
+            chosen = self.evaluate()
+            if chosen is None:
+                return
+            target = chosen.target if isinstance(chosen, ChargeRule) else chosen
+            self.apply(target, chosen is not self.active)
+            self.active = chosen
+
+    def _on_change(self, field: str, old: Any, new: Any) -> None:
+        with self._lock:
+            self._battery[field] = new
+            try:
+                self.poll()
+            except Exception as e:
+                warnings.warn(f"{type(self).__name__} failed to apply policy: {e!r}", RuntimeWarning)
+
+    def start(self) -> None:
+        """
+        Apply the policy now, then keep it applied from a background thread.
+        """
+        if self.running:
+            return
+        self.poll()
+        self._subs = [self.watch.on(field, self._on_change) for field in _WATCHED_FIELDS]
+        self.watch.start()
+        super().start()
+
+    def stop(self) -> None:
+        """
+        Stop applying the policy. The EC keeps the last settings applied.
+        """
+        for sub in self._subs:
+            self.watch.off(sub)
+        self._subs = []
+        super().stop()
@@ -0,0 +1,144 @@
+"""
+Battery commands
+
+The memmap only shows one battery at a time, these commands can query any battery by index.
+"""
+
+from typing import Final, Literal
+import struct
+import weakref
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..constants.MEMMAP import *
+
+EC_CMD_BATTERY_GET_STATIC: Final = 0x0600
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace").split("\x00", 1)[0]
+
+
+def battery_get_static(ec: CrosEcClass, index: UInt8, version: Literal[0, 1, 2] | None = None) -> dict[str, int | str]:
+    """
+    Get the static info of a battery, these values don't change for a given pack apart from the cycle count.
+    :param ec: The CrOS_EC object.
+    :param index: The battery index.
+    :param version: The command version to use. Default is the highest supported.
+    Version 0 has 8 byte strings, version 1 has 12 byte strings and version 2 has 32 byte strings.
+    :return: The design capacity (mAh), design voltage (mV), cycle count, manufacturer, model, serial and type.
+    """
+    if version is None:
+        version = ec.capabilities.max_version(EC_CMD_BATTERY_GET_STATIC, 2) or 0
+    data = struct.pack("<B", index)
+    match version:
+        case 0:
+            # ec_response_battery_static_info: u16 design_capacity, u16 design_voltage,
+            # char manufacturer[8], model[8], serial[8], type[8], u32 cycle_count
+            resp = ec.command(version, EC_CMD_BATTERY_GET_STATIC, len(data), 40, data)
+            unpacked = struct.unpack("<HH8s8s8s8sI", resp)
+            capacity, voltage, strings, cycle_count = unpacked[0], unpacked[1], unpacked[2:6], unpacked[6]
+        case 1:
+            # ec_response_battery_static_info_v1: u16 design_capacity, u16 design_voltage, u32 cycle_count,
+            # char manufacturer_ext[12], model_ext[12], serial_ext[12], type_ext[12]
+            resp = ec.command(version, EC_CMD_BATTERY_GET_STATIC, len(data), 56, data)
+            unpacked = struct.unpack("<HHI12s12s12s12s", resp)
+            capacity, voltage, cycle_count, strings = unpacked[0], unpacked[1], unpacked[2], unpacked[3:]
+        case 2:
+            # ec_response_battery_static_info_v2: u16 design_capacity, u16 design_voltage, u32 cycle_count,
+            # char manufacturer[32], device_name[32], serial[32], chemistry[32]
+            resp = ec.command(version, EC_CMD_BATTERY_GET_STATIC, len(data), 136, data)
+            unpacked = struct.unpack("<HHI32s32s32s32s", resp)
+            capacity, voltage, cycle_count, strings = unpacked[0], unpacked[1], unpacked[2], unpacked[3:]
+        case _:
+            raise NotImplementedError
+    return {
+        "design_capacity": capacity,
+        "design_voltage": voltage,
+        "cycle_count": cycle_count,
+        "manufacturer": _decode(strings[0]),
+        "model": _decode(strings[1]),
+        "serial": _decode(strings[2]),
+        "type": _decode(strings[3]),
+    }
+
+
+EC_CMD_BATTERY_GET_DYNAMIC: Final = 0x0601
+
+
+def battery_get_dynamic(ec: CrosEcClass, index: UInt8) -> dict[str, int | bool]:
+    """
+    Get the dynamic info of a battery.
+    :param ec: The CrOS_EC object.
+    :param index: The battery index.
+    :return: The voltage (mV), current (mA), remaining and full capacity (mAh), the flags decoded as in
+    `cros_ec_python.commands.memmap.get_battery_values`, and the voltage (mV) and current (mA) the battery is asking for.
+    """
+    data = struct.pack("<B", index)
+    resp = ec.command(0, EC_CMD_BATTERY_GET_DYNAMIC, len(data), 14, data)
+    unpacked = struct.unpack("<7h", resp)
+    flags = unpacked[4]
+    return {
+        "actual_voltage": unpacked[0],
+        "actual_current": unpacked[1],
+        "remaining_capacity": unpacked[2],
+        "full_capacity": unpacked[3],
+        "ac_present": bool(flags & EC_BATT_FLAG_AC_PRESENT),
+        "batt_present": bool(flags & EC_BATT_FLAG_BATT_PRESENT),
+        "discharging": bool(flags & EC_BATT_FLAG_DISCHARGING),
+        "charging": bool(flags & EC_BATT_FLAG_CHARGING),
+        "level_critical": bool(flags & EC_BATT_FLAG_LEVEL_CRITICAL),
+        "invalid_data": bool(flags & EC_BATT_FLAG_INVALID_DATA),
+        "desired_voltage": unpacked[5],
+        "desired_current": unpacked[6],
+    }
+
+
+def battery_count(ec: CrosEcClass) -> UInt8:
+    """
+    Get the number of batteries the EC supports, from the memmap.
+    :param ec: The CrOS_EC object.
+    :return: The number of batteries.
+    """
+    return ec.memmap(EC_MEMMAP_BATT_COUNT, 1)[0]
+
+
+_battery_static: "weakref.WeakKeyDictionary[CrosEcClass, dict[int, dict[str, int | str]]]" = weakref.WeakKeyDictionary()
+
+
+def get_batteries(ec: CrosEcClass, refresh: bool = False) -> list[dict[str, int | bool | str]]:
+    """
+    Get the static and dynamic info of every battery.
+
+    The dynamic info of every battery is read in one batch each call. The static info is cached for each index,
+    and only read (in a second batch) when a battery is first seen, or present again after being removed.
+    :param ec: The CrOS_EC object.
+    :param refresh: Read the static info from the EC, even if it is cached.
+    :return: The info of each battery by index, the keys from `battery_get_dynamic`, plus the keys from
+    `battery_get_static` while a battery is present. The cycle count changes while a battery is present,
+    so it isn't cached or included, use `battery_get_static` to read it.
+    """
+    cached = _battery_static.setdefault(ec, {})
+    if refresh:
+        cached.clear()
+
+    count = battery_count(ec)
+    with ec.batch(stop_on_error=True) as b:
+        futures = [b.call(battery_get_dynamic, index) for index in range(count)]
+    dynamic = [future.result() for future in futures]
+
+    missing = []
+    for index, info in enumerate(dynamic):
+        if not info["batt_present"] or info["invalid_data"]:
+            cached.pop(index, None)
+        elif index not in cached:
+            missing.append(index)
+
+    if missing:
+        with ec.batch(stop_on_error=True) as b:
+            static = {index: b.call(battery_get_static, index) for index in missing}
+        for index, future in static.items():
+            info = future.result()
+            del info["cycle_count"]
+            cached[index] = info
+
+    return [{**info, **cached.get(index, {})} for index, info in enumerate(dynamic)]
@@ -0,0 +1,171 @@
+"""
+Console commands
+
+The EC keeps its console output in a ring buffer.
+`console_snapshot` marks the current end of the buffer, and `console_read` then reads up to that mark in chunks.
+With version 1 of the read command, `EcConsoleReadSubcmd.CONSOLE_READ_RECENT` only returns what was written
+between the previous snapshot and this one, so `ConsoleReader` can follow the console without re-reading it.
+On older ECs the whole buffer is read each time, and `ConsoleReader` only returns what wasn't in the previous read.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec
+from cros_ec_python.commands.console import ConsoleReader
+
+ec = get_cros_ec()
+
+for line in ConsoleReader(ec).follow(interval=1):
+    print(line)
+```
+"""
+
+import codecs
+import time
+import warnings
+from typing import Final, Iterator
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+EC_CMD_CONSOLE_SNAPSHOT: Final = 0x0097
+
+
+def console_snapshot(ec: CrosEcClass) -> None:
+    """
+    Save a snapshot of the console output, to be read with `console_read`.
+    :param ec: The CrOS_EC object.
+    """
+    ec.command(0, EC_CMD_CONSOLE_SNAPSHOT, 0, 0)
+
+
+EC_CMD_CONSOLE_READ: Final = 0x0098
+
+
+class EcConsoleReadSubcmd(Enum):
+    """Console read subcommands (v1 command)"""
+
+    CONSOLE_READ_NEXT = 0
+    "Read the next chunk of the whole snapshot"
+
+    CONSOLE_READ_RECENT = 1
+    "Read the next chunk of the output between the previous snapshot and this one"
+
+
+def console_read(ec: CrosEcClass, subcmd: EcConsoleReadSubcmd | None = None) -> bytes:
+    """
+    Read the next chunk of the console snapshot, in the largest response the EC allows.
+    :param ec: The CrOS_EC object.
+    :param subcmd: The read subcommand, uses the v1 command. None uses the v0 command, which is the same as CONSOLE_READ_NEXT.
+    :return: The chunk, empty once the end of the snapshot has been reached.
+    """
+    insize = ec.capabilities.max_response_size
+    if subcmd is None:
+        resp = ec.command(0, EC_CMD_CONSOLE_READ, 0, insize, warn=False)
+    else:
+        data = struct.pack("<B", subcmd.value)
+        resp = ec.command(1, EC_CMD_CONSOLE_READ, len(data), insize, data, warn=False)
+    # The chunk is a NUL terminated string
+    return resp.split(b"\x00", 1)[0]
+
+
+_OVERLAP_SEARCH_SIZE: Final = 64
+"""How much of the end of the previous snapshot `ConsoleReader` searches for in the next one, on older ECs."""
+
+
+class ConsoleReader:
+    """
+    Reads new console output, and splits it into lines.
+    """
+
+    def __init__(self, ec: CrosEcClass, encoding: str = "utf-8"):
+        """
+        Create a console reader. The first read returns whatever the EC has buffered since its last snapshot.
+        :param ec: The CrOS_EC object.
+        :param encoding: The encoding of the console output, undecodable bytes are replaced.
+        """
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial: str = ""
+        self._subcmd: EcConsoleReadSubcmd | None = None
+        self._previous: bytes = b""
+
+    def _new_output(self, buffer: bytes) -> bytes:
+        """
+        Find the output in a whole buffer snapshot that wasn't in the previous one.
+        The start of the previous snapshot may have been overwritten since, so find where the rest of it ends,
+        by searching for the last `_OVERLAP_SEARCH_SIZE` bytes of it.
+        If they aren't there, the console overflowed between reads and the whole buffer is new.
+        """
+        previous, self._previous = self._previous, buffer
+        tail = previous[-_OVERLAP_SEARCH_SIZE:]
+        if not tail:
+            return buffer
+        # What is left of the previous snapshot can't be longer than it was
+        end = min(len(buffer), len(previous))
+        while (found := buffer.rfind(tail, 0, end)) != -1:
+            overlap = found + len(tail)
+            if previous.endswith(buffer[:overlap]):
+                return buffer[overlap:]
+            end = overlap - 1
+        return buffer
+
+    def read_chunks(self) -> list[bytes]:
+        """
+        Snapshot the console and read the output written since the previous snapshot.
+        :return: The raw chunks.
+        """
+        if self._subcmd is None:
+            if self.ec.capabilities.supports(EC_CMD_CONSOLE_READ, 1):
+                self._subcmd = EcConsoleReadSubcmd.CONSOLE_READ_RECENT
+            else:
+                warnings.warn("EC doesn't support reading recent console output, the whole buffer will be read "
+                              "and compared with the previous read", RuntimeWarning)
+                self._subcmd = EcConsoleReadSubcmd.CONSOLE_READ_NEXT
+
+        recent = self._subcmd == EcConsoleReadSubcmd.CONSOLE_READ_RECENT
+        chunks = []
+        with self.ec.lock:
+            console_snapshot(self.ec)
+            while chunk := console_read(self.ec, self._subcmd if recent else None):
+                chunks.append(chunk)
+
+        if recent:
+            return chunks
+        new = self._new_output(b"".join(chunks))
+        return [new] if new else []
+
+    def read(self) -> list[str]:
+        """
+        Read the new console output.
+        :return: The new complete lines, without line endings. A trailing partial line is kept until it is completed.
+        """
+        text = self._partial + "".join(self._decoder.decode(chunk) for chunk in self.read_chunks())
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+    def flush(self) -> str:
+        """
+        Take the partial line that hasn't been completed yet.
+        :return: The partial line, empty if there is none.
+        """
+        partial = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        return partial
+
+    def follow(self, interval: float = 1) -> Iterator[str]:
+        """
+        Follow the console forever. The EC is only read once every line from the last read has been consumed,
+        so a slow consumer slows the reads down rather than building up a backlog.
+        :param interval: Seconds to wait between reads when there is no new output.
+        :return: An iterator of lines.
+        """
+        while True:
+            lines = self.read()
+            if not lines:
+                time.sleep(interval)
+            yield from lines
@@ -0,0 +1,307 @@
+"""
+Host event commands
+
+Host events are a bitmask of things that have happened on the EC (lid opened, AC connected, etc.).
+The current events are mirrored in the memmap at `EC_MEMMAP_HOST_EVENTS`, which is very cheap to poll.
+
+See `cros_ec_python.watch.HostEventWatcher` for a watcher built on these functions.
+"""
+
+from typing import Final
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..constants.MEMMAP import EC_MEMMAP_EVENTS_VERSION, EC_MEMMAP_HOST_EVENTS
+
+
+class EcHostEvent(Enum):
+    """Host event codes. Note these are 1-based, not 0-based."""
+
+    EC_HOST_EVENT_NONE = 0
+
+    EC_HOST_EVENT_LID_CLOSED = 1
+    EC_HOST_EVENT_LID_OPEN = 2
+    EC_HOST_EVENT_POWER_BUTTON = 3
+    EC_HOST_EVENT_AC_CONNECTED = 4
+    EC_HOST_EVENT_AC_DISCONNECTED = 5
+    EC_HOST_EVENT_BATTERY_LOW = 6
+    EC_HOST_EVENT_BATTERY_CRITICAL = 7
+    EC_HOST_EVENT_BATTERY = 8
+    EC_HOST_EVENT_THERMAL_THRESHOLD = 9
+
+    EC_HOST_EVENT_DEVICE = 10
+    "Event generated by a device attached to the EC"
+
+    EC_HOST_EVENT_THERMAL = 11
+    EC_HOST_EVENT_USB_CHARGER = 12
+    EC_HOST_EVENT_KEY_PRESSED = 13
+
+    EC_HOST_EVENT_INTERFACE_READY = 14
+    """
+    EC has finished initializing the host interface.  The host can check
+    for this event following sending a EC_CMD_REBOOT_EC command to
+    determine when the EC is ready to accept subsequent commands.
+    """
+
+    EC_HOST_EVENT_KEYBOARD_RECOVERY = 15
+    "Keyboard recovery combo has been pressed"
+
+    EC_HOST_EVENT_THERMAL_SHUTDOWN = 16
+    "Shutdown due to thermal overload"
+
+    EC_HOST_EVENT_BATTERY_SHUTDOWN = 17
+    "Shutdown due to battery level too low"
+
+    EC_HOST_EVENT_THROTTLE_START = 18
+    "Suggest that the AP throttle itself"
+
+    EC_HOST_EVENT_THROTTLE_STOP = 19
+    "Suggest that the AP resume normal speed"
+
+    EC_HOST_EVENT_HANG_DETECT = 20
+    "Hang detect logic detected a hang and host event timeout expired"
+
+    EC_HOST_EVENT_HANG_REBOOT = 21
+    "Hang detect logic detected a hang and warm rebooted the AP"
+
+    EC_HOST_EVENT_PD_MCU = 22
+    "PD MCU triggering host event"
+
+    EC_HOST_EVENT_BATTERY_STATUS = 23
+    "Battery Status flags have changed"
+
+    EC_HOST_EVENT_PANIC = 24
+    "EC encountered a panic, triggering a reset"
+
+    EC_HOST_EVENT_KEYBOARD_FASTBOOT = 25
+    "Keyboard fastboot combo has been pressed"
+
+    EC_HOST_EVENT_RTC = 26
+    "EC RTC event occurred"
+
+    EC_HOST_EVENT_MKBP = 27
+    "Emulate MKBP event over host event interface"
+
+    EC_HOST_EVENT_USB_MUX = 28
+    "EC desires to change state of host-controlled USB mux"
+
+    EC_HOST_EVENT_MODE_CHANGE = 29
+    "The device has changed modes (e.g. tablet mode)"
+
+    EC_HOST_EVENT_KEYBOARD_RECOVERY_HW_REINIT = 30
+    "Keyboard recovery combo with hardware reinitialization"
+
+    EC_HOST_EVENT_WOV = 31
+    "WoV"
+
+    EC_HOST_EVENT_INVALID = 32
+    """
+    The high bit of the event mask is not used as a host event code.  If
+    it reads back as set, then the entire event mask should be
+    considered invalid by the host.
+    """
+
+    EC_HOST_EVENT_BODY_DETECT_CHANGE = 33
+    "Body detect (lap/desk) change event"
+
+
+def EC_HOST_EVENT_MASK(event: EcHostEvent | int) -> UInt64:
+    """
+    Convert a host event code to its bitmask.
+    :param event: The host event.
+    :return: The bit for the event in a host event mask.
+    """
+    if isinstance(event, EcHostEvent):
+        event = event.value
+    return BIT(event - 1)
+
+
+def decode_host_events(events: UInt64) -> list[EcHostEvent]:
+    """
+    Decode a host event bitmask into a list of EcHostEvent enums.
+    :param events: The host event bitmask.
+    :return: The events as a list of EcHostEvent enums.
+    """
+    return [
+        event
+        for event in EcHostEvent
+        if event.value and events & EC_HOST_EVENT_MASK(event)
+    ]
+
+
+def get_host_events(ec: CrosEcClass) -> UInt64:
+    """
+    Read the current host events from the memmap.
+    This only reads 8 bytes, so it is cheap enough to poll at a high rate.
+    :param ec: The CrOS_EC object.
+    :return: The host events as a bitmask. Use `decode_host_events` to decode. 0 if not supported.
+    """
+    version = int(ec.memmap(EC_MEMMAP_EVENTS_VERSION, 1)[0])
+    if not version:
+        # Host events not supported
+        return 0
+
+    resp = ec.memmap(EC_MEMMAP_HOST_EVENTS, 8)
+    return struct.unpack("<Q", resp)[0]
+
+
+EC_CMD_HOST_EVENT_GET_B: Final = 0x0087
+
+
+def host_event_get_b(ec: CrosEcClass) -> UInt32:
+    """
+    Get the host event B copy. This is a separate copy of the host events,
+    so reading and clearing it doesn't interfere with the OS.
+    :param ec: The CrOS_EC object.
+    :return: The host event B bitmask.
+    """
+    resp = ec.command(0, EC_CMD_HOST_EVENT_GET_B, 0, 4)
+    return struct.unpack("<I", resp)[0]
+
+
+EC_CMD_HOST_EVENT_GET_SMI_MASK: Final = 0x0088
+EC_CMD_HOST_EVENT_GET_SCI_MASK: Final = 0x0089
+EC_CMD_HOST_EVENT_GET_WAKE_MASK: Final = 0x008D
+
+
+def host_event_get_smi_mask(ec: CrosEcClass) -> UInt32:
+    """
+    Get the SMI event mask.
+    :param ec: The CrOS_EC object.
+    :return: The SMI event mask.
+    """
+    resp = ec.command(0, EC_CMD_HOST_EVENT_GET_SMI_MASK, 0, 4)
+    return struct.unpack("<I", resp)[0]
+
+
+def host_event_get_sci_mask(ec: CrosEcClass) -> UInt32:
+    """
+    Get the SCI event mask.
+    :param ec: The CrOS_EC object.
+    :return: The SCI event mask.
+    """
+    resp = ec.command(0, EC_CMD_HOST_EVENT_GET_SCI_MASK, 0, 4)
+    return struct.unpack("<I", resp)[0]
+
+
+def host_event_get_wake_mask(ec: CrosEcClass) -> UInt32:
+    """
+    Get the wake event mask.
+    :param ec: The CrOS_EC object.
+    :return: The wake event mask.
+    """
+    resp = ec.command(0, EC_CMD_HOST_EVENT_GET_WAKE_MASK, 0, 4)
+    return struct.unpack("<I", resp)[0]
+
+
+EC_CMD_HOST_EVENT_SET_SMI_MASK: Final = 0x008A
+EC_CMD_HOST_EVENT_SET_SCI_MASK: Final = 0x008B
+EC_CMD_HOST_EVENT_SET_WAKE_MASK: Final = 0x008E
+
+
+def host_event_set_smi_mask(ec: CrosEcClass, mask: UInt32) -> None:
+    """
+    Set the SMI event mask.
+    :param ec: The CrOS_EC object.
+    :param mask: The new SMI event mask.
+    """
+    data = struct.pack("<I", mask)
+    ec.command(0, EC_CMD_HOST_EVENT_SET_SMI_MASK, 4, 0, data)
+
+
+def host_event_set_sci_mask(ec: CrosEcClass, mask: UInt32) -> None:
+    """
+    Set the SCI event mask.
+    :param ec: The CrOS_EC object.
+    :param mask: The new SCI event mask.
+    """
+    data = struct.pack("<I", mask)
+    ec.command(0, EC_CMD_HOST_EVENT_SET_SCI_MASK, 4, 0, data)
+
+
+def host_event_set_wake_mask(ec: CrosEcClass, mask: UInt32) -> None:
+    """
+    Set the wake event mask.
+    :param ec: The CrOS_EC object.
+    :param mask: The new wake event mask.
+    """
+    data = struct.pack("<I", mask)
+    ec.command(0, EC_CMD_HOST_EVENT_SET_WAKE_MASK, 4, 0, data)
+
+
+EC_CMD_HOST_EVENT_CLEAR: Final = 0x008C
+
+
+def host_event_clear(ec: CrosEcClass, mask: UInt32) -> None:
+    """
+    Clear host events. This clears the main copy, which the OS may also be using.
+    Prefer `host_event_clear_b` unless you are the only consumer of host events.
+    :param ec: The CrOS_EC object.
+    :param mask: The events to clear as a bitmask.
+    """
+    data = struct.pack("<I", mask)
+    ec.command(0, EC_CMD_HOST_EVENT_CLEAR, 4, 0, data)
+
+
+EC_CMD_HOST_EVENT_CLEAR_B: Final = 0x008F
+
+
+def host_event_clear_b(ec: CrosEcClass, mask: UInt32) -> None:
+    """
+    Clear host events from the B copy.
+    :param ec: The CrOS_EC object.
+    :param mask: The events to clear as a bitmask.
+    """
+    data = struct.pack("<I", mask)
+    ec.command(0, EC_CMD_HOST_EVENT_CLEAR_B, 4, 0, data)
+
+
+EC_CMD_HOST_EVENT: Final = 0x00A4
+
+
+class EcHostEventAction(Enum):
+    EC_HOST_EVENT_GET = 0
+    "Get the requested mask or events"
+    EC_HOST_EVENT_SET = 1
+    "Set the requested mask"
+    EC_HOST_EVENT_CLEAR = 2
+    "Clear the requested events"
+
+
+class EcHostEventMaskType(Enum):
+    EC_HOST_EVENT_MAIN = 0
+    "Main host event copy"
+    EC_HOST_EVENT_B = 1
+    "Copy B of host events"
+    EC_HOST_EVENT_SCI_MASK = 2
+    EC_HOST_EVENT_SMI_MASK = 3
+    EC_HOST_EVENT_ALWAYS_REPORT_MASK = 4
+    "Mask of events that should be always reported in hostevents"
+    EC_HOST_EVENT_ACTIVE_WAKE_MASK = 5
+    "Active wake mask"
+    EC_HOST_EVENT_LAZY_WAKE_MASK_S0IX = 6
+    "Lazy wake mask for S0ix"
+    EC_HOST_EVENT_LAZY_WAKE_MASK_S3 = 7
+    "Lazy wake mask for S3"
+    EC_HOST_EVENT_LAZY_WAKE_MASK_S5 = 8
+    "Lazy wake mask for S5"
+
+
+def host_event(
+    ec: CrosEcClass, action: EcHostEventAction, mask_type: EcHostEventMaskType, value: UInt64 = 0
+) -> UInt64:
+    """
+    Unified 64-bit host event command. Requires `EC_FEATURE_HOST_EVENT64`.
+    :param ec: The CrOS_EC object.
+    :param action: Whether to get, set or clear.
+    :param mask_type: Which events or mask to act on.
+    :param value: The value to set or clear. Ignored for get.
+    :return: The requested mask or events for get, 0 otherwise.
+    """
+    data = struct.pack("<BBxxQ", action.value, mask_type.value, value)
+    if action == EcHostEventAction.EC_HOST_EVENT_GET:
+        resp = ec.command(0, EC_CMD_HOST_EVENT, len(data), 8, data)
+        return struct.unpack("<Q", resp)[0]
+    ec.command(0, EC_CMD_HOST_EVENT, len(data), 0, data)
+    return 0
@@ -0,0 +1,215 @@
+"""
+Flash commands.
+
+Reads are split into chunks of the largest response the EC and interface allow,
+see `cros_ec_python.capabilities.EcCapabilities.max_response_size`.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, flash
+
+ec = get_cros_ec()
+
+# Dump the whole flash, run it again to continue if it gets interrupted
+stats = flash.flash_dump(ec, "ec.bin", progress=lambda done, total: print(f"{done}/{total}", end="\\r"))
+print(f"{stats['bytes_per_second'] / 1024:.1f} KiB/s")
+```
+"""
+
+import os
+import time
+from typing import Final, Callable, Iterator, Literal
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+EC_CMD_FLASH_INFO: Final = 0x0010
+
+EC_FLASH_INFO_ERASE_TO_0: Final = BIT(0)
+"Flash erases to 0 instead of 1."
+
+EC_FLASH_INFO_SELECT_REQUIRED: Final = BIT(1)
+"Flash must be selected with EC_CMD_FLASH_SELECT before it can be read or written."
+
+
+def flash_info(ec: CrosEcClass, version: Literal[0, 1] | None = None) -> dict[str, UInt32]:
+    """
+    Get flash info.
+    :param ec: The CrOS_EC object.
+    :param version: The command version to use. Default is the highest supported.
+    :return: The flash size, write block size, erase block size and protect block size in bytes.
+    Version 1 adds the ideal write size and flags (EC_FLASH_INFO_...).
+    """
+    if version is None:
+        version = ec.capabilities.max_version(EC_CMD_FLASH_INFO, 1) or 0
+    match version:
+        case 0:
+            resp = ec.command(version, EC_CMD_FLASH_INFO, 0, 16)
+            unpacked = struct.unpack("<4I", resp)
+        case 1:
+            resp = ec.command(version, EC_CMD_FLASH_INFO, 0, 24)
+            unpacked = struct.unpack("<6I", resp)
+        case _:
+            raise NotImplementedError
+    info = {
+        "flash_size": unpacked[0],
+        "write_block_size": unpacked[1],
+        "erase_block_size": unpacked[2],
+        "protect_block_size": unpacked[3],
+    }
+    if version >= 1:
+        info["write_ideal_size"] = unpacked[4]
+        info["flags"] = unpacked[5]
+    return info
+
+
+EC_CMD_FLASH_READ: Final = 0x0011
+
+
+def flash_read(ec: CrosEcClass, offset: UInt32, size: UInt32) -> bytes:
+    """
+    Read flash in a single command. Use `flash_read_into`, `flash_iter` or `flash_dump` for larger reads.
+    :param ec: The CrOS_EC object.
+    :param offset: Byte offset to read from.
+    :param size: Number of bytes to read, at most `ec.capabilities.max_response_size`.
+    :return: The flash contents.
+    """
+    data = struct.pack("<II", offset, size)
+    return ec.command(0, EC_CMD_FLASH_READ, len(data), size, data)
+
+
+def flash_read_into(
+    ec: CrosEcClass,
+    buffer: bytearray | memoryview,
+    offset: UInt32,
+    start: int = 0,
+    chunk_size: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Read flash into a preallocated buffer, in chunks of the largest response the EC allows.
+    :param ec: The CrOS_EC object.
+    :param buffer: A writable buffer, the length of the buffer is the number of bytes read.
+    :param offset: Byte offset in flash of the start of the buffer.
+    :param start: Bytes already in the buffer, to continue an interrupted read.
+    :param chunk_size: Bytes per command. Default is `ec.capabilities.max_response_size`.
+    :param progress: Called with the bytes read so far and the total after each chunk.
+    :return: The number of bytes read.
+    """
+    view = memoryview(buffer).cast("B")
+    total = len(view)
+    chunk_size = chunk_size or ec.capabilities.max_response_size
+    for pos in range(start, total, chunk_size):
+        size = min(chunk_size, total - pos)
+        view[pos: pos + size] = flash_read(ec, offset + pos, size)
+        if progress:
+            progress(pos + size, total)
+    return total - start
+
+
+def flash_iter(ec: CrosEcClass, offset: UInt32, size: UInt32, chunk_size: int | None = None) -> Iterator[bytes]:
+    """
+    Read flash as a stream of chunks, in chunks of the largest response the EC allows.
+    :param ec: The CrOS_EC object.
+    :param offset: Byte offset to start reading from.
+    :param size: Number of bytes to read.
+    :param chunk_size: Bytes per command. Default is `ec.capabilities.max_response_size`.
+    :return: An iterator of chunks.
+    """
+    chunk_size = chunk_size or ec.capabilities.max_response_size
+    for pos in range(offset, offset + size, chunk_size):
+        yield flash_read(ec, pos, min(chunk_size, offset + size - pos))
+
+
+def flash_dump(
+    ec: CrosEcClass,
+    path: str | os.PathLike,
+    offset: UInt32 = 0,
+    size: UInt32 | None = None,
+    resume: bool = True,
+    chunk_size: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, int | float]:
+    """
+    Dump flash to a file.
+    :param ec: The CrOS_EC object.
+    :param path: The file to write to.
+    :param offset: Byte offset to start reading from.
+    :param size: Number of bytes to read. Default is to the end of flash.
+    :param resume: Continue from the end of the file if it already exists, otherwise it is overwritten.
+    :param chunk_size: Bytes per command. Default is `ec.capabilities.max_response_size`.
+    :param progress: Called with the bytes dumped so far and the total after each chunk.
+    :return: The bytes read, seconds taken, and bytes per second.
+    """
+    if size is None:
+        size = flash_info(ec)["flash_size"] - offset
+
+    start = 0
+    if resume and os.path.exists(path):
+        start = min(os.path.getsize(path), size)
+
+    began = time.monotonic()
+    with open(path, "r+b" if start else "wb") as f:
+        f.seek(start)
+        f.truncate()
+        done = start
+        for chunk in flash_iter(ec, offset + start, size - start, chunk_size):
+            f.write(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, size)
+    elapsed = time.monotonic() - began
+
+    return {
+        "bytes": size - start,
+        "seconds": elapsed,
+        "bytes_per_second": (size - start) / elapsed if elapsed else 0,
+    }
+
+
+EC_CMD_FLASH_WRITE: Final = 0x0012
+
+EC_CMD_FLASH_ERASE: Final = 0x0013
+
+EC_CMD_FLASH_PROTECT: Final = 0x0015
+
+EC_CMD_FLASH_REGION_INFO: Final = 0x0016
+
+
+class EcFlashRegion(Enum):
+    """Flash regions"""
+
+    EC_FLASH_REGION_RO = 0
+    "Region which holds read-only EC image"
+
+    EC_FLASH_REGION_ACTIVE = 1
+    "Region which holds active RW image. 'Active' is different from 'running', which may be RO."
+
+    EC_FLASH_REGION_WP_RO = 2
+    "Region which should be write-protected in the factory (a superset of EC_FLASH_REGION_RO)"
+
+    EC_FLASH_REGION_UPDATE = 3
+    "Region which holds updatable (non-active) RW image. Only present on ECs with two RW images."
+
+
+def flash_region_info(ec: CrosEcClass, region: EcFlashRegion) -> dict[str, UInt32]:
+    """
+    Get the location of a flash region (v1 command).
+    :param ec: The CrOS_EC object.
+    :param region: The region to look up.
+    :return: The byte offset and size of the region.
+    """
+    data = struct.pack("<I", region.value)
+    resp = ec.command(1, EC_CMD_FLASH_REGION_INFO, len(data), 8, data)
+    unpacked = struct.unpack("<II", resp)
+    return {
+        "offset": unpacked[0],
+        "size": unpacked[1],
+    }
+
+
+EC_CMD_FLASH_SPI_INFO: Final = 0x0018
+
+EC_CMD_FLASH_SELECT: Final = 0x0019
@@ -82,8 +82,7 @@ def get_build_info(ec: CrosEcClass) -> str:
     :param ec: The CrOS_EC object.
     :return: The build info as a string.
     """
-    # 0xEC is the max command size on some platforms
-    resp = ec.command(0, EC_CMD_GET_BUILD_INFO, 0, 0xEC, warn=False)
+    resp = ec.command(0, EC_CMD_GET_BUILD_INFO, 0, ec.capabilities.max_response_size, warn=False)
     return resp.decode("utf-8").rstrip("\x00")
 
 
@@ -155,6 +154,19 @@ def get_cmd_versions(ec: CrosEcClass, cmd: UInt8 | UInt16, version: Literal[0, 1
 
 EC_CMD_GET_COMMS_STATUS: Final = 0x0009
 
+EC_COMMS_STATUS_PROCESSING: Final = BIT(0)
+"The EC is still processing a command that returned EC_RES_IN_PROGRESS."
+
+
+def get_comms_status(ec: CrosEcClass) -> UInt32:
+    """
+    Get the communication status, used to wait for a command that returned EC_RES_IN_PROGRESS.
+    :param ec: The CrOS_EC object.
+    :return: The status flags (EC_COMMS_STATUS_...).
+    """
+    resp = ec.command(0, EC_CMD_GET_COMMS_STATUS, 0, 4)
+    return struct.unpack("<I", resp)[0]
+
 EC_CMD_TEST_PROTOCOL: Final = 0x000A
 
 
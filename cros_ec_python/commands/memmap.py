@@ -7,17 +7,15 @@ This is why they aren't mixed in with the other commands.
 
 
 import struct
+import weakref
 from ..baseclass import CrosEcClass
 from ..constants.COMMON import *
 from ..constants.MEMMAP import *
 
 
-def get_temps(ec: CrosEcClass, adjust: int | float = -273) -> list[int | float]:
+def _read_temps(ec: CrosEcClass) -> list[int]:
     """
-    Get the temperature of all temp sensors.
-    :param ec: The CrOS_EC object.
-    :param adjust: The adjustment to apply to the temperature. Default is -273 to convert from Kelvin to Celsius.
-    :return: A list of temperatures.
+    Read the raw temp sensor entries, including the ones that aren't present.
     """
     version = int(ec.memmap(EC_MEMMAP_THERMAL_VERSION, 1)[0])
     if not version:
@@ -27,21 +25,48 @@ def get_temps(ec: CrosEcClass, adjust: int | float = -273) -> list[int | float]:
     ret = []
     if version >= 1:
         resp = ec.memmap(EC_MEMMAP_TEMP_SENSOR, EC_TEMP_SENSOR_ENTRIES)
-        temps = struct.unpack(f"<{EC_TEMP_SENSOR_ENTRIES}B", resp)
-        ret += [temp + EC_TEMP_SENSOR_OFFSET + adjust for temp in temps if temp < 0xFC]
+        ret += struct.unpack(f"<{EC_TEMP_SENSOR_ENTRIES}B", resp)
 
     if version >= 2:
         resp = ec.memmap(EC_MEMMAP_TEMP_SENSOR_B, EC_TEMP_SENSOR_B_ENTRIES)
-        temps = struct.unpack(f"<{EC_TEMP_SENSOR_B_ENTRIES}B", resp)
-        ret += [temp + EC_TEMP_SENSOR_OFFSET + adjust for temp in temps if temp < 0xFC]
+        ret += struct.unpack(f"<{EC_TEMP_SENSOR_B_ENTRIES}B", resp)
 
     return ret
 
 
-def get_fans(ec: CrosEcClass) -> list[int | None]:
+def get_temps(ec: CrosEcClass, adjust: int | float = -273, by_index: bool = False) -> list[int | float | None]:
+    """
+    Get the temperature of all temp sensors.
+    :param ec: The CrOS_EC object.
+    :param adjust: The adjustment to apply to the temperature. Default is -273 to convert from Kelvin to Celsius.
+    :param by_index: Keep every entry at its sensor index, with None for sensors that aren't present,
+    have an error, aren't powered or aren't calibrated. By default these are left out of the list.
+    :return: A list of temperatures.
+    """
+    ret = _read_temps(ec)
+    if by_index:
+        return [
+            temp + EC_TEMP_SENSOR_OFFSET + adjust if temp < EC_TEMP_SENSOR_NOT_CALIBRATED else None for temp in ret
+        ]
+    return [temp + EC_TEMP_SENSOR_OFFSET + adjust for temp in ret if temp < EC_TEMP_SENSOR_NOT_CALIBRATED]
+
+
+def get_temp_indexes(ec: CrosEcClass) -> list[int]:
+    """
+    Get the indexes of the temp sensors that are present, including ones that have an error,
+    aren't powered or aren't calibrated.
+    :param ec: The CrOS_EC object.
+    :return: A list of sensor indexes.
+    """
+    return [index for index, temp in enumerate(_read_temps(ec)) if temp < EC_TEMP_SENSOR_NOT_PRESENT]
+
+
+def get_fans(ec: CrosEcClass, by_index: bool = False) -> list[int | None]:
     """
     Get the speed of all fans.
     :param ec: The CrOS_EC object.
+    :param by_index: Keep every entry at its fan index, with None for fans that aren't present.
+    By default these are left out of the list.
     :return: A list of fan speeds. None if the fan has stalled.
     """
     version = int(ec.memmap(EC_MEMMAP_THERMAL_VERSION, 1)[0])
@@ -51,6 +76,8 @@ def get_fans(ec: CrosEcClass) -> list[int | None]:
 
     resp = ec.memmap(EC_MEMMAP_FAN, EC_FAN_SPEED_ENTRIES * 2)  # 2 bytes per fan
     fans = struct.unpack(f"<{EC_FAN_SPEED_ENTRIES}H", resp)
+    if by_index:
+        return [None if fan >= EC_FAN_SPEED_STALLED else fan for fan in fans]
     return [None if fan is EC_FAN_SPEED_STALLED else fan for fan in fans if fan < EC_FAN_SPEED_NOT_PRESENT]
 
 
@@ -74,19 +101,51 @@ def get_switches(ec: CrosEcClass) -> dict[str, bool]:
     }
 
 
-def get_battery_values(ec: CrosEcClass) -> dict[str, int | bool | str]:
+_battery_cache: "weakref.WeakKeyDictionary[CrosEcClass, dict]" = weakref.WeakKeyDictionary()
+
+
+def _read_battery_strings(ec: CrosEcClass) -> dict[str, str]:
+    resp = ec.memmap(EC_MEMMAP_BATT_MFGR, EC_MEMMAP_ALS - EC_MEMMAP_BATT_MFGR)
+    data = struct.unpack("<8s8s8s8s", resp)
+    return {
+        "manufacturer": data[0].decode("utf-8").rstrip("\x00"),
+        "model": data[1].decode("utf-8").rstrip("\x00"),
+        "serial": data[2].decode("utf-8").rstrip("\x00"),
+        "type": data[3].decode("utf-8").rstrip("\x00")
+    }
+
+
+def get_battery_values(ec: CrosEcClass, refresh: bool = False) -> dict[str, int | bool | str]:
     """
     Get the values of the battery.
+
+    The battery strings never change for a given pack, so they are cached,
+    and only read again when the battery index or count changes, or the battery is removed and reinserted.
     :param ec: The CrOS_EC object.
+    :param refresh: Read everything from the EC, even if it is cached.
     :return: The state of the battery.
     """
-    version = int(ec.memmap(EC_MEMMAP_BATTERY_VERSION, 1)[0])
-    if not version:
+    cache = None if refresh else _battery_cache.get(ec)
+    if cache is None:
+        cache = _battery_cache[ec] = {"version": int(ec.memmap(EC_MEMMAP_BATTERY_VERSION, 1)[0])}
+    if not cache["version"]:
         # No battery supported
         return {}
 
-    resp = ec.memmap(EC_MEMMAP_BATT_VOLT, EC_MEMMAP_ALS - EC_MEMMAP_BATT_VOLT)
-    data = struct.unpack("<IIIBBBxIIII8s8s8s8s", resp)
+    resp = ec.memmap(EC_MEMMAP_BATT_VOLT, EC_MEMMAP_BATT_MFGR - EC_MEMMAP_BATT_VOLT)
+    data = struct.unpack("<IIIBBBxIIII", resp)
+
+    if data[3] & EC_BATT_FLAG_BATT_PRESENT and not data[3] & EC_BATT_FLAG_INVALID_DATA:
+        key = (data[5], data[4])
+        if cache.get("key") != key:
+            cache["strings"] = _read_battery_strings(ec)
+            cache["key"] = key
+        strings = cache["strings"]
+    else:
+        # Nothing to cache, and a battery inserted later needs its strings read
+        cache.pop("key", None)
+        strings = _read_battery_strings(ec)
+
     return {
         "volt": data[0],
         "rate": data[1],
@@ -103,10 +162,7 @@ def get_battery_values(ec: CrosEcClass) -> dict[str, int | bool | str]:
         "design_voltage": data[7],
         "last_full_charge_capacity": data[8],
         "cycle_count": data[9],
-        "manufacturer": data[10].decode("utf-8").rstrip("\x00"),
-        "model": data[11].decode("utf-8").rstrip("\x00"),
-        "serial": data[12].decode("utf-8").rstrip("\x00"),
-        "type": data[13].decode("utf-8").rstrip("\x00")
+        **strings,
     }
 
 
@@ -126,8 +182,49 @@ def get_accel(ec: CrosEcClass) -> list[int]:
     Get the current value from all accelerometers.
     :param ec: The CrOS_EC object.
     :return: A list of accelerometer values. May be 0 if the sensor is not present.
+    See `get_motion_data` for a consistent, decoded sample of every sensor.
     """
     EC_ACC_ENTRIES: Final = 3
     resp = ec.memmap(EC_MEMMAP_ACC_DATA, EC_ACC_ENTRIES * 2)  # 2 bytes per sensor
     accel = struct.unpack(f"<{EC_ACC_ENTRIES}H", resp)
     return [val for val in accel]
+
+
+def get_motion_data(
+    ec: CrosEcClass, last_sample_id: int | None = None, retries: int = 5
+) -> dict[str, int | list | tuple | None] | None:
+    """
+    Get a consistent sample of the lid angle, accelerometers and gyroscope.
+    Only the status byte is read if the sample hasn't changed, and the data is read again if the EC updated it mid-read.
+    :param ec: The CrOS_EC object.
+    :param last_sample_id: The `sample_id` from the previous call, to skip reading the data if it hasn't changed.
+    :param retries: How many times to read again while the EC is updating the data.
+    :return: The `sample_id`, `lid_angle` (in degrees, None if unreliable), `accel` (a list of `(x, y, z)` per sensor)
+    and `gyro` (`(x, y, z)`). None if the sample ID hasn't changed, or the EC doesn't report motion data in the memmap.
+    """
+    size = EC_MEMMAP_GYRO_DATA + 6 - EC_MEMMAP_ACC_DATA
+    for _ in range(retries + 1):
+        status = ec.memmap(EC_MEMMAP_ACC_STATUS, 1)[0]
+        if not status & EC_MEMMAP_ACC_STATUS_PRESENCE_BIT:
+            return None
+        sample_id = status & EC_MEMMAP_ACC_STATUS_SAMPLE_ID_MASK
+        if sample_id == last_sample_id and not status & EC_MEMMAP_ACC_STATUS_BUSY_BIT:
+            return None
+        if status & EC_MEMMAP_ACC_STATUS_BUSY_BIT:
+            continue
+
+        resp = ec.memmap(EC_MEMMAP_ACC_DATA, size)
+        # The EC updates the sample ID after writing the data, so the data is only whole if the status hasn't changed
+        if ec.memmap(EC_MEMMAP_ACC_STATUS, 1)[0] != status:
+            continue
+
+        lid_angle = struct.unpack_from("<H", resp)[0]
+        axes = struct.unpack_from(f"<{EC_ACC_SENSOR_ENTRIES * 3}h", resp, 2)
+        gyro = struct.unpack_from("<3h", resp, EC_MEMMAP_GYRO_DATA - EC_MEMMAP_ACC_DATA)
+        return {
+            "sample_id": sample_id,
+            "lid_angle": None if lid_angle == EC_ACC_LID_ANGLE_UNRELIABLE else lid_angle,
+            "accel": [axes[i: i + 3] for i in range(0, len(axes), 3)],
+            "gyro": gyro,
+        }
+    raise IOError("EC was still updating the motion data")
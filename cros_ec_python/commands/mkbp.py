@@ -0,0 +1,178 @@
+"""
+MKBP - Matrix KeyBoard Protocol
+
+Despite the name, MKBP is also used to deliver other events from the EC to the host,
+such as host events, button presses, switch changes and sensor FIFO notifications.
+"""
+
+from typing import Final, Literal
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..exceptions import ECError
+
+EC_CMD_MKBP_STATE: Final = 0x0060
+EC_CMD_MKBP_INFO: Final = 0x0061
+EC_CMD_MKBP_SIMULATE_KEY: Final = 0x0062
+EC_CMD_MKBP_SET_CONFIG: Final = 0x0064
+EC_CMD_MKBP_GET_CONFIG: Final = 0x0065
+EC_CMD_KEYSCAN_SEQ_CTRL: Final = 0x0066
+
+EC_CMD_GET_NEXT_EVENT: Final = 0x0067
+
+# The top bit of the event type is set if the EC has more events queued
+EC_MKBP_HAS_MORE_EVENTS_SHIFT: Final = 7
+EC_MKBP_HAS_MORE_EVENTS: Final = BIT(EC_MKBP_HAS_MORE_EVENTS_SHIFT)
+EC_MKBP_EVENT_TYPE_MASK: Final = BIT(EC_MKBP_HAS_MORE_EVENTS_SHIFT) - 1
+
+
+class EcMkbpEvent(Enum):
+    """MKBP event types"""
+
+    EC_MKBP_EVENT_KEY_MATRIX = 0
+    "Keyboard matrix changed. The event data is the new matrix state."
+
+    EC_MKBP_EVENT_HOST_EVENT = 1
+    "New host event. The event data is 4 bytes of host event flags."
+
+    EC_MKBP_EVENT_SENSOR_FIFO = 2
+    "New Sensor FIFO data. The event data is fifo_info structure."
+
+    EC_MKBP_EVENT_BUTTON = 3
+    "The state of the non-keyboard buttons have changed."
+
+    EC_MKBP_EVENT_SWITCH = 4
+    "The state of the switches have changed."
+
+    EC_MKBP_EVENT_FINGERPRINT = 5
+    "New Fingerprint sensor event, the event data is fp_events bitmap."
+
+    EC_MKBP_EVENT_SYSRQ = 6
+    "Sysrq event: send emulated sysrq. The event data is sysrq, corresponding to the key to be pressed."
+
+    EC_MKBP_EVENT_HOST_EVENT64 = 7
+    "New 64-bit host event. The event data is 8 bytes of host event flags."
+
+    EC_MKBP_EVENT_CEC_EVENT = 8
+    "Notify the AP that something happened on CEC"
+
+    EC_MKBP_EVENT_CEC_MESSAGE = 9
+    "Send an incoming CEC message to the AP"
+
+    EC_MKBP_EVENT_DP_ALT_MODE_ENTERED = 10
+    "We have entered DisplayPort Alternate Mode on a Type-C port."
+
+    EC_MKBP_EVENT_ONLINE_CALIBRATION = 11
+    "New online calibration values are available."
+
+    EC_MKBP_EVENT_PCHG = 12
+    "Peripheral device charger event"
+
+
+# Buttons in EC_MKBP_EVENT_BUTTON
+EC_MKBP_POWER_BUTTON: Final = 0
+EC_MKBP_VOL_UP: Final = 1
+EC_MKBP_VOL_DOWN: Final = 2
+EC_MKBP_RECOVERY: Final = 3
+EC_MKBP_BRI_UP: Final = 4
+EC_MKBP_BRI_DOWN: Final = 5
+EC_MKBP_SCREEN_LOCK: Final = 6
+
+# Switches in EC_MKBP_EVENT_SWITCH
+EC_MKBP_LID_OPEN: Final = 0
+EC_MKBP_TABLET_MODE: Final = 1
+EC_MKBP_BASE_ATTACHED: Final = 2
+EC_MKBP_FRONT_PROXIMITY: Final = 3
+
+
+def parse_event(data: bytes) -> dict[str, EcMkbpEvent | int | bool | bytes | dict]:
+    """
+    Parse an MKBP event record. This is the event type byte followed by the event data,
+    as returned by `EC_CMD_GET_NEXT_EVENT` or read from `/dev/cros_ec`.
+    :param data: The raw event record.
+    :return: The event type, whether the EC has more events queued, and the decoded event data.
+    `data` is an int for bitmask events, a dict for sensor FIFO events and bytes for anything else.
+    """
+    if not data:
+        raise ValueError("Empty MKBP event")
+
+    raw_type = data[0] & EC_MKBP_EVENT_TYPE_MASK
+    payload = bytes(data[1:])
+    event_type = (
+        EcMkbpEvent(raw_type) if raw_type in EcMkbpEvent._value2member_map_ else raw_type
+    )
+
+    match event_type:
+        case (
+            EcMkbpEvent.EC_MKBP_EVENT_HOST_EVENT
+            | EcMkbpEvent.EC_MKBP_EVENT_BUTTON
+            | EcMkbpEvent.EC_MKBP_EVENT_SWITCH
+            | EcMkbpEvent.EC_MKBP_EVENT_FINGERPRINT
+            | EcMkbpEvent.EC_MKBP_EVENT_SYSRQ
+            | EcMkbpEvent.EC_MKBP_EVENT_CEC_EVENT
+        ):
+            decoded = struct.unpack_from("<I", payload)[0]
+        case EcMkbpEvent.EC_MKBP_EVENT_HOST_EVENT64:
+            decoded = struct.unpack_from("<Q", payload)[0]
+        case EcMkbpEvent.EC_MKBP_EVENT_SENSOR_FIFO:
+            # 3 reserved bytes, then ec_response_motion_sense_fifo_info
+            unpacked = struct.unpack_from("<3xHHIH", payload)
+            decoded = {
+                "size": unpacked[0],
+                "count": unpacked[1],
+                "timestamp": unpacked[2],
+                "total_lost": unpacked[3],
+            }
+        case _:
+            decoded = payload
+
+    return {
+        "event_type": event_type,
+        "has_more": bool(data[0] & EC_MKBP_HAS_MORE_EVENTS),
+        "data": decoded,
+    }
+
+
+# Size of the ec_response_get_next_data union for each command version
+_NEXT_EVENT_DATA_SIZE: Final = {0: 13, 1: 16, 2: 16, 3: 18}
+
+
+def get_next_event(ec: CrosEcClass, version: Literal[0, 1, 2, 3] = 0) -> dict | None:
+    """
+    Get the next pending MKBP event from the EC.
+    :param ec: The CrOS_EC object.
+    :param version: The command version to use. Newer versions can return larger events.
+    :return: The event parsed with `parse_event`, or None if there are no pending events.
+    """
+    try:
+        resp = ec.command(version, EC_CMD_GET_NEXT_EVENT, 0, 1 + _NEXT_EVENT_DATA_SIZE[version], warn=False)
+    except ECError as e:
+        # EC_CMD_GET_NEXT_EVENT throws EC_RES_UNAVAILABLE if there are no events
+        if e.status == EcStatus.EC_RES_UNAVAILABLE.value:
+            return None
+        raise e
+    return parse_event(resp)
+
+
+def drain_events(ec: CrosEcClass, max_events: int = 16, version: Literal[0, 1, 2, 3] = 0) -> list[dict]:
+    """
+    Get all pending MKBP events, stopping early once the EC reports it has no more queued.
+    :param ec: The CrOS_EC object.
+    :param max_events: The maximum number of events to fetch in one go.
+    :param version: The command version to use, see `get_next_event`.
+    :return: A list of events parsed with `parse_event`.
+    """
+    events = []
+    while len(events) < max_events:
+        event = get_next_event(ec, version)
+        if event is None:
+            break
+        events.append(event)
+        if not event["has_more"]:
+            break
+    return events
+
+
+EC_CMD_KEYBOARD_FACTORY_TEST: Final = 0x0068
+EC_CMD_MKBP_WAKE_MASK: Final = 0x0069
@@ -0,0 +1,399 @@
+"""
+Motion sense commands
+
+ECs with `cros_ec_python.commands.features.EcFeatureCode.EC_FEATURE_MOTION_SENSE_FIFO` buffer sensor samples,
+with timestamps, in a FIFO. `MotionSenseFifo` drains it in batches of the largest response the EC allows,
+into `array.array`s that can be used with NumPy without copying.
+
+## Example
+
+```python
+import numpy as np
+from cros_ec_python import get_cros_ec
+from cros_ec_python.commands.motion_sense import MotionSenseFifo
+
+ec = get_cros_ec()
+
+fifo = MotionSenseFifo(ec, watermark=32)
+fifo.configure([0], odr=100000, ec_rate=100)  # 100 Hz, batched every 100 ms
+
+for samples in fifo.follow(interval=0.1):
+    xyz = np.frombuffer(samples["data"], dtype=np.int16).reshape(-1, 3)
+    timestamps = np.frombuffer(samples["timestamp"], dtype=np.uint64)
+```
+"""
+
+import array
+import time
+from typing import Final, Iterator
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+EC_CMD_MOTION_SENSE_CMD: Final = 0x002B
+
+
+class MotionSenseCmd(Enum):
+    """Motion sense subcommands"""
+
+    MOTIONSENSE_CMD_DUMP = 0
+    "Dump the data of every sensor"
+
+    MOTIONSENSE_CMD_INFO = 1
+    "Info about a sensor"
+
+    MOTIONSENSE_CMD_EC_RATE = 2
+    "Get/set the rate the EC reports samples to the host, in milliseconds"
+
+    MOTIONSENSE_CMD_SENSOR_ODR = 3
+    "Get/set a sensor's output data rate, in millihertz"
+
+    MOTIONSENSE_CMD_SENSOR_RANGE = 4
+    "Get/set a sensor's range"
+
+    MOTIONSENSE_CMD_KB_WAKE_ANGLE = 5
+    "Get/set the lid angle the keyboard wakes the system at"
+
+    MOTIONSENSE_CMD_DATA = 6
+    "Read a sensor's last sample"
+
+    MOTIONSENSE_CMD_FIFO_INFO = 7
+    "Get the FIFO size, fill level and lost sample counts"
+
+    MOTIONSENSE_CMD_FIFO_FLUSH = 8
+    "Ask a sensor to flush its samples into the FIFO"
+
+    MOTIONSENSE_CMD_FIFO_READ = 9
+    "Read samples from the FIFO"
+
+    MOTIONSENSE_CMD_PERFORM_CALIB = 10
+    MOTIONSENSE_CMD_SENSOR_OFFSET = 11
+    MOTIONSENSE_CMD_LIST_ACTIVITIES = 12
+    MOTIONSENSE_CMD_SET_ACTIVITY = 13
+    MOTIONSENSE_CMD_LID_ANGLE = 14
+
+    MOTIONSENSE_CMD_FIFO_INT_ENABLE = 15
+    "Enable/disable FIFO events to the host"
+
+    MOTIONSENSE_CMD_SPOOF = 16
+    MOTIONSENSE_CMD_TABLET_MODE_LID_ANGLE = 17
+    MOTIONSENSE_CMD_SENSOR_SCALE = 18
+    MOTIONSENSE_CMD_ONLINE_CALIB_READ = 19
+    MOTIONSENSE_CMD_GET_ACTIVITY = 20
+
+
+class MotionSensorType(Enum):
+    """Motion sensor types"""
+
+    MOTIONSENSE_TYPE_ACCEL = 0
+    MOTIONSENSE_TYPE_GYRO = 1
+    MOTIONSENSE_TYPE_MAG = 2
+    MOTIONSENSE_TYPE_PROX = 3
+    MOTIONSENSE_TYPE_LIGHT = 4
+    MOTIONSENSE_TYPE_ACTIVITY = 5
+    MOTIONSENSE_TYPE_BARO = 6
+    MOTIONSENSE_TYPE_SYNC = 7
+    MOTIONSENSE_TYPE_LIGHT_RGB = 8
+
+
+class MotionSensorLocation(Enum):
+    """Motion sensor locations"""
+
+    MOTIONSENSE_LOC_BASE = 0
+    MOTIONSENSE_LOC_LID = 1
+    MOTIONSENSE_LOC_CAMERA = 2
+
+
+MOTION_SENSE_CMD_INFO_FLAG_ONLINE_CALIB: Final = BIT(0)
+"The sensor supports online calibration (v4 info flag)."
+
+EC_MOTION_SENSE_NO_VALUE: Final = -1
+"Pass as the data of a get/set subcommand to only get the value."
+
+MOTIONSENSE_SENSOR_FLAG_PRESENT: Final = BIT(0)
+MOTIONSENSE_SENSOR_FLAG_FLUSH: Final = BIT(2)
+"The entry marks the end of a flush requested with `motion_sense_fifo_flush`."
+MOTIONSENSE_SENSOR_FLAG_TIMESTAMP: Final = BIT(3)
+"The entry is a timestamp, for the samples that follow it."
+MOTIONSENSE_SENSOR_FLAG_WAKEUP: Final = BIT(4)
+MOTIONSENSE_SENSOR_FLAG_TABLET_MODE: Final = BIT(5)
+MOTIONSENSE_SENSOR_FLAG_ODR: Final = BIT(6)
+
+# struct ec_response_motion_sensor_data: flags, sensor_num, then 3 int16 of data or a 32 bit timestamp
+_SENSOR_DATA: Final = struct.Struct("<BB6s")
+
+
+def _version(ec: CrosEcClass) -> int:
+    return ec.capabilities.max_version(EC_CMD_MOTION_SENSE_CMD, 4) or 0
+
+
+def _motion_sense(ec: CrosEcClass, cmd: MotionSenseCmd, params: bytes, insize: int) -> bytes:
+    data = struct.pack("<B", cmd.value) + params
+    return ec.command(_version(ec), EC_CMD_MOTION_SENSE_CMD, len(data), insize, data, warn=False)
+
+
+def motion_sense_sensor_count(ec: CrosEcClass) -> UInt8:
+    """
+    Get the number of motion sensors.
+    :param ec: The CrOS_EC object.
+    :return: The number of sensors.
+    """
+    # Older versions ignore max_sensor_count and dump every sensor
+    resp = _motion_sense(
+        ec, MotionSenseCmd.MOTIONSENSE_CMD_DUMP, struct.pack("<B", 0), ec.capabilities.max_response_size
+    )
+    return struct.unpack_from("<xB", resp)[0]
+
+
+def motion_sense_info(ec: CrosEcClass, sensor_num: UInt8) -> dict[str, MotionSensorType | MotionSensorLocation | int]:
+    """
+    Get info about a sensor.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The sensor index.
+    :return: The sensor type and location (as raw ints if they are newer than this library), and chip.
+    Version 3 adds the minimum and maximum frequencies in millihertz, and the maximum number of samples in the FIFO.
+    Version 4 adds flags (MOTION_SENSE_CMD_INFO_FLAG_...).
+    """
+    version = _version(ec)
+    # The v3+ response isn't packed, so the frequencies are aligned to offset 4
+    resp = _motion_sense(
+        ec, MotionSenseCmd.MOTIONSENSE_CMD_INFO, struct.pack("<B", sensor_num), 20 if version >= 4 else 16
+    )
+    info = {
+        "type": MotionSensorType(resp[0]) if resp[0] in MotionSensorType._value2member_map_ else resp[0],
+        "location": MotionSensorLocation(resp[1]) if resp[1] in MotionSensorLocation._value2member_map_ else resp[1],
+        "chip": resp[2],
+    }
+    if version >= 3:
+        info["min_frequency"], info["max_frequency"], info["fifo_max_event_count"] = struct.unpack_from("<3I", resp, 4)
+    if version >= 4:
+        info["flags"] = struct.unpack_from("<I", resp, 16)[0]
+    return info
+
+
+def _sensor_value(ec: CrosEcClass, cmd: MotionSenseCmd, sensor_num: UInt8, value: Int32, roundup: bool) -> Int32:
+    resp = _motion_sense(ec, cmd, struct.pack("<BBxxi", sensor_num, roundup, value), 4)
+    return struct.unpack("<i", resp)[0]
+
+
+def motion_sense_odr(
+    ec: CrosEcClass, sensor_num: UInt8, odr: Int32 = EC_MOTION_SENSE_NO_VALUE, roundup: bool = True
+) -> Int32:
+    """
+    Get or set a sensor's output data rate.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The sensor index.
+    :param odr: The new rate in millihertz, or `EC_MOTION_SENSE_NO_VALUE` to only get it. 0 turns the sensor off.
+    :param roundup: Round up to the next rate the sensor supports, otherwise round down.
+    :return: The rate in millihertz.
+    """
+    return _sensor_value(ec, MotionSenseCmd.MOTIONSENSE_CMD_SENSOR_ODR, sensor_num, odr, roundup)
+
+
+def motion_sense_range(
+    ec: CrosEcClass, sensor_num: UInt8, value: Int32 = EC_MOTION_SENSE_NO_VALUE, roundup: bool = True
+) -> Int32:
+    """
+    Get or set a sensor's range.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The sensor index.
+    :param value: The new range (e.g. in g for accelerometers), or `EC_MOTION_SENSE_NO_VALUE` to only get it.
+    :param roundup: Round up to the next range the sensor supports, otherwise round down.
+    :return: The range.
+    """
+    return _sensor_value(ec, MotionSenseCmd.MOTIONSENSE_CMD_SENSOR_RANGE, sensor_num, value, roundup)
+
+
+def motion_sense_ec_rate(ec: CrosEcClass, sensor_num: UInt8, rate: Int32 = EC_MOTION_SENSE_NO_VALUE) -> Int32:
+    """
+    Get or set how often the EC reports a sensor's samples to the host.
+    Samples are held in the FIFO in between, so a longer rate means larger, less frequent batches.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The sensor index.
+    :param rate: The new rate in milliseconds, or `EC_MOTION_SENSE_NO_VALUE` to only get it.
+    :return: The rate in milliseconds.
+    """
+    return _sensor_value(ec, MotionSenseCmd.MOTIONSENSE_CMD_EC_RATE, sensor_num, rate, False)
+
+
+def motion_sense_fifo_info(ec: CrosEcClass, sensor_count: int | None = None) -> dict[str, int | list[int]]:
+    """
+    Get the state of the FIFO.
+    :param ec: The CrOS_EC object.
+    :param sensor_count: The number of sensors, to read lost counts for. Default is `motion_sense_sensor_count`.
+    :return: The FIFO size and number of entries in it, the EC timestamp in microseconds,
+    and the number of samples lost in total and for each sensor since the last call.
+    """
+    if sensor_count is None:
+        sensor_count = motion_sense_sensor_count(ec)
+    resp = _motion_sense(ec, MotionSenseCmd.MOTIONSENSE_CMD_FIFO_INFO, b"", 10 + 2 * sensor_count)
+    return _unpack_fifo_info(resp)
+
+
+def _unpack_fifo_info(resp: bytes) -> dict[str, int | list[int]]:
+    size, count, timestamp, total_lost = struct.unpack_from("<HHIH", resp)
+    return {
+        "size": size,
+        "count": count,
+        "timestamp": timestamp,
+        "total_lost": total_lost,
+        "lost": list(struct.unpack_from(f"<{(len(resp) - 10) // 2}H", resp, 10)),
+    }
+
+
+def motion_sense_fifo_flush(ec: CrosEcClass, sensor_num: UInt8) -> None:
+    """
+    Ask a sensor to put its pending samples into the FIFO now.
+    A sample with `MOTIONSENSE_SENSOR_FLAG_FLUSH` marks the end of them.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The sensor index.
+    """
+    _motion_sense(ec, MotionSenseCmd.MOTIONSENSE_CMD_FIFO_FLUSH, struct.pack("<B", sensor_num), 10)
+
+
+def motion_sense_fifo_int_enable(ec: CrosEcClass, enable: bool | None = None) -> bool:
+    """
+    Get or set whether the EC sends MKBP sensor FIFO events to the host.
+    :param ec: The CrOS_EC object.
+    :param enable: The new setting, or None to only get it.
+    :return: True if events are enabled.
+    """
+    value = EC_MOTION_SENSE_NO_VALUE if enable is None else int(enable)
+    resp = _motion_sense(ec, MotionSenseCmd.MOTIONSENSE_CMD_FIFO_INT_ENABLE, struct.pack("<b", value), 4)
+    return bool(struct.unpack("<i", resp)[0])
+
+
+def motion_sense_fifo_read(ec: CrosEcClass, max_entries: UInt32 | None = None) -> list[tuple[UInt8, UInt8, bytes]]:
+    """
+    Read raw entries from the FIFO, see `MotionSenseFifo` to read them as arrays.
+    :param ec: The CrOS_EC object.
+    :param max_entries: The maximum number of entries. Default is as many as fit in the largest response.
+    :return: A list of `(flags, sensor_num, data)` entries.
+    `data` is 3 little endian int16, or a uint32 timestamp if flags has `MOTIONSENSE_SENSOR_FLAG_TIMESTAMP`.
+    """
+    fit = (ec.capabilities.max_response_size - 4) // _SENSOR_DATA.size
+    max_entries = fit if max_entries is None else min(max_entries, fit)
+    params = struct.pack("<I", max_entries)
+    resp = _motion_sense(ec, MotionSenseCmd.MOTIONSENSE_CMD_FIFO_READ, params, 4 + max_entries * _SENSOR_DATA.size)
+    count = struct.unpack_from("<I", resp)[0]
+    return list(_SENSOR_DATA.iter_unpack(resp[4: 4 + count * _SENSOR_DATA.size]))
+
+
+class MotionSenseFifo:
+    """
+    Drains the motion sense FIFO in batches.
+
+    Samples are returned as a dict of `array.array`s, which support the buffer protocol:
+    * `sensor` (`B`): the sensor index of each sample
+    * `timestamp` (`Q`): the EC timestamp of each sample in microseconds, unwrapped to 64 bits
+    * `data` (`h`): x, y and z of each sample, interleaved
+    """
+
+    def __init__(self, ec: CrosEcClass, watermark: int = 1):
+        """
+        Create a FIFO reader.
+        :param ec: The CrOS_EC object.
+        :param watermark: The number of entries the FIFO must hold before `poll` drains it.
+        """
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.watermark: int = watermark
+        """The number of entries the FIFO must hold before `poll` drains it."""
+
+        self.lost: int = 0
+        """The number of samples the EC has dropped since this reader was created."""
+
+        self.sensor_count: int = motion_sense_sensor_count(ec)
+        """The number of sensors."""
+
+        self._timestamp: int | None = None
+
+    def configure(self, sensors: list[int], odr: Int32, ec_rate: Int32 | None = None) -> dict[int, Int32]:
+        """
+        Set the sample rate of sensors.
+        :param sensors: The sensor indexes.
+        :param odr: The output data rate in millihertz, 0 turns the sensors off.
+        :param ec_rate: How often the EC reports samples in milliseconds, None leaves it alone.
+        :return: The output data rate each sensor was set to, as the sensor may not support the exact rate.
+        """
+        rates = {}
+        with self.ec.batch(stop_on_error=True) as b:
+            for sensor in sensors:
+                rates[sensor] = b.call(motion_sense_odr, sensor, odr)
+                if ec_rate is not None:
+                    b.call(motion_sense_ec_rate, sensor, ec_rate)
+        return {sensor: future.result() for sensor, future in rates.items()}
+
+    def _empty(self) -> dict[str, array.array]:
+        return {"sensor": array.array("B"), "timestamp": array.array("Q"), "data": array.array("h")}
+
+    def _append(self, samples: dict[str, array.array], entries: list[tuple[UInt8, UInt8, bytes]]) -> None:
+        for flags, sensor, data in entries:
+            # Flush and ODR change markers are also timestamps
+            if flags & MOTIONSENSE_SENSOR_FLAG_TIMESTAMP:
+                ts = struct.unpack_from("<xxI", data)[0]
+                if self._timestamp is None:
+                    self._timestamp = ts
+                else:
+                    # The EC's timestamp is 32 bits and wraps every ~71 minutes
+                    self._timestamp += (ts - self._timestamp) & 0xFFFFFFFF
+                continue
+            samples["sensor"].append(sensor)
+            samples["timestamp"].append(0 if self._timestamp is None else self._timestamp)
+            samples["data"].frombytes(data)
+
+    def read(self, count: int | None = None) -> dict[str, array.array]:
+        """
+        Drain the FIFO, in reads of the largest response the EC allows.
+        :param count: The number of entries to read. Default is the number in the FIFO.
+        :return: The samples, see `MotionSenseFifo`.
+        """
+        if count is None:
+            info = motion_sense_fifo_info(self.ec, self.sensor_count)
+            self.lost += info["total_lost"]
+            count = info["count"]
+
+        samples = self._empty()
+        while count > 0:
+            entries = motion_sense_fifo_read(self.ec, count)
+            if not entries:
+                break
+            self._append(samples, entries)
+            count -= len(entries)
+        return samples
+
+    def poll(self) -> dict[str, array.array] | None:
+        """
+        Check the FIFO, and drain it if it holds at least `watermark` entries.
+        :return: The samples, or None if the watermark wasn't reached.
+        """
+        info = motion_sense_fifo_info(self.ec, self.sensor_count)
+        self.lost += info["total_lost"]
+        if info["count"] < self.watermark:
+            return None
+        return self.read(info["count"])
+
+    def flush(self, sensors: list[int] | None = None) -> dict[str, array.array]:
+        """
+        Flush pending samples into the FIFO, then drain it.
+        :param sensors: The sensor indexes to flush. Default is every sensor.
+        :return: The samples.
+        """
+        with self.ec.batch(stop_on_error=True) as b:
+            for sensor in range(self.sensor_count) if sensors is None else sensors:
+                b.call(motion_sense_fifo_flush, sensor)
+        return self.read()
+
+    def follow(self, interval: float = 0.1) -> Iterator[dict[str, array.array]]:
+        """
+        Poll the FIFO forever, yielding a batch each time the watermark is reached.
+        :param interval: Seconds between polls.
+        :return: An iterator of samples.
+        """
+        while True:
+            samples = self.poll()
+            if samples is not None:
+                yield samples
+            time.sleep(interval)
@@ -86,10 +86,10 @@ def pwm_set_fan_duty(ec: CrosEcClass, percent: UInt32, idx: UInt8 | None = None)
     """
     if idx is None:
         data = struct.pack("<I", percent)
-        ec.command(0, EC_CMD_PWM_SET_FAN_DUTY, 1, 0, data)
+        ec.command(0, EC_CMD_PWM_SET_FAN_DUTY, 4, 0, data)
     else:
         data = struct.pack("<IB", percent, idx)
-        ec.command(1, EC_CMD_PWM_SET_FAN_DUTY, 2, 0, data)
+        ec.command(1, EC_CMD_PWM_SET_FAN_DUTY, 5, 0, data)
 
 
 EC_CMD_PWM_SET_DUTY: Final = 0x0025
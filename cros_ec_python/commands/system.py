@@ -0,0 +1,202 @@
+"""
+Miscellaneous system commands.
+"""
+
+import hashlib
+import time
+from typing import Final
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..exceptions import ECError
+from .features import EcFeatureCode
+from .flash import flash_iter
+
+EC_CMD_VBOOT_HASH: Final = 0x002A
+
+
+class EcVbootHashCmd(Enum):
+    """Vboot hash subcommands"""
+
+    EC_VBOOT_HASH_GET = 0
+    "Get current hash status"
+
+    EC_VBOOT_HASH_ABORT = 1
+    "Abort calculating current hash"
+
+    EC_VBOOT_HASH_START = 2
+    "Start computing a new hash"
+
+    EC_VBOOT_HASH_RECALC = 3
+    "Synchronously compute a new hash"
+
+
+class EcVbootHashType(Enum):
+    """Vboot hash types"""
+
+    EC_VBOOT_HASH_TYPE_SHA256 = 0
+    "SHA-256"
+
+
+class EcVbootHashStatus(Enum):
+    """Vboot hash status"""
+
+    EC_VBOOT_HASH_STATUS_NONE = 0
+    "No hash (not started, or aborted)"
+
+    EC_VBOOT_HASH_STATUS_DONE = 1
+    "Finished computing a hash"
+
+    EC_VBOOT_HASH_STATUS_BUSY = 2
+    "Busy computing a hash"
+
+
+EC_VBOOT_HASH_OFFSET_RO: Final = 0xFFFFFFFE
+"Special offset to hash the read-only image, the size is ignored."
+
+EC_VBOOT_HASH_OFFSET_ACTIVE: Final = 0xFFFFFFFD
+"Special offset to hash the active read-write image, the size is ignored."
+
+EC_VBOOT_HASH_OFFSET_UPDATE: Final = 0xFFFFFFFC
+"Special offset to hash the updatable read-write image, the size is ignored."
+
+_VBOOT_HASH_FMT: Final = "<BBBxII64s"
+
+
+def vboot_hash(
+    ec: CrosEcClass,
+    cmd: EcVbootHashCmd,
+    offset: UInt32 = 0,
+    size: UInt32 = 0,
+    nonce: bytes = b"",
+    hash_type: EcVbootHashType = EcVbootHashType.EC_VBOOT_HASH_TYPE_SHA256,
+) -> dict[str, EcVbootHashStatus | EcVbootHashType | UInt32 | bytes] | None:
+    """
+    Send a vboot hash subcommand. See `vboot_hash_region` to hash a region and wait for the result.
+    :param ec: The CrOS_EC object.
+    :param cmd: The subcommand.
+    :param offset: Byte offset in flash to hash from, or one of the EC_VBOOT_HASH_OFFSET_... special offsets.
+    :param size: Number of bytes to hash.
+    :param nonce: Data to hash before the flash contents, up to 64 bytes.
+    :param hash_type: The hash type.
+    :return: The hash status, hash type, offset, size and digest for EC_VBOOT_HASH_GET and EC_VBOOT_HASH_RECALC.
+    EC_VBOOT_HASH_START and EC_VBOOT_HASH_ABORT don't respond with anything, so they return None.
+    """
+    if len(nonce) > 64:
+        raise ValueError("Nonce can be at most 64 bytes")
+    data = struct.pack(_VBOOT_HASH_FMT, cmd.value, hash_type.value, len(nonce), offset, size, nonce)
+    if cmd in (EcVbootHashCmd.EC_VBOOT_HASH_START, EcVbootHashCmd.EC_VBOOT_HASH_ABORT):
+        ec.command(0, EC_CMD_VBOOT_HASH, len(data), 0, data)
+        return None
+    resp = ec.command(0, EC_CMD_VBOOT_HASH, len(data), struct.calcsize(_VBOOT_HASH_FMT), data)
+    unpacked = struct.unpack(_VBOOT_HASH_FMT, resp)
+    return {
+        "status": EcVbootHashStatus(unpacked[0]),
+        "hash_type": EcVbootHashType(unpacked[1]),
+        "offset": unpacked[3],
+        "size": unpacked[4],
+        "digest": unpacked[5][: unpacked[2]],
+    }
+
+
+def vboot_hash_wait(
+    ec: CrosEcClass, timeout: float = 10, initial_delay: float = 0.01, max_delay: float = 0.5
+) -> dict[str, EcVbootHashStatus | EcVbootHashType | UInt32 | bytes]:
+    """
+    Wait for the EC to finish computing a hash, polling with exponential backoff.
+    :param ec: The CrOS_EC object.
+    :param timeout: Seconds to wait before giving up.
+    :param initial_delay: Seconds before the first poll, doubled after each poll.
+    :param max_delay: The longest time between polls in seconds.
+    :return: The hash status, in the format returned by `vboot_hash`.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        resp = vboot_hash(ec, EcVbootHashCmd.EC_VBOOT_HASH_GET)
+        if resp["status"] != EcVbootHashStatus.EC_VBOOT_HASH_STATUS_BUSY:
+            return resp
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("EC took too long to compute the hash")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def vboot_hash_region(
+    ec: CrosEcClass, offset: UInt32, size: UInt32 = 0, nonce: bytes = b"", reuse: bool = False, timeout: float = 10
+) -> bytes:
+    """
+    Hash a flash region on the EC with SHA-256, and wait for the result.
+    :param ec: The CrOS_EC object.
+    :param offset: Byte offset in flash to hash from, or one of the EC_VBOOT_HASH_OFFSET_... special offsets.
+    :param size: Number of bytes to hash.
+    :param nonce: Data to hash before the flash contents, up to 64 bytes.
+    :param reuse: Use the EC's last hash if it is of the same region, e.g. the one computed at boot.
+    The EC doesn't report whether that hash used a nonce, so only use this if nothing else hashes with a nonce.
+    :param timeout: Seconds to wait for the hash.
+    :return: The digest.
+    """
+    if reuse and not nonce:
+        resp = vboot_hash_wait(ec, timeout)
+        if (resp["status"] == EcVbootHashStatus.EC_VBOOT_HASH_STATUS_DONE
+                and (resp["offset"], resp["size"]) == (offset, size)):
+            return resp["digest"]
+
+    try:
+        vboot_hash(ec, EcVbootHashCmd.EC_VBOOT_HASH_START, offset, size, nonce)
+    except ECError as e:
+        if e.status != EcStatus.EC_RES_BUSY.value:
+            raise e
+        # Something else started a hash, wait for it then start ours
+        vboot_hash_wait(ec, timeout)
+        vboot_hash(ec, EcVbootHashCmd.EC_VBOOT_HASH_START, offset, size, nonce)
+
+    resp = vboot_hash_wait(ec, timeout)
+    if resp["status"] != EcVbootHashStatus.EC_VBOOT_HASH_STATUS_DONE:
+        raise IOError("EC hash was aborted")
+    return resp["digest"]
+
+
+def verify_image(
+    ec: CrosEcClass, expected: bytes | str, offset: UInt32, size: UInt32, nonce: bytes = b"", timeout: float = 10
+) -> bool:
+    """
+    Check a flash region matches an expected SHA-256 digest.
+    The EC computes the hash itself if it supports EC_CMD_VBOOT_HASH, otherwise the region is read back and hashed here.
+    :param ec: The CrOS_EC object.
+    :param expected: The expected digest, as bytes or a hex string.
+    :param offset: Byte offset of the region in flash, see `cros_ec_python.commands.flash.flash_region_info`.
+    :param size: Size of the region in bytes.
+    :param nonce: Data to hash before the flash contents, up to 64 bytes.
+    :param timeout: Seconds to wait for the EC to compute the hash.
+    :return: True if the region matches.
+    """
+    if isinstance(expected, str):
+        expected = bytes.fromhex(expected)
+
+    if ec.capabilities.supports(EC_CMD_VBOOT_HASH):
+        return vboot_hash_region(ec, offset, size, nonce, timeout=timeout) == expected
+
+    if not ec.capabilities.has_feature(EcFeatureCode.EC_FEATURE_FLASH):
+        raise NotImplementedError("EC supports neither hashing nor reading flash")
+    digest = hashlib.sha256(nonce)
+    for chunk in flash_iter(ec, offset, size):
+        digest.update(chunk)
+    return digest.digest() == expected
+
+
+EC_CMD_RESEND_RESPONSE: Final = 0x00DB
+
+
+def resend_response(ec: CrosEcClass, insize: Int32 = 0) -> bytes:
+    """
+    Get the result of the last command that returned EC_RES_IN_PROGRESS, once it has finished
+    (see `cros_ec_python.commands.general.get_comms_status`).
+    The result is raised as an `cros_ec_python.exceptions.ECError` if the command failed.
+    :param ec: The CrOS_EC object.
+    :param insize: Max number of bytes to accept from the EC, the response size of the original command.
+    :return: The response of the original command.
+    """
+    return ec.command(0, EC_CMD_RESEND_RESPONSE, 0, insize, warn=False)
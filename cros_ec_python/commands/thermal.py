@@ -10,13 +10,156 @@ Version 1 separates the CPU thermal limits from the fan control.
 from typing import Final
 from enum import Enum, auto
 import struct
+import weakref
 from ..baseclass import CrosEcClass
 from ..constants.COMMON import *
-from .memmap import get_temps
+from .memmap import get_temps, get_temp_indexes
 
 EC_CMD_THERMAL_SET_THRESHOLD: Final = 0x0050
 EC_CMD_THERMAL_GET_THRESHOLD: Final = 0x0051
 
+
+def thermal_get_threshold(ec: CrosEcClass, sensor_type: "EcTempSensorType | int", threshold_id: UInt8) -> UInt16:
+    """
+    Get a thermal threshold (v0 command). The v0 thresholds are opaque, you have to know what they are for.
+    :param ec: The CrOS_EC object.
+    :param sensor_type: The sensor type.
+    :param threshold_id: The threshold index.
+    :return: The threshold in Kelvin.
+    """
+    if isinstance(sensor_type, EcTempSensorType):
+        sensor_type = sensor_type.value
+    data = struct.pack("<BB", sensor_type, threshold_id)
+    resp = ec.command(0, EC_CMD_THERMAL_GET_THRESHOLD, 2, 2, data)
+    return struct.unpack("<H", resp)[0]
+
+
+def thermal_set_threshold(
+    ec: CrosEcClass, sensor_type: "EcTempSensorType | int", threshold_id: UInt8, value: UInt16
+) -> None:
+    """
+    Set a thermal threshold (v0 command).
+    :param ec: The CrOS_EC object.
+    :param sensor_type: The sensor type.
+    :param threshold_id: The threshold index.
+    :param value: The threshold in Kelvin.
+    """
+    if isinstance(sensor_type, EcTempSensorType):
+        sensor_type = sensor_type.value
+    data = struct.pack("<BBH", sensor_type, threshold_id, value)
+    ec.command(0, EC_CMD_THERMAL_SET_THRESHOLD, 4, 0, data)
+
+
+class EcTempThresholds(Enum):
+    """Thresholds in `temp_host` and `temp_host_release` of the v1 thermal config."""
+
+    EC_TEMP_THRESH_WARN = 0
+    EC_TEMP_THRESH_HIGH = auto()
+    EC_TEMP_THRESH_HALT = auto()
+
+    EC_TEMP_THRESH_COUNT = auto()
+
+
+# struct ec_thermal_config: temp_host[3], temp_host_release[3], temp_fan_off, temp_fan_max
+_THERMAL_CONFIG_FMT: Final = f"<{EcTempThresholds.EC_TEMP_THRESH_COUNT.value * 2 + 2}I"
+
+
+def _unpack_thermal_config(data: bytes) -> dict[str, list[UInt32] | UInt32]:
+    count = EcTempThresholds.EC_TEMP_THRESH_COUNT.value
+    unpacked = struct.unpack(_THERMAL_CONFIG_FMT, data)
+    return {
+        "temp_host": list(unpacked[:count]),
+        "temp_host_release": list(unpacked[count:count * 2]),
+        "temp_fan_off": unpacked[count * 2],
+        "temp_fan_max": unpacked[count * 2 + 1],
+    }
+
+
+def thermal_get_config(ec: CrosEcClass, sensor_num: UInt32) -> dict[str, list[UInt32] | UInt32]:
+    """
+    Get the thermal config of a sensor (v1 command).
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The temperature sensor index.
+    :return: The thresholds in Kelvin. `temp_host` and `temp_host_release` are indexed by `EcTempThresholds`,
+    `temp_fan_off` is where no active cooling is needed, and `temp_fan_max` is where max active cooling is needed.
+    """
+    data = struct.pack("<I", sensor_num)
+    resp = ec.command(1, EC_CMD_THERMAL_GET_THRESHOLD, 4, struct.calcsize(_THERMAL_CONFIG_FMT), data)
+    return _unpack_thermal_config(resp)
+
+
+def thermal_set_config(ec: CrosEcClass, sensor_num: UInt32, config: dict[str, list[UInt32] | UInt32]) -> None:
+    """
+    Set the thermal config of a sensor (v1 command). Use `thermal_get_config` first to get the current config.
+    :param ec: The CrOS_EC object.
+    :param sensor_num: The temperature sensor index.
+    :param config: The thresholds in Kelvin, in the format returned by `thermal_get_config`.
+    """
+    data = struct.pack(
+        "<I" + _THERMAL_CONFIG_FMT[1:],
+        sensor_num,
+        *config["temp_host"],
+        *config["temp_host_release"],
+        config["temp_fan_off"],
+        config["temp_fan_max"],
+    )
+    ec.command(1, EC_CMD_THERMAL_SET_THRESHOLD, len(data), 0, data)
+    if (cached := _thermal_configs.get(ec)) is not None:
+        cached[sensor_num] = _copy_thermal_config(config)
+
+
+# Last known thermal config of each EC, by sensor
+_thermal_configs: "weakref.WeakKeyDictionary[CrosEcClass, dict[int, dict]]" = weakref.WeakKeyDictionary()
+
+
+def _copy_thermal_config(config: dict[str, list[UInt32] | UInt32]) -> dict[str, list[UInt32] | UInt32]:
+    return {key: list(value) if isinstance(value, list) else value for key, value in config.items()}
+
+
+def thermal_get_configs(
+    ec: CrosEcClass, sensors: list[int] | None = None, refresh: bool = False
+) -> dict[int, dict[str, list[UInt32] | UInt32]]:
+    """
+    Get the thermal config of every sensor (v1 command). This can be used as a snapshot for `thermal_apply_configs`.
+
+    The configs are read in a single batch, and cached, so later calls don't talk to the EC unless `refresh` is set.
+    The cache is updated by `thermal_set_config` and `thermal_apply_configs`.
+    :param ec: The CrOS_EC object.
+    :param sensors: The sensor indexes to get. Default is every sensor present in the memmap.
+    :param refresh: Read the configs from the EC, even if they are cached.
+    :return: A copy of each sensor's config, in the format returned by `thermal_get_config`.
+    """
+    if sensors is None:
+        sensors = get_temp_indexes(ec)
+
+    cached = _thermal_configs.setdefault(ec, {})
+    missing = sensors if refresh else [sensor for sensor in sensors if sensor not in cached]
+    if missing:
+        with ec.batch(stop_on_error=True) as b:
+            futures = {sensor: b.call(thermal_get_config, sensor) for sensor in missing}
+        for sensor, future in futures.items():
+            cached[sensor] = future.result()
+
+    return {sensor: _copy_thermal_config(cached[sensor]) for sensor in sensors}
+
+
+def thermal_apply_configs(ec: CrosEcClass, configs: dict[int, dict[str, list[UInt32] | UInt32]]) -> list[int]:
+    """
+    Set the thermal config of multiple sensors (v1 command), only sending the sensors that have changed.
+    Pass a snapshot from `thermal_get_configs` to restore it.
+    :param ec: The CrOS_EC object.
+    :param configs: The config for each sensor index, in the format returned by `thermal_get_config`.
+    :return: The sensor indexes that were changed.
+    """
+    current = thermal_get_configs(ec, list(configs))
+    changed = [sensor for sensor, config in configs.items() if config != current[sensor]]
+    if changed:
+        with ec.batch(stop_on_error=True) as b:
+            for sensor in changed:
+                b.call(thermal_set_config, sensor, configs[sensor])
+    return changed
+
+
 EC_CMD_THERMAL_AUTO_FAN_CTRL: Final = 0x0052
 
 
@@ -0,0 +1,288 @@
+"""
+USB-PD commands
+
+`UsbPdMonitor` reads the power info and status of every port in one batch,
+and reports only the ports that changed since the previous read.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec
+from cros_ec_python.commands.usb import UsbPdMonitor
+
+ec = get_cros_ec()
+
+for changes in UsbPdMonitor(ec).follow(interval=1):
+    for port, info in changes.items():
+        print(port, info["power"]["role"], info["power"]["max_power"])
+```
+"""
+
+import time
+from typing import Final, Iterator, Literal
+from enum import Enum
+import struct
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+EC_CMD_USB_PD_CONTROL: Final = 0x0101
+
+PD_CTRL_RESP_ENABLED_COMMS: Final = BIT(0)
+"Communication enabled"
+
+PD_CTRL_RESP_ENABLED_CONNECTED: Final = BIT(1)
+"Device connected"
+
+PD_CTRL_RESP_ENABLED_PD_CAPABLE: Final = BIT(2)
+"Partner is PD capable"
+
+PD_CTRL_RESP_ROLE_POWER: Final = BIT(0)
+"0=SNK/1=SRC"
+
+PD_CTRL_RESP_ROLE_DATA: Final = BIT(1)
+"0=UFP/1=DFP"
+
+PD_CTRL_RESP_ROLE_VCONN: Final = BIT(2)
+"Vconn status"
+
+PD_CTRL_RESP_ROLE_DR_POWER: Final = BIT(3)
+"Partner is dual-role power"
+
+PD_CTRL_RESP_ROLE_DR_DATA: Final = BIT(4)
+"Partner is dual-role data"
+
+PD_CTRL_RESP_ROLE_USB_COMM: Final = BIT(5)
+"Partner is USB comms capable"
+
+PD_CTRL_RESP_ROLE_UNCONSTRAINED: Final = BIT(6)
+"Partner has unconstrained power"
+
+
+def usb_pd_control(
+    ec: CrosEcClass, port: UInt8, role: UInt8 = 0, mux: UInt8 = 0, swap: UInt8 = 0,
+    version: Literal[0, 1, 2] | None = None
+) -> dict[str, int | str]:
+    """
+    Get the status of a USB-PD port, optionally changing its role, mux or swapping roles.
+    The defaults leave the port alone.
+    :param ec: The CrOS_EC object.
+    :param port: The port number.
+    :param role: The role to set, 0 for no change.
+    :param mux: The mux to set, 0 for no change.
+    :param swap: The swap to request, 0 for none.
+    :param version: The command version to use. Default is the highest supported.
+    :return: The enabled flags (PD_CTRL_RESP_ENABLED_...), role, polarity and state.
+    Version 0 returns the raw role and state numbers, version 1 returns role flags (PD_CTRL_RESP_ROLE_...)
+    and the state name, and version 2 adds the CC state, DP pin mode, control flags and cable speed and generation.
+    """
+    if version is None:
+        version = ec.capabilities.max_version(EC_CMD_USB_PD_CONTROL, 2) or 0
+    data = struct.pack("<BBBB", port, role, mux, swap)
+    match version:
+        case 0:
+            resp = ec.command(version, EC_CMD_USB_PD_CONTROL, len(data), 4, data)
+            unpacked = struct.unpack("<BBBB", resp)
+            return {
+                "enabled": unpacked[0],
+                "role": unpacked[1],
+                "polarity": unpacked[2],
+                "state": unpacked[3],
+            }
+        case 1:
+            resp = ec.command(version, EC_CMD_USB_PD_CONTROL, len(data), 35, data)
+            unpacked = struct.unpack("<BBB32s", resp)
+        case 2:
+            resp = ec.command(version, EC_CMD_USB_PD_CONTROL, len(data), 41, data)
+            unpacked = struct.unpack("<BBB32sBBxBBB", resp)
+        case _:
+            raise NotImplementedError
+    status = {
+        "enabled": unpacked[0],
+        "role": unpacked[1],
+        "polarity": unpacked[2],
+        "state": unpacked[3].decode("utf-8", errors="replace").split("\x00", 1)[0],
+    }
+    if version >= 2:
+        status["cc_state"] = unpacked[4]
+        status["dp_mode"] = unpacked[5]
+        status["control_flags"] = unpacked[6]
+        status["cable_speed"] = unpacked[7]
+        status["cable_gen"] = unpacked[8]
+    return status
+
+
+EC_CMD_USB_PD_PORTS: Final = 0x0102
+
+
+def usb_pd_ports(ec: CrosEcClass) -> UInt8:
+    """
+    Get the number of USB-PD ports.
+    :param ec: The CrOS_EC object.
+    :return: The number of ports.
+    """
+    resp = ec.command(0, EC_CMD_USB_PD_PORTS, 0, 1)
+    return resp[0]
+
+
+EC_CMD_USB_PD_POWER_INFO: Final = 0x0103
+
+PD_POWER_CHARGING_PORT: Final = 0xFF
+"Use as the port number to get the info of the port that is charging."
+
+
+class UsbPowerRole(Enum):
+    """USB power roles"""
+
+    USB_PD_PORT_POWER_DISCONNECTED = 0
+    "Nothing connected"
+
+    USB_PD_PORT_POWER_SOURCE = 1
+    "Supplying power"
+
+    USB_PD_PORT_POWER_SINK = 2
+    "Charging from the port"
+
+    USB_PD_PORT_POWER_SINK_NOT_CHARGING = 3
+    "Sink, but not charging from the port"
+
+
+class UsbChargeType(Enum):
+    """USB charger types"""
+
+    USB_CHG_TYPE_NONE = 0
+    "No charger"
+
+    USB_CHG_TYPE_PD = 1
+    "USB Power Delivery"
+
+    USB_CHG_TYPE_C = 2
+    "USB Type-C current"
+
+    USB_CHG_TYPE_PROPRIETARY = 3
+    "Proprietary charger"
+
+    USB_CHG_TYPE_BC12_DCP = 4
+    "BC1.2 dedicated charging port"
+
+    USB_CHG_TYPE_BC12_CDP = 5
+    "BC1.2 charging downstream port"
+
+    USB_CHG_TYPE_BC12_SDP = 6
+    "BC1.2 standard downstream port"
+
+    USB_CHG_TYPE_OTHER = 7
+    "Other charger"
+
+    USB_CHG_TYPE_VBUS = 8
+    "VBUS only"
+
+    USB_CHG_TYPE_UNKNOWN = 9
+    "Unknown charger"
+
+    USB_CHG_TYPE_DEDICATED = 10
+    "Dedicated charger"
+
+
+def usb_pd_power_info(ec: CrosEcClass, port: UInt8) -> dict[str, UsbPowerRole | UsbChargeType | int]:
+    """
+    Get the power info of a USB-PD port.
+    :param ec: The CrOS_EC object.
+    :param port: The port number, or PD_POWER_CHARGING_PORT.
+    :return: The power role, charger type, dual role, the max and current voltage (mV),
+    the max and limited current (mA), and the max power (uW).
+    The role and type are left as numbers if they aren't known.
+    """
+    data = struct.pack("<B", port)
+    resp = ec.command(0, EC_CMD_USB_PD_POWER_INFO, len(data), 16, data)
+    unpacked = struct.unpack("<BBBxHHHHI", resp)
+    return {
+        "role": UsbPowerRole(unpacked[0]) if unpacked[0] in UsbPowerRole._value2member_map_ else unpacked[0],
+        "type": UsbChargeType(unpacked[1]) if unpacked[1] in UsbChargeType._value2member_map_ else unpacked[1],
+        "dualrole": unpacked[2],
+        "voltage_max": unpacked[3],
+        "voltage_now": unpacked[4],
+        "current_max": unpacked[5],
+        "current_lim": unpacked[6],
+        "max_power": unpacked[7],
+    }
+
+
+class UsbPdMonitor:
+    """
+    Reads every USB-PD port in one batch, and reports the ports whose contract, role or power changed.
+
+    Each port's info is a dict with `power` from `usb_pd_power_info`, and `status` from `usb_pd_control`.
+    """
+
+    def __init__(self, ec: CrosEcClass, status: bool = True, voltage_tolerance: int = 500):
+        """
+        Create a USB-PD monitor.
+        :param ec: The CrOS_EC object.
+        :param status: Also read the status of each port, with `usb_pd_control`.
+        :param voltage_tolerance: How far (mV) the measured voltage can drift from the last reported value
+        before it counts as a change. Every other value is compared exactly.
+        """
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.status: bool = status
+        """Also read the status of each port."""
+
+        self.voltage_tolerance: int = voltage_tolerance
+        """How far (mV) the measured voltage can drift before it counts as a change."""
+
+        self.port_count: int = usb_pd_ports(ec)
+        """The number of ports."""
+
+        self.ports: dict[int, dict[str, dict]] = {}
+        """The last reported info of each port."""
+
+    def read(self) -> dict[int, dict[str, dict]]:
+        """
+        Read every port, without checking for changes.
+        :return: The info of each port by port number.
+        """
+        power = {}
+        status = {}
+        with self.ec.batch(stop_on_error=True) as b:
+            for port in range(self.port_count):
+                power[port] = b.call(usb_pd_power_info, port)
+                if self.status:
+                    status[port] = b.call(usb_pd_control, port)
+        return {
+            port: {"power": power[port].result(), "status": status[port].result() if self.status else {}}
+            for port in range(self.port_count)
+        }
+
+    def _changed(self, old: dict[str, dict], new: dict[str, dict]) -> bool:
+        if old["status"] != new["status"]:
+            return True
+        old_power = dict(old["power"])
+        new_power = dict(new["power"])
+        if abs(old_power.pop("voltage_now") - new_power.pop("voltage_now")) > self.voltage_tolerance:
+            return True
+        return old_power != new_power
+
+    def poll(self) -> dict[int, dict[str, dict]]:
+        """
+        Read every port, and keep the ones that changed. The first poll reports every port.
+        :return: The info of each changed port by port number, empty if nothing changed.
+        """
+        changes = {
+            port: info for port, info in self.read().items()
+            if port not in self.ports or self._changed(self.ports[port], info)
+        }
+        self.ports.update(changes)
+        return changes
+
+    def follow(self, interval: float = 1) -> Iterator[dict[int, dict[str, dict]]]:
+        """
+        Poll forever, yielding only when a port has changed.
+        :param interval: Seconds between polls.
+        :return: An iterator of changes, see `poll`.
+        """
+        while True:
+            changes = self.poll()
+            if changes:
+                yield changes
+            time.sleep(interval)
@@ -14,6 +14,7 @@ EC_LPC_ADDR_HOST_CMD   : Final = 0x204
 EC_LPC_ADDR_HOST_ARGS    : Final = 0x800  # And 0x801, 0x802, 0x803
 EC_LPC_ADDR_HOST_PARAM   : Final = 0x804  # For version 2 params; size is
 				  # EC_PROTO2_MAX_PARAM_SIZE
+EC_PROTO2_MAX_PARAM_SIZE : Final = 0xfc
 					
 # Protocol version 3
 EC_LPC_ADDR_HOST_PACKET  : Final = 0x800  # Offset of version 3 packet
@@ -59,6 +59,12 @@ EC_MEMMAP_ACC_STATUS_SAMPLE_ID_MASK  : Final = 0x0f
 EC_MEMMAP_ACC_STATUS_BUSY_BIT        : Final = BIT(4)
 EC_MEMMAP_ACC_STATUS_PRESENCE_BIT    : Final = BIT(7)
 
+# Lid angle reported when it can't be calculated
+EC_ACC_LID_ANGLE_UNRELIABLE : Final = 500
+
+# Number of 3 axis sensors at EC_MEMMAP_ACC_DATA + 2
+EC_ACC_SENSOR_ENTRIES      : Final = 2
+
 # Number of temp sensors at EC_MEMMAP_TEMP_SENSOR
 EC_TEMP_SENSOR_ENTRIES     : Final = 16
 
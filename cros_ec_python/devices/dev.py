@@ -1,5 +1,6 @@
 import errno
 from fcntl import ioctl
+import select
 import struct
 from typing import Final, IO
 import warnings
@@ -9,9 +10,10 @@ from ..baseclass import CrosEcClass
 from ..constants.COMMON import *
 from ..constants.MEMMAP import EC_MEMMAP_SIZE
 from ..commands.general import EC_CMD_READ_MEMMAP
+from ..commands.mkbp import parse_event
 from ..exceptions import ECError
 
-__all__ = ["CrosEcDev"]
+__all__ = ["CrosEcDev", "find_devices"]
 
 CROS_EC_IOC_MAGIC: Final = 0xEC
 
@@ -41,19 +43,59 @@ def IORW(type: int, nr: int, size: int):
     return IOC((read | write), type, nr, size)
 
 
+# struct cros_ec_command header: version, command, outsize, insize, result
+_CMD_HEADER: Final = struct.Struct("<IIIII")
+
+# struct cros_ec_readmem header: offset, bytes
+_READMEM_HEADER: Final = struct.Struct("<II")
+
+CROS_EC_DEV_IOCXCMD: Final = IORW(CROS_EC_IOC_MAGIC, 0, _CMD_HEADER.size)
+CROS_EC_DEV_IOCRDMEM: Final = IORW(CROS_EC_IOC_MAGIC, 1, _READMEM_HEADER.size + EC_MEMMAP_SIZE + 1)
+
+# _IO(CROS_EC_DEV_IOC, 2), no data direction or size
+CROS_EC_DEV_IOCEVENTMASK: Final = IOC(0, CROS_EC_IOC_MAGIC, 2, 0)
+
+# Largest MKBP event record, 1 byte event type + the ec_response_get_next_data_v3 union
+CROS_EC_DEV_EVENT_SIZE: Final = 1 + 18
+
+# Device nodes created by the cros_ec_dev driver, one per EC (main EC, fingerprint, PD, sensor hub...)
+CROS_EC_DEVICE_NAMES: Final = ("cros_ec", "cros_fp", "cros_pd", "cros_ish", "cros_scp", "cros_tp")
+
+
+def find_devices(dev_dir: str = "/dev") -> list[str]:
+    """
+    Find every cros_ec device node on the system.
+    :param dev_dir: The directory to look in.
+    :return: The paths of the device nodes that exist, the main EC first.
+    """
+    paths = (os.path.join(dev_dir, name) for name in CROS_EC_DEVICE_NAMES)
+    return [path for path in paths if os.path.exists(path)]
+
+
 class CrosEcDev(CrosEcClass):
     """
     Class to interact with the EC using the Linux cros_ec device.
     """
 
-    def __init__(self, fd: IO | None = None, memmap_ioctl: bool = True):
+    waits_in_progress = True
+    "The kernel polls for commands that return EC_RES_IN_PROGRESS."
+
+    def __init__(
+        self,
+        fd: IO | None = None,
+        memmap_ioctl: bool = True,
+        events: bool = False,
+        path: str = "/dev/cros_ec",
+    ):
         """
         Initialise the EC using the Linux cros_ec device.
-        :param fd: Use a custom file description, opens /dev/cros_ec by default.
+        :param fd: Use a custom file description, opens `path` by default.
         :param memmap_ioctl: Use ioctl for memmap (default), if False the READ_MEMMAP command will be used instead.
+        :param events: Open the device for reading as well, this is required to use `read_event`.
+        :param path: The device node to open, see `find_devices` for the other ECs on the system.
         """
         if fd is None:
-            fd = open("/dev/cros_ec", "wb", buffering=0)
+            fd = open(path, "r+b" if events else "wb", buffering=0)
 
         self.fd: IO = fd
         """The file descriptor for /dev/cros_ec."""
@@ -61,6 +103,8 @@ class CrosEcDev(CrosEcClass):
         self.memmap_ioctl: bool = memmap_ioctl
         """Use ioctl for memmap, if False the READ_MEMMAP command will be used instead."""
 
+        self._event_mask: UInt32 = 0
+
     def __del__(self):
         self.ec_exit()
 
@@ -97,17 +141,17 @@ class CrosEcDev(CrosEcClass):
         if data is None:
             data = bytes(outsize)
 
-        cmd = struct.pack(f"<IIIII", version, command, outsize, insize, 0xFF)
-        buf = bytearray(cmd + bytes(max(outsize, insize)))
-        buf[len(cmd): len(cmd) + outsize] = data
+        header = _CMD_HEADER.size
+        buf = bytearray(header + max(outsize, insize))
+        _CMD_HEADER.pack_into(buf, 0, version, command, outsize, insize, 0xFF)
+        buf[header: header + outsize] = data
 
-        CROS_EC_DEV_IOCXCMD = IORW(CROS_EC_IOC_MAGIC, 0, len(cmd))
         result = ioctl(self.fd, CROS_EC_DEV_IOCXCMD, buf)
 
         if result < 0:
             raise IOError(f"ioctl failed with error {result}")
 
-        ec_result = struct.unpack("<IIIII", buf[:len(cmd)])
+        ec_result = _CMD_HEADER.unpack_from(buf)
 
         if ec_result[4] != 0:
             raise ECError(ec_result[4])
@@ -115,7 +159,7 @@ class CrosEcDev(CrosEcClass):
         if result != insize and warn:
             warnings.warn(f"Expected {insize} bytes, got {result} back from EC", RuntimeWarning)
 
-        return bytes(buf[len(cmd): len(cmd) + insize])
+        return bytes(buf[header: header + insize])
 
     def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
         """
@@ -125,11 +169,8 @@ class CrosEcDev(CrosEcClass):
         :return: Bytes read from the EC.
         """
         if self.memmap_ioctl:
-            data = struct.pack("<II", offset, num_bytes)
+            data = _READMEM_HEADER.pack(offset, num_bytes)
             buf = bytearray(data + bytes(num_bytes))
-            CROS_EC_DEV_IOCRDMEM = IORW(
-                CROS_EC_IOC_MAGIC, 1, len(data) + EC_MEMMAP_SIZE + 1
-            )
             try:
                 result = ioctl(self.fd, CROS_EC_DEV_IOCRDMEM, buf)
 
@@ -149,6 +190,50 @@ class CrosEcDev(CrosEcClass):
                     raise e
         else:
             # This is untested!
-            data = struct.pack("<BB", offset, num_bytes)
-            buf = self.command(0, EC_CMD_READ_MEMMAP, len(data), num_bytes, data)
-            return buf[len(data): len(data) + num_bytes]
+            chunk = self.capabilities.max_response_size
+            buf = bytearray()
+            for start in range(offset, offset + num_bytes, chunk):
+                size = min(chunk, offset + num_bytes - start)
+                data = struct.pack("<BB", start, size)
+                buf += self.command(0, EC_CMD_READ_MEMMAP, len(data), size, data)
+            return bytes(buf)
+
+    def fileno(self) -> int:
+        """
+        Get the file descriptor number, so the device can be used with `select`, `poll` or asyncio's `loop.add_reader`.
+        The device is readable when an MKBP event is waiting, see `read_event`.
+        :return: The file descriptor number.
+        """
+        return self.fd.fileno()
+
+    def event_mask(self, mask: UInt32) -> None:
+        """
+        Set which MKBP events are delivered to this file descriptor.
+        :param mask: Bitmask of `cros_ec_python.commands.mkbp.EcMkbpEvent` types, e.g. `BIT(EC_MKBP_EVENT_SWITCH.value)`.
+        """
+        ioctl(self.fd, CROS_EC_DEV_IOCEVENTMASK, mask)
+        self._event_mask = mask
+
+    @property
+    def events_enabled(self) -> bool:
+        """
+        True if MKBP events can be read with `read_event`, the device is open for reading and an event mask is set.
+        """
+        return bool(self._event_mask) and self.fd.readable()
+
+    def read_event(self, timeout: float | None = None) -> dict | None:
+        """
+        Read the next MKBP event. The device needs to be opened with `events=True`, and an event mask set.
+        :param timeout: Seconds to wait for an event. None waits forever, 0 doesn't wait at all.
+        :return: The event parsed with `cros_ec_python.commands.mkbp.parse_event`, or None if the timeout expired.
+        """
+        if timeout is not None:
+            poller = select.poll()
+            poller.register(self.fileno(), select.POLLIN)
+            if not poller.poll(timeout * 1000):
+                return None
+
+        data = os.read(self.fileno(), CROS_EC_DEV_EVENT_SIZE)
+        if not data:
+            raise EOFError("Event stream closed")
+        return parse_event(data)
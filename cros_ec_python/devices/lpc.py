@@ -1,3 +1,4 @@
+import functools
 import struct
 import warnings
 import errno
@@ -12,6 +13,19 @@ from ..exceptions import ECError
 from ..ioports import PortIO
 
 
+def _locked(func):
+    """
+    Hold the device lock for the whole request, as LPC requests are made of many separate port accesses.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
 class CrosEcLpc(CrosEcClass):
     """
     Class to interact with the EC using the LPC interface.
@@ -36,6 +50,8 @@ class CrosEcLpc(CrosEcClass):
         self.address: Int32 = address
         """The address of the EC memory map."""
 
+        self._event_ports: set[Int32] = set()
+
         if init:
             self.ec_init()
 
@@ -157,6 +173,25 @@ class CrosEcLpc(CrosEcClass):
         while self.portio.inb(status_addr) & EC_LPC_STATUS_BUSY_MASK:
             pass
 
+    def event_pending(self, status_addr: Int32 = EC_LPC_ADDR_ACPI_CMD) -> bool:
+        """
+        Check if the EC has an SCI or SMI event pending. This only reads a single status byte.
+        :param status_addr: The status register to read, the ACPI status register by default.
+        :return: True if an event is pending.
+        """
+        if status_addr not in self._event_ports:
+            if res := self.portio.ioperm(status_addr, 1, True):
+                if res == errno.EPERM:
+                    raise PermissionError("Permission denied. Try running as root.")
+                raise OSError(f"ioperm returned {errno.errorcode[res]} ({res})")
+            self._event_ports.add(status_addr)
+
+        return bool(
+            self.portio.inb(status_addr)
+            & (EC_LPC_STATUS_SCI_PENDING | EC_LPC_STATUS_SMI_PENDING)
+        )
+
+    @_locked
     def ec_command_v2(
         self,
         version: UInt8,
@@ -242,6 +277,7 @@ class CrosEcLpc(CrosEcClass):
 
         return bytes(data)
 
+    @_locked
     def ec_command_v3(
         self,
         version: UInt8,
@@ -349,14 +385,18 @@ class CrosEcLpc(CrosEcClass):
 
         if version & EC_HOST_CMD_FLAG_VERSION_3:
             self.command = self.ec_command_v3
+            # The packet window holds the 8 byte header as well as the payload
+            self.max_payload_size = EC_LPC_HOST_PACKET_SIZE - struct.calcsize("BBHHH")
             return 3
         elif version & EC_HOST_CMD_FLAG_LPC_ARGS_SUPPORTED:
             self.command = self.ec_command_v2
+            self.max_payload_size = EC_PROTO2_MAX_PARAM_SIZE
             return 2
         else:
             warnings.warn("EC doesn't support commands!", RuntimeWarning)
             return 0
 
+    @_locked
     def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
         """
         Read memory from the EC.
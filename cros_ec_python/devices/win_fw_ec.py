@@ -104,6 +104,9 @@ class WinFrameworkEc(CrosEcClass):
     Class to interact with the EC using the Framework EC Windows Driver.
     """
 
+    # The driver's buffer holds the 5 field command header as well as the payload
+    max_payload_size = CROSEC_CMD_MAX_REQUEST - (4 * 5)
+
     def __init__(self, handle: wintypes.HANDLE | None = None):
         """
         Initialise communication with the Framework EC driver.
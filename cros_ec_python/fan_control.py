@@ -0,0 +1,358 @@
+"""
+A closed-loop fan controller, driven by the temperatures in the memmap.
+
+Each tick reads the temperature sensors and fan speeds in a single 32 byte memmap read,
+works out the output for each fan from a `FanCurve` or `PID` controller,
+and only sends a command to the EC when a fan's output actually changes.
+
+Automatic fan control is handed back to the EC with `cros_ec_python.commands.thermal.thermal_auto_fan_ctrl`
+when the controller is stopped, when the program exits, and whenever a tick fails.
+A failed tick also stops the controller, so a persistent fault leaves the fans in automatic control
+instead of switching back and forth. Call `FanController.start` again to retry.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec
+from cros_ec_python.fan_control import FanController, FanCurve, PID, FanMode
+
+ec = get_cros_ec()
+
+fans = FanController(ec, interval=1)
+# Fan 0 follows the hottest of sensors 0 and 1, and only slows down once they have cooled by 3°C
+fans.add_fan(0, [0, 1], curve=FanCurve([(40, 0), (50, 20), (70, 60), (85, 100)]), hysteresis=3)
+# Fan 1 targets 60°C on sensor 2 by setting the fan RPM
+fans.add_fan(1, [2], pid=PID(kp=150, ki=10, kd=0, setpoint=60, output_max=6000), mode=FanMode.RPM, min_step=100)
+
+with fans:
+    input("Press enter to hand control back to the EC...")
+```
+"""
+
+import atexit
+import struct
+import time
+import warnings
+from enum import Enum
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+from .constants.MEMMAP import *
+from .commands import pwm, thermal
+from .watch import _Poller
+
+__all__ = ["FanController", "FanChannel", "FanCurve", "PID", "FanMode"]
+
+
+class FanMode(Enum):
+    """How the output of a fan is applied."""
+
+    DUTY = 0
+    "Output is a duty cycle out of 100, set with `pwm.pwm_set_fan_duty`"
+
+    RPM = 1
+    "Output is a target RPM, set with `pwm.pwm_set_fan_rpm`"
+
+
+class FanCurve:
+    """
+    A piecewise linear fan curve, mapping a temperature to an output.
+    """
+
+    def __init__(self, points: list[tuple[int | float, int | float]]):
+        """
+        Create a fan curve.
+        :param points: A list of `(temperature, output)` points.
+        Temperatures below the first point use the first output, and above the last point use the last output.
+        """
+        if not points:
+            raise ValueError("A fan curve needs at least one point")
+        self.points: list[tuple[int | float, int | float]] = sorted(points)
+        """The `(temperature, output)` points, sorted by temperature."""
+
+    def __call__(self, temp: int | float) -> float:
+        """
+        Get the output for a temperature.
+        :param temp: The temperature.
+        :return: The interpolated output.
+        """
+        points = self.points
+        if temp <= points[0][0]:
+            return points[0][1]
+        for (t0, out0), (t1, out1) in zip(points, points[1:]):
+            if temp <= t1:
+                return out0 + (out1 - out0) * (temp - t0) / (t1 - t0)
+        return points[-1][1]
+
+
+class PID:
+    """
+    A PID controller that raises its output as the temperature rises above the setpoint.
+    """
+
+    def __init__(
+        self,
+        kp: float,
+        ki: float,
+        kd: float,
+        setpoint: int | float,
+        output_min: int | float = 0,
+        output_max: int | float = 100,
+    ):
+        """
+        Create a PID controller.
+        :param kp: Proportional gain, output per degree above the setpoint.
+        :param ki: Integral gain, output per degree second above the setpoint.
+        :param kd: Derivative gain, output per degree per second of temperature rise.
+        :param setpoint: The temperature to hold.
+        :param output_min: The lowest output.
+        :param output_max: The highest output.
+        """
+        self.kp: float = kp
+        self.ki: float = ki
+        self.kd: float = kd
+        self.setpoint: int | float = setpoint
+        """The temperature to hold."""
+        self.output_min: int | float = output_min
+        self.output_max: int | float = output_max
+
+        self._integral: float = 0
+        self._last_error: float | None = None
+
+    def reset(self) -> None:
+        """
+        Clear the integral and derivative state.
+        """
+        self._integral = 0
+        self._last_error = None
+
+    def __call__(self, temp: int | float, dt: float) -> float:
+        """
+        Get the output for a temperature.
+        :param temp: The current temperature.
+        :param dt: Seconds since the last call.
+        :return: The output, clamped between `output_min` and `output_max`.
+        """
+        error = temp - self.setpoint
+        derivative = 0 if self._last_error is None or dt <= 0 else (error - self._last_error) / dt
+        self._last_error = error
+
+        integral = self._integral + error * dt
+        output = self.kp * error + self.ki * integral + self.kd * derivative
+        # While saturated, only let the integral unwind, so it doesn't wind up
+        if not (output >= self.output_max and error > 0) and not (output <= self.output_min and error < 0):
+            self._integral = integral
+        return min(max(output, self.output_min), self.output_max)
+
+
+class FanChannel:
+    """
+    The configuration and state of a single fan, created with `FanController.add_fan`.
+    """
+
+    def __init__(
+        self,
+        idx: UInt8,
+        sensors: list[int],
+        curve: FanCurve | None,
+        pid: PID | None,
+        mode: FanMode,
+        hysteresis: int | float,
+        min_step: int | float,
+    ):
+        self.idx: UInt8 = idx
+        """The fan index."""
+
+        self.sensors: list[int] = sensors
+        """The temperature sensor indexes this fan follows, the hottest one is used."""
+
+        self.curve: FanCurve | None = curve
+        self.pid: PID | None = pid
+        self.mode: FanMode = mode
+
+        self.hysteresis: int | float = hysteresis
+        """Degrees the temperature must fall before a curve lowers the output."""
+
+        self.min_step: int | float = min_step
+        """The smallest change in output that is sent to the EC."""
+
+        self.output: int | None = None
+        """The last output sent to the EC, None while the EC is in control."""
+
+        self.temp: int | float | None = None
+        """The last temperature this fan was controlled from (after hysteresis)."""
+
+        self.rpm: int | None = None
+        """The last fan speed read from the EC, None if stalled or not present."""
+
+    def _compute(self, temp: int | float, dt: float) -> int:
+        if self.curve is not None:
+            # Rises are followed straight away, falls only once they are larger than the hysteresis
+            if self.temp is None or temp > self.temp:
+                self.temp = temp
+            elif temp < self.temp - self.hysteresis:
+                self.temp = temp + self.hysteresis
+            return round(self.curve(self.temp))
+
+        self.temp = temp
+        return round(self.pid(temp, dt))
+
+
+class FanController(_Poller):
+    """
+    Polls the temperatures and sets each configured fan from its curve or PID controller.
+    Fans that haven't been added are left in automatic control.
+    """
+
+    def __init__(self, ec: CrosEcClass, interval: float = 1):
+        """
+        Create a fan controller, use `add_fan` to configure fans and `start` to begin controlling them.
+        :param ec: The CrOS_EC object.
+        :param interval: Time between ticks in seconds.
+        """
+        super().__init__(interval)
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.fans: dict[int, FanChannel] = {}
+        """The configured fans by index."""
+
+        self.temps: list[int | None] = []
+        """The last temperatures read in °C by sensor index, None if the sensor isn't present or has an error."""
+
+        self.error: BaseException | None = None
+        """The exception that stopped the controller, None if it hasn't failed."""
+
+        self._thermal_version: int | None = None
+        self._last_tick: float | None = None
+
+    def add_fan(
+        self,
+        idx: UInt8,
+        sensors: list[int],
+        curve: FanCurve | None = None,
+        pid: PID | None = None,
+        mode: FanMode = FanMode.DUTY,
+        hysteresis: int | float = 2,
+        min_step: int | float = 1,
+    ) -> FanChannel:
+        """
+        Control a fan from one or more temperature sensors.
+        :param idx: The fan index.
+        :param sensors: Temperature sensor indexes, as used by `cros_ec_python.commands.thermal.temp_sensor_get_info`.
+        The hottest one is used.
+        :param curve: A fan curve, either this or `pid` is required.
+        :param pid: A PID controller, either this or `curve` is required.
+        :param mode: Whether the output is a duty cycle or a target RPM.
+        :param hysteresis: Degrees the temperature must fall before a curve lowers the output.
+        :param min_step: The smallest change in output that is sent to the EC.
+        :return: The fan's `FanChannel`.
+        """
+        if (curve is None) == (pid is None):
+            raise ValueError("Either a curve or a PID controller is required")
+        fan = self.fans[idx] = FanChannel(idx, sensors, curve, pid, mode, hysteresis, min_step)
+        return fan
+
+    def _read(self) -> None:
+        """
+        Read every temperature sensor and fan speed in a single memmap read.
+        """
+        if self._thermal_version is None:
+            self._thermal_version = int(self.ec.memmap(EC_MEMMAP_THERMAL_VERSION, 1)[0])
+            if not self._thermal_version:
+                raise OSError("EC doesn't report temperatures in the memmap")
+
+        # Temp sensors, fan speeds then the second bank of temp sensors are contiguous
+        size = (EC_MEMMAP_TEMP_SENSOR_B + EC_TEMP_SENSOR_B_ENTRIES if self._thermal_version >= 2
+                else EC_MEMMAP_FAN + EC_FAN_SPEED_ENTRIES * 2) - EC_MEMMAP_TEMP_SENSOR
+        resp = self.ec.memmap(EC_MEMMAP_TEMP_SENSOR, size)
+
+        raw = list(resp[:EC_TEMP_SENSOR_ENTRIES])
+        if self._thermal_version >= 2:
+            raw += resp[EC_MEMMAP_TEMP_SENSOR_B - EC_MEMMAP_TEMP_SENSOR:]
+        self.temps = [
+            None if temp >= EC_TEMP_SENSOR_NOT_CALIBRATED else temp + EC_TEMP_SENSOR_OFFSET - 273 for temp in raw
+        ]
+
+        offset = EC_MEMMAP_FAN - EC_MEMMAP_TEMP_SENSOR
+        rpms = struct.unpack_from(f"<{EC_FAN_SPEED_ENTRIES}H", resp, offset)
+        for fan in self.fans.values():
+            rpm = rpms[fan.idx] if fan.idx < EC_FAN_SPEED_ENTRIES else EC_FAN_SPEED_NOT_PRESENT
+            fan.rpm = None if rpm >= EC_FAN_SPEED_STALLED else rpm
+
+    def _release(self, fan: FanChannel) -> None:
+        fan.output = None
+        fan.temp = None
+        if fan.pid is not None:
+            fan.pid.reset()
+        thermal.thermal_auto_fan_ctrl(self.ec, fan.idx)
+
+    def poll(self) -> None:
+        """
+        Run a single tick, this is called automatically by the background thread.
+        If anything goes wrong, every fan is handed back to the EC and the controller stops before the exception
+        is raised. Later ticks raise RuntimeError until the controller is started again.
+        """
+        if self.error is not None:
+            raise RuntimeError("Fan controller has failed, start it again to retry") from self.error
+
+        now = time.monotonic()
+        dt = 0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+
+        try:
+            self._read()
+            for fan in self.fans.values():
+                temps = [self.temps[i] for i in fan.sensors if i < len(self.temps) and self.temps[i] is not None]
+                if not temps:
+                    # No usable sensors, the EC knows best
+                    if fan.output is not None:
+                        warnings.warn(f"No valid temperatures for fan {fan.idx}, restoring automatic control",
+                                      RuntimeWarning)
+                        self._release(fan)
+                    continue
+
+                output = fan._compute(max(temps), dt)
+                if fan.output is not None and abs(output - fan.output) < fan.min_step:
+                    continue
+
+                if fan.mode == FanMode.RPM:
+                    pwm.pwm_set_fan_rpm(self.ec, output, fan.idx)
+                else:
+                    pwm.pwm_set_fan_duty(self.ec, output, fan.idx)
+                fan.output = output
+        except BaseException as e:
+            self.error = e
+            self.restore()
+            # Stop the background thread, so the fans stay in automatic control
+            self._stop.set()
+            raise
+
+    def restore(self) -> None:
+        """
+        Hand every configured fan back to the EC's automatic fan control.
+        """
+        for fan in self.fans.values():
+            try:
+                self._release(fan)
+            except Exception as e:
+                warnings.warn(f"Failed to restore automatic control of fan {fan.idx}: {e!r}", RuntimeWarning)
+        self._last_tick = None
+
+    def start(self) -> None:
+        """
+        Start controlling the fans in a background thread.
+        Automatic fan control is restored when the program exits.
+        This also clears `error`, if the controller had failed.
+        """
+        self.error = None
+        atexit.register(self.restore)
+        super().start()
+
+    def stop(self) -> None:
+        """
+        Stop controlling the fans, and hand them back to the EC's automatic fan control.
+        """
+        super().stop()
+        atexit.unregister(self.restore)
+        self.restore()
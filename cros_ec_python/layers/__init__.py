@@ -0,0 +1,21 @@
+"""
+# Description
+
+Layers wrap an existing `cros_ec_python.baseclass.CrosEcClass` object, and are CrosEc objects themselves.
+This means every function in `cros_ec_python.commands` works with a layer exactly like it does with a device,
+and layers can be stacked on top of each other.
+
+All layers inherit from `cros_ec_python.layers.base.CrosEcLayer`, which passes everything through to the wrapped object.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, pwm
+from cros_ec_python.layers.coalesce import CoalescingCrosEc
+
+ec = CoalescingCrosEc(get_cros_ec())
+
+# Identical reads from multiple threads at the same time now share a single EC transaction
+print(pwm.pwm_get_fan_rpm(ec))
+```
+"""
@@ -0,0 +1,107 @@
+"""
+The base class for layers, see `cros_ec_python.layers`.
+"""
+
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+
+class CrosEcLayer(CrosEcClass):
+    """
+    Wraps another CrosEc object, and passes everything through to it.
+    Layers override `command` and/or `memmap` to add their behaviour.
+
+    Any other attributes (e.g. `event_pending` or `fileno`) are looked up on the wrapped object.
+    """
+
+    def __init__(self, ec: CrosEcClass):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object to wrap.
+        """
+        self.ec: CrosEcClass = ec
+        """The wrapped CrOS_EC object."""
+
+    def __getattr__(self, name: str):
+        if name == "ec":
+            raise AttributeError(name)
+        return getattr(self.ec, name)
+
+    @property
+    def lock(self):
+        """
+        The wrapped object's lock, so every layer on a device shares one lock.
+        """
+        return self.ec.lock
+
+    def _owns_lock(self) -> bool:
+        """
+        Check if the current thread holds `lock`, e.g. while running a batch.
+        Layers that wait on another thread's request must send requests straight through while it is held,
+        as that thread may itself be waiting for the lock.
+        """
+        return self.lock._is_owned()
+
+    @property
+    def max_payload_size(self) -> int | None:
+        """
+        The wrapped object's payload limit.
+        """
+        return self.ec.max_payload_size
+
+    @property
+    def waits_in_progress(self) -> bool:
+        """
+        Whether the wrapped object waits for commands that return EC_RES_IN_PROGRESS.
+        """
+        return self.ec.waits_in_progress
+
+    @property
+    def capabilities(self):
+        """
+        The wrapped object's capabilities, so every layer on a device shares one cache.
+        """
+        return self.ec.capabilities
+
+    @staticmethod
+    def detect() -> bool:
+        """
+        Layers aren't devices, so they are never detected.
+        """
+        return False
+
+    def ec_init(self) -> None:
+        self.ec.ec_init()
+
+    def ec_exit(self) -> None:
+        self.ec.ec_exit()
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        """
+        Send a command to the EC and return the response.
+        :param version: Command version number (often 0).
+        :param command: Command to send (EC_CMD_...).
+        :param outsize: Outgoing length in bytes.
+        :param insize: Max number of bytes to accept from the EC.
+        :param data: Outgoing data to EC.
+        :param warn: Whether to warn if the response size is not as expected. Default is True.
+        :return: Response from the EC.
+        """
+        return self.ec.command(version, command, outsize, insize, data, warn)
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
+        """
+        Read memory from the EC.
+        :param offset: Offset to read from.
+        :param num_bytes: Number of bytes to read.
+        :return: Bytes read from the EC.
+        """
+        return self.ec.memmap(offset, num_bytes)
@@ -0,0 +1,271 @@
+"""
+A read-through / write-through cache for EC settings.
+
+Some getters return state that only changes when the host changes it, like the charge limit or a PWM duty cycle.
+`SettingsCache` answers those getters from memory, and keeps the cache up to date from the matching setters,
+so a policy loop that reads and writes the same settings every tick only talks to the EC when something changes.
+Setters that would write the value that is already cached are skipped entirely.
+
+The EC can lose these settings (e.g. on resume or an EC reset), call `SettingsCache.refresh` to resync.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, framework_laptop
+from cros_ec_python.layers.cache import SettingsCache
+
+ec = SettingsCache(get_cros_ec())
+
+framework_laptop.set_charge_limit(ec, 80, 0)
+framework_laptop.get_charge_limit(ec)  # Served from the cache
+framework_laptop.set_charge_limit(ec, 80, 0)  # Skipped, nothing changed
+
+# After resume
+ec.refresh()
+```
+"""
+
+import struct
+import threading
+from typing import Callable, Final
+
+from .base import CrosEcLayer
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..commands import pwm, thermal, framework_laptop
+
+__all__ = ["SettingsCache", "CACHED_GETTERS", "WRITE_THROUGH_ONLY", "CACHE_SETTERS"]
+
+_FAN_TARGET_KEY: Final = (pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM, 0, b"")
+_KB_BACKLIGHT_KEY: Final = (pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT, 0, b"")
+_CHARGE_LIMIT_GET: Final = struct.pack("<Bxx", framework_laptop.ChargeLimitControlModes.CHG_LIMIT_GET_LIMIT.value)
+_CHARGE_LIMIT_KEY: Final = (framework_laptop.EC_CMD_CHARGE_LIMIT_CONTROL, 0, _CHARGE_LIMIT_GET)
+_FP_LED_GET: Final = struct.pack("<xB", 1)
+_FP_LED_KEY: Final = (framework_laptop.EC_CMD_FP_LED_LEVEL_CONTROL, 0, _FP_LED_GET)
+# Raw levels reported back for each FpLedBrightnessLevel, see framework_laptop.get_fp_led_level
+_FP_LED_RAW: Final = {0: 55, 1: 40, 2: 15}
+
+
+def _duty_key(pwm_type: int, index: int) -> tuple:
+    return pwm.EC_CMD_PWM_GET_DUTY, 0, bytes([pwm_type, index])
+
+
+CACHED_GETTERS: dict[int, Callable[[bytes], bool] | None] = {
+    pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: None,
+    pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT: None,
+    pwm.EC_CMD_PWM_GET_DUTY: None,
+    framework_laptop.EC_CMD_CHARGE_LIMIT_CONTROL: lambda data: data == _CHARGE_LIMIT_GET,
+    framework_laptop.EC_CMD_FP_LED_LEVEL_CONTROL: lambda data: data == _FP_LED_GET,
+}
+"""
+Getters that are answered from the cache, mapped to None if every request is a get,
+or a function that takes the request data and returns True if that request is a get.
+"""
+
+WRITE_THROUGH_ONLY: set[int] = {
+    pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM,
+}
+"""
+Getters that are only cached from their setters, never from a read.
+The EC changes the fan target RPM itself while in automatic fan control,
+so it is only cached after it has been set, until automatic fan control is turned back on.
+"""
+
+
+def _set_fan_rpm(version: int, data: bytes) -> list[tuple[tuple, bytes | None]]:
+    if version == 0:
+        return [(_FAN_TARGET_KEY, data[:4])]
+    # Setting a single fan, which may not be the one EC_CMD_PWM_GET_FAN_TARGET_RPM reports
+    return [(_FAN_TARGET_KEY, None)]
+
+
+def _set_keyboard_backlight(version: int, data: bytes) -> list[tuple[tuple, bytes | None]]:
+    return [
+        (_KB_BACKLIGHT_KEY, None),
+        (_duty_key(pwm.EcPwmType.EC_PWM_TYPE_KB_LIGHT.value, 0), None),
+    ]
+
+
+def _set_duty(version: int, data: bytes) -> list[tuple[tuple, bytes | None]]:
+    duty, pwm_type, index = struct.unpack_from("<HBB", data)
+    effects = [(_duty_key(pwm_type, index), struct.pack("<H", duty))]
+    if pwm_type == pwm.EcPwmType.EC_PWM_TYPE_KB_LIGHT.value:
+        effects.append((_KB_BACKLIGHT_KEY, None))
+    return effects
+
+
+def _charge_limit_control(version: int, data: bytes) -> list[tuple[tuple, bytes | None]] | None:
+    if data == _CHARGE_LIMIT_GET:
+        return None
+    if data[0] == framework_laptop.ChargeLimitControlModes.CHG_LIMIT_SET_LIMIT.value:
+        return [(_CHARGE_LIMIT_KEY, data[1:3])]
+    return [(_CHARGE_LIMIT_KEY, None)]
+
+
+def _fp_led_level_control(version: int, data: bytes) -> list[tuple[tuple, bytes | None]] | None:
+    if data == _FP_LED_GET:
+        return None
+    raw = _FP_LED_RAW.get(data[0])
+    return [(_FP_LED_KEY, None if raw is None else bytes([raw]))]
+
+
+CACHE_SETTERS: dict[int, Callable[[int, bytes], list[tuple[tuple, bytes | None]] | None]] = {
+    pwm.EC_CMD_PWM_SET_FAN_TARGET_RPM: _set_fan_rpm,
+    pwm.EC_CMD_PWM_SET_FAN_DUTY: lambda version, data: [(_FAN_TARGET_KEY, None)],
+    thermal.EC_CMD_THERMAL_AUTO_FAN_CTRL: lambda version, data: [(_FAN_TARGET_KEY, None)],
+    pwm.EC_CMD_PWM_SET_KEYBOARD_BACKLIGHT: _set_keyboard_backlight,
+    pwm.EC_CMD_PWM_SET_DUTY: _set_duty,
+    framework_laptop.EC_CMD_CHARGE_LIMIT_CONTROL: _charge_limit_control,
+    framework_laptop.EC_CMD_FP_LED_LEVEL_CONTROL: _fp_led_level_control,
+}
+"""
+Commands that change cached settings, mapped to a function that takes the command version and request data,
+and returns a list of `(cache key, new response)` pairs, where a new response of None invalidates that key.
+The function returns None if that request doesn't change anything.
+Cache keys are `(command, version, request data)` of the matching getter.
+"""
+
+
+class SettingsCache(CrosEcLayer):
+    """
+    A layer that caches the responses of settings getters, and updates them from the setters.
+
+    Only the commands in `CACHED_GETTERS` and `CACHE_SETTERS` are affected, everything else is passed through.
+    """
+
+    def __init__(
+        self,
+        ec: CrosEcClass,
+        skip_unchanged: bool = True,
+        getters: dict[int, Callable[[bytes], bool] | None] | None = None,
+        write_through_only: set[int] | None = None,
+        setters: dict[int, Callable[[int, bytes], list[tuple[tuple, bytes | None]] | None]] | None = None,
+    ):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object to wrap.
+        :param skip_unchanged: Don't send setters that would write the value that is already cached.
+        :param getters: Getters to cache, see `CACHED_GETTERS` (the default).
+        :param write_through_only: Getters only cached from their setters, see `WRITE_THROUGH_ONLY` (the default).
+        :param setters: Setters that update the cache, see `CACHE_SETTERS` (the default).
+        """
+        super().__init__(ec)
+
+        self.skip_unchanged: bool = skip_unchanged
+        """Don't send setters that would write the value that is already cached."""
+
+        self.getters: dict[int, Callable[[bytes], bool] | None] = (
+            dict(CACHED_GETTERS) if getters is None else getters
+        )
+        """Getters to cache, see `CACHED_GETTERS`."""
+
+        self.write_through_only: set[int] = (
+            set(WRITE_THROUGH_ONLY) if write_through_only is None else write_through_only
+        )
+        """Getters only cached from their setters, see `WRITE_THROUGH_ONLY`."""
+
+        self.setters: dict[int, Callable[[int, bytes], list[tuple[tuple, bytes | None]] | None]] = (
+            dict(CACHE_SETTERS) if setters is None else setters
+        )
+        """Setters that update the cache, see `CACHE_SETTERS`."""
+
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "skipped": 0}
+        """Number of getters answered from the cache, getters sent to the EC, and setters skipped."""
+
+        self._cache: dict[tuple, bytes] = {}
+        self._cache_lock = threading.Lock()
+
+    def is_cached_getter(self, command: Int32, data: bytes) -> bool:
+        """
+        Check if a request is a getter that can be answered from the cache.
+        :param command: The command (EC_CMD_...).
+        :param data: The outgoing data.
+        :return: True if the request is a cached getter.
+        """
+        if command not in self.getters:
+            return False
+        check = self.getters[command]
+        return check is None or check(data)
+
+    def invalidate(self, command: Int32 | None = None) -> None:
+        """
+        Drop cached values, so the next get is read from the EC.
+        :param command: Only drop values for this getter command (EC_CMD_...). None drops everything.
+        """
+        with self._cache_lock:
+            if command is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == command]:
+                    del self._cache[key]
+
+    def refresh(self) -> None:
+        """
+        Resync the cache with the EC, e.g. after resume or an EC reset.
+        Every cached getter is read again, and values in `write_through_only` are dropped.
+        """
+        with self._cache_lock:
+            entries = list(self._cache.items())
+            self._cache.clear()
+
+        for (command, version, payload), value in entries:
+            if command in self.write_through_only or not self.is_cached_getter(command, payload):
+                continue
+            resp = bytes(self.ec.command(version, command, len(payload), len(value), payload))
+            with self._cache_lock:
+                self._cache[(command, version, payload)] = resp
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        payload = bytes(data[:outsize]) if data is not None else bytes(outsize)
+
+        if command in self.setters and (effects := self.setters[command](version, payload)) is not None:
+            if self.skip_unchanged and effects:
+                with self._cache_lock:
+                    unchanged = all(
+                        value is not None and self._cache.get(key) == value for key, value in effects
+                    )
+                if unchanged:
+                    self.stats["skipped"] += 1
+                    return bytes(insize)
+
+            try:
+                resp = self.ec.command(version, command, outsize, insize, data, warn)
+            except BaseException:
+                # We don't know what state the EC is in now
+                with self._cache_lock:
+                    for key, _ in effects:
+                        self._cache.pop(key, None)
+                raise
+
+            with self._cache_lock:
+                for key, value in effects:
+                    if value is None:
+                        self._cache.pop(key, None)
+                    else:
+                        self._cache[key] = bytes(value)
+            return resp
+
+        if self.is_cached_getter(command, payload):
+            key = (command, version, payload)
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached is not None and len(cached) == insize:
+                self.stats["hits"] += 1
+                return cached
+
+            self.stats["misses"] += 1
+            resp = bytes(self.ec.command(version, command, outsize, insize, data, warn))
+            if command not in self.write_through_only:
+                with self._cache_lock:
+                    self._cache[key] = resp
+            return resp
+
+        return self.ec.command(version, command, outsize, insize, data, warn)
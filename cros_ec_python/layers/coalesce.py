@@ -0,0 +1,152 @@
+"""
+Single-flight coalescing of identical read requests.
+
+When several threads ask for the same data at the same time (e.g. a dashboard and an exporter both calling
+`cros_ec_python.commands.memmap.get_temps`), only the first request is sent to the EC,
+and everyone waiting on it gets the same result.
+
+Only requests that don't change anything on the EC are coalesced: all memmap reads,
+and the commands listed in `READ_ONLY_COMMANDS`.
+Requests made while holding the device lock (e.g. in a batch) are never coalesced, they are sent straight through.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from .base import CrosEcLayer
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..commands import general, features, pwm, thermal, framework_laptop, events
+
+__all__ = ["CoalescingCrosEc", "READ_ONLY_COMMANDS"]
+
+READ_ONLY_COMMANDS: dict[int, Callable[[bytes], bool] | None] = {
+    general.EC_CMD_PROTO_VERSION: None,
+    general.EC_CMD_HELLO: None,
+    general.EC_CMD_GET_VERSION: None,
+    general.EC_CMD_GET_BUILD_INFO: None,
+    general.EC_CMD_GET_CHIP_INFO: None,
+    general.EC_CMD_GET_BOARD_VERSION: None,
+    general.EC_CMD_READ_MEMMAP: None,
+    general.EC_CMD_GET_CMD_VERSIONS: None,
+    general.EC_CMD_GET_PROTOCOL_INFO: None,
+    features.EC_CMD_GET_FEATURES: None,
+    pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: None,
+    pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT: None,
+    pwm.EC_CMD_PWM_GET_DUTY: None,
+    thermal.EC_CMD_TEMP_SENSOR_GET_INFO: None,
+    events.EC_CMD_HOST_EVENT_GET_B: None,
+    events.EC_CMD_HOST_EVENT_GET_SMI_MASK: None,
+    events.EC_CMD_HOST_EVENT_GET_SCI_MASK: None,
+    events.EC_CMD_HOST_EVENT_GET_WAKE_MASK: None,
+    framework_laptop.EC_CMD_PWM_GET_FAN_ACTUAL_RPM: None,
+    framework_laptop.EC_CMD_CHASSIS_OPEN_CHECK: None,
+    framework_laptop.EC_CMD_PRIVACY_SWITCHES_CHECK_MODE: None,
+    framework_laptop.EC_CMD_GET_SIMPLE_VERSION: None,
+    framework_laptop.EC_CMD_GET_ACTIVE_CHARGE_PD_CHIP: None,
+    # These commands both get and set, so only coalesce the gets
+    framework_laptop.EC_CMD_CHARGE_LIMIT_CONTROL:
+        lambda data: data[:1] == bytes([framework_laptop.ChargeLimitControlModes.CHG_LIMIT_GET_LIMIT.value]),
+    framework_laptop.EC_CMD_FP_LED_LEVEL_CONTROL: lambda data: data[1:2] == b"\x01",
+    framework_laptop.EC_CMD_BATTERY_EXTENDER: lambda data: data[4:5] == b"\x01",
+}
+"""
+Commands that are safe to coalesce, mapped to None if every request is read-only,
+or a function that takes the request data and returns True if that request is read-only.
+"""
+
+
+class CoalescingCrosEc(CrosEcLayer):
+    """
+    A layer that shares one EC transaction between concurrent identical read requests.
+
+    Requests are identical if they have the same command, version, sizes and data,
+    or the same memmap offset and size.
+    """
+
+    def __init__(self, ec: CrosEcClass, read_only: dict[int, Callable[[bytes], bool] | None] | None = None):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object to wrap.
+        :param read_only: Commands that are safe to coalesce, see `READ_ONLY_COMMANDS` (the default).
+        """
+        super().__init__(ec)
+
+        self.read_only: dict[int, Callable[[bytes], bool] | None] = (
+            dict(READ_ONLY_COMMANDS) if read_only is None else read_only
+        )
+        """Commands that are safe to coalesce, see `READ_ONLY_COMMANDS`."""
+
+        self.stats: dict[str, int] = {"issued": 0, "coalesced": 0, "passthrough": 0}
+        """
+        Number of requests sent to the EC, answered by another request,
+        and not eligible for coalescing (including requests made while holding the device lock).
+        """
+
+        self._inflight: dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def is_read_only(self, command: Int32, data: bytes) -> bool:
+        """
+        Check if a command is safe to coalesce.
+        :param command: The command (EC_CMD_...).
+        :param data: The outgoing data.
+        :return: True if the request doesn't change anything on the EC.
+        """
+        if command not in self.read_only:
+            return False
+        check = self.read_only[command]
+        return check is None or check(data)
+
+    def _single_flight(self, key: tuple, func: Callable, *args) -> bytes:
+        if self._owns_lock():
+            # The leader may be waiting for the lock we hold, so don't wait for it
+            with self._inflight_lock:
+                self.stats["passthrough"] += 1
+            return func(*args)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.stats["issued"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = bytes(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        payload = bytes(data[:outsize]) if data is not None else bytes(outsize)
+        if not self.is_read_only(command, payload):
+            with self._inflight_lock:
+                self.stats["passthrough"] += 1
+            return self.ec.command(version, command, outsize, insize, data, warn)
+
+        key = ("command", version, command, outsize, insize, payload)
+        return self._single_flight(key, self.ec.command, version, command, outsize, insize, data, warn)
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
+        return self._single_flight(("memmap", offset, num_bytes), self.ec.memmap, offset, num_bytes)
@@ -0,0 +1,103 @@
+"""
+A view of a secondary MCU behind the EC, like a USB-PD controller, addressed with passthrough command offsets.
+
+The EC forwards any command in the range `EC_CMD_PASSTHRU_OFFSET(index)` to `EC_CMD_PASSTHRU_MAX(index)`
+to the MCU at that passthrough index, with the offset removed. `PassthruCrosEc` adds the offset to every command,
+so every function in `cros_ec_python.commands` works against the secondary MCU unchanged.
+
+The view has its own `capabilities` (the MCU supports different commands to the EC),
+and its own `lock`, so a batch sent to the MCU doesn't hold up requests to the EC.
+Each request still takes the EC's transport lock where the transport needs it.
+
+On Linux, the kernel also exposes the PD MCU as `/dev/cros_pd` and adds the offset itself,
+see `cros_ec_python.devices.dev.find_devices`. This layer is for the other interfaces, and for Linux without that node.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, general
+from cros_ec_python.layers.passthru import PassthruCrosEc, EC_PASSTHRU_INDEX_PD
+
+ec = get_cros_ec()
+pd = PassthruCrosEc(ec, EC_PASSTHRU_INDEX_PD)
+
+print(general.get_version(pd))
+
+with pd.batch() as batch:
+    version = batch.call(general.get_version)
+    build = batch.call(general.get_build_info)
+print(version.result(), build.result())
+```
+"""
+
+from typing import Final
+
+from .base import CrosEcLayer
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+
+__all__ = ["PassthruCrosEc", "EC_CMD_PASSTHRU_OFFSET", "EC_CMD_PASSTHRU_MAX", "EC_PASSTHRU_INDEX_PD"]
+
+
+def EC_CMD_PASSTHRU_OFFSET(index: int) -> int:
+    """
+    The first command number forwarded to the MCU at a passthrough index.
+    """
+    return 0x4000 * index
+
+
+def EC_CMD_PASSTHRU_MAX(index: int) -> int:
+    """
+    The last command number forwarded to the MCU at a passthrough index.
+    """
+    return EC_CMD_PASSTHRU_OFFSET(index) + 0x3FFF
+
+
+EC_PASSTHRU_INDEX_PD: Final = 1
+"The passthrough index of the USB-PD MCU."
+
+
+class PassthruCrosEc(CrosEcLayer):
+    """
+    A layer that sends every command to a secondary MCU, by adding its passthrough command offset.
+    """
+
+    lock = CrosEcClass.lock
+    """A lock for this MCU, separate from the EC's."""
+
+    capabilities = CrosEcClass.capabilities
+    """The capabilities of this MCU, cached separately from the EC's."""
+
+    def __init__(self, ec: CrosEcClass, index: int = EC_PASSTHRU_INDEX_PD):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object of the EC the MCU is behind.
+        :param index: The passthrough index of the MCU, see `EC_PASSTHRU_INDEX_PD`.
+        """
+        if index < 1:
+            raise ValueError("Passthrough index must be at least 1, index 0 is the EC itself")
+        super().__init__(ec)
+        self.index: int = index
+        """The passthrough index of the MCU."""
+
+        self.offset: int = EC_CMD_PASSTHRU_OFFSET(index)
+        """The offset added to every command."""
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        if not 0 <= command <= EC_CMD_PASSTHRU_MAX(0):
+            raise ValueError(f"Command {command:#x} is outside the passthrough range")
+        return self.ec.command(version, command + self.offset, outsize, insize, data, warn)
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
+        """
+        Secondary MCUs don't have a memmap, the EC's memmap is not passed through.
+        """
+        raise OSError(f"Passthrough MCU {self.index} doesn't have a memmap")
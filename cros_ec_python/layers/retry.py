@@ -0,0 +1,165 @@
+"""
+Retrying busy commands, and completing long-running ones.
+
+Backends raise `cros_ec_python.exceptions.ECError` for every error code, including the ones that only mean "not yet":
+* `EC_RES_BUSY`: the EC is handling another long-running command. The command is retried with jittered exponential
+  backoff, so several callers don't all retry at the same moment.
+* `EC_RES_IN_PROGRESS`: the EC accepted the command and is still running it. The EC is polled with
+  `cros_ec_python.commands.general.get_comms_status` until it has finished, then the result is fetched with
+  `cros_ec_python.commands.system.resend_response`. If the EC can't resend it, the command succeeds with an empty
+  response. Interfaces that already do this (`CrosEcClass.waits_in_progress`, e.g. the Linux kernel driver)
+  only return EC_RES_IN_PROGRESS once they have given up, so it is raised as is.
+
+Every wait happens between requests, without holding `CrosEcClass.lock`,
+so other threads can use the EC meanwhile (unless the caller is holding the lock, e.g. in a batch).
+Stack this layer above a `cros_ec_python.layers.scheduler.ScheduledCrosEc` to schedule each poll separately.
+
+The waits sleep in the calling thread. Under `cros_ec_python.aio.AsyncCrosEc` that is its single worker thread,
+so every other request to that device is queued behind a command that is being retried,
+and the `AsyncCrosEc` timeout only stops awaiting the result, it doesn't stop the retries.
+Keep `RetryingCrosEc.timeout` and `RetryingCrosEc.deadlines` within the `AsyncCrosEc` timeout.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, flash
+from cros_ec_python.layers.retry import RetryingCrosEc
+
+ec = RetryingCrosEc(get_cros_ec(), deadlines={flash.EC_CMD_FLASH_ERASE: 30})
+
+print(flash.flash_info(ec))
+print(ec.stats)
+```
+"""
+
+import random
+import threading
+import time
+
+from .base import CrosEcLayer
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..exceptions import ECError
+from ..commands import general, system
+
+__all__ = ["RetryingCrosEc"]
+
+
+class RetryingCrosEc(CrosEcLayer):
+    """
+    A layer that retries commands the EC is too busy for, and waits for commands that are still in progress.
+
+    Each command has a deadline, after which `TimeoutError` is raised.
+    """
+
+    def __init__(
+        self,
+        ec: CrosEcClass,
+        timeout: float = 5,
+        deadlines: dict[int, float] | None = None,
+        retries: int = 10,
+        initial_delay: float = 0.01,
+        max_delay: float = 0.5,
+        jitter: float = 0.5,
+    ):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object to wrap.
+        :param timeout: Seconds each command has to complete, including retries and waiting.
+        :param deadlines: Seconds per command (EC_CMD_...), overriding `timeout`.
+        :param retries: The most times a busy command is retried.
+        :param initial_delay: Seconds before the first retry or poll, doubled after each one.
+        :param max_delay: The longest time between retries or polls in seconds.
+        :param jitter: The fraction of each delay that is randomised, from 0 (none) to 1.
+        """
+        super().__init__(ec)
+
+        self.timeout: float = timeout
+        """Seconds each command has to complete."""
+
+        self.deadlines: dict[int, float] = dict(deadlines or {})
+        """Seconds per command, overriding `timeout`."""
+
+        self.retries: int = retries
+        """The most times a busy command is retried."""
+
+        self.initial_delay: float = initial_delay
+        """Seconds before the first retry or poll."""
+
+        self.max_delay: float = max_delay
+        """The longest time between retries or polls in seconds."""
+
+        self.jitter: float = jitter
+        """The fraction of each delay that is randomised."""
+
+        self.stats: dict[str, int | float] = {
+            "commands": 0, "busy_retries": 0, "in_progress": 0, "polls": 0, "timeouts": 0, "wait_time": 0.0
+        }
+        """
+        Number of commands sent, retries after EC_RES_BUSY, commands that returned EC_RES_IN_PROGRESS,
+        comms status polls, commands that ran out of time, and the total seconds spent waiting.
+        """
+
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, value: int | float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _sleep(self, delay: float, deadline: float) -> float:
+        """
+        Sleep for a jittered delay, cut short by the deadline.
+        :return: The next delay.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._count("timeouts")
+            raise TimeoutError("EC command didn't complete before its deadline")
+        wait = min(delay * (1 - self.jitter * random.random()), remaining)
+        time.sleep(wait)
+        self._count("wait_time", wait)
+        return min(delay * 2, self.max_delay)
+
+    def _complete(self, insize: Int32, deadline: float) -> bytes:
+        """
+        Wait for a command that returned EC_RES_IN_PROGRESS, and get its response.
+        """
+        delay = self.initial_delay
+        while True:
+            delay = self._sleep(delay, deadline)
+            self._count("polls")
+            if not general.get_comms_status(self.ec) & general.EC_COMMS_STATUS_PROCESSING:
+                break
+
+        try:
+            return system.resend_response(self.ec, insize)
+        except ECError as e:
+            if e.status not in (EcStatus.EC_RES_INVALID_COMMAND.value, EcStatus.EC_RES_UNAVAILABLE.value):
+                raise e
+            # No saved response, the command finished so treat it as a success like the kernel driver does,
+            # but without any data, so callers expecting a response fail their size checks
+            return b""
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        deadline = time.monotonic() + self.deadlines.get(command, self.timeout)
+        delay = self.initial_delay
+        self._count("commands")
+        for attempt in range(self.retries + 1):
+            try:
+                return self.ec.command(version, command, outsize, insize, data, warn)
+            except ECError as e:
+                if e.status == EcStatus.EC_RES_IN_PROGRESS.value and not self.ec.waits_in_progress:
+                    self._count("in_progress")
+                    return self._complete(insize, deadline)
+                if e.status != EcStatus.EC_RES_BUSY.value or attempt == self.retries:
+                    raise e
+            delay = self._sleep(delay, deadline)
+            self._count("busy_retries")
@@ -0,0 +1,325 @@
+"""
+Priority scheduling and rate limiting of EC commands.
+
+Without a scheduler every caller gets first come, first served access to the EC,
+so a burst of telemetry reads can delay a fan or thermal control command.
+`ScheduledCrosEc` lets one request reach the EC at a time, always picking the highest priority request waiting,
+and uses token buckets to limit how often each priority class and command can be sent.
+Requests made while holding the device lock (e.g. in a batch) already have the EC to themselves,
+so they skip the queue and rate limits.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec, memmap, pwm
+from cros_ec_python.layers.scheduler import ScheduledCrosEc, Priority
+
+sched = ScheduledCrosEc(
+    get_cros_ec(),
+    class_limits={Priority.TELEMETRY: (20, 5)},  # 20 requests/s, bursts of 5
+)
+
+telemetry = sched.view(Priority.TELEMETRY)
+print(memmap.get_temps(telemetry))
+
+# Fan control commands are always scheduled as Priority.CONTROL
+pwm.pwm_set_fan_duty(sched, 50)
+
+print(sched.stats())
+```
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from enum import Enum
+from typing import Callable
+
+from .base import CrosEcLayer
+from ..baseclass import CrosEcClass
+from ..constants.COMMON import *
+from ..commands import pwm, thermal, framework_laptop
+
+__all__ = ["ScheduledCrosEc", "Priority", "TokenBucket", "COMMAND_PRIORITIES"]
+
+
+class Priority(Enum):
+    """Priority classes, lower values are sent first."""
+
+    CONTROL = 0
+    "Safety-critical control, e.g. fan and thermal commands"
+
+    INTERACTIVE = 1
+    "Requests a user is waiting on"
+
+    TELEMETRY = 2
+    "Background monitoring"
+
+
+COMMAND_PRIORITIES: dict[int, Priority] = {
+    pwm.EC_CMD_PWM_SET_FAN_TARGET_RPM: Priority.CONTROL,
+    pwm.EC_CMD_PWM_SET_FAN_DUTY: Priority.CONTROL,
+    thermal.EC_CMD_THERMAL_AUTO_FAN_CTRL: Priority.CONTROL,
+    thermal.EC_CMD_THERMAL_SET_THRESHOLD: Priority.CONTROL,
+    framework_laptop.EC_CMD_CHARGE_LIMIT_CONTROL: Priority.CONTROL,
+}
+"""Commands that are always scheduled at (at least) this priority, no matter which view sent them."""
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter. Each request takes one token, and tokens refill at a fixed rate.
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        """
+        Create a full bucket.
+        :param rate: Tokens added per second.
+        :param burst: The maximum number of tokens the bucket can hold.
+        """
+        self.rate: float = rate
+        """Tokens added per second."""
+
+        self.burst: float = burst
+        """The maximum number of tokens the bucket can hold."""
+
+        self.tokens: float = burst
+        """The current number of tokens."""
+
+        self._updated: float = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """
+        Get the time until a token is available.
+        :param now: The current `time.monotonic()`.
+        :return: Seconds until a token is available, 0 if one is available now.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """
+        Take a token, `delay` must have returned 0 first.
+        """
+        self.tokens -= 1
+
+
+class _Waiter:
+    def __init__(self, priority: Priority, command: int | None, seq: int):
+        self.priority = priority
+        self.command = command
+        self.order = (priority.value, seq)
+        self.throttled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.order < other.order
+
+
+class _PriorityView(CrosEcLayer):
+    """
+    A view of a `ScheduledCrosEc` that sends every request at a fixed priority.
+    """
+
+    def __init__(self, scheduler: "ScheduledCrosEc", priority: Priority):
+        super().__init__(scheduler)
+        self.priority: Priority = priority
+        """The priority used for requests from this view."""
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        return self.ec._command(self.priority, version, command, outsize, insize, data, warn)
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
+        return self.ec._memmap(self.priority, offset, num_bytes)
+
+
+class ScheduledCrosEc(CrosEcLayer):
+    """
+    A layer that sends one request at a time to the EC, in priority order, with optional rate limits.
+
+    Requests made directly on this object use `default_priority`, use `view` to get a CrosEc object with another priority.
+    Commands in `COMMAND_PRIORITIES` are raised to their listed priority.
+    """
+
+    def __init__(
+        self,
+        ec: CrosEcClass,
+        default_priority: Priority = Priority.INTERACTIVE,
+        memmap_priority: Priority | None = None,
+        class_limits: dict[Priority, tuple[float, float]] | None = None,
+        command_limits: dict[int, tuple[float, float]] | None = None,
+        command_priorities: dict[int, Priority] | None = None,
+    ):
+        """
+        Wrap a CrosEc object.
+        :param ec: The CrOS_EC object to wrap.
+        :param default_priority: The priority of requests made directly on this object.
+        :param memmap_priority: The priority of memmap reads made directly on this object, `default_priority` if None.
+        :param class_limits: Rate limits per priority class, as `(requests per second, burst)`.
+        :param command_limits: Rate limits per command (EC_CMD_...), as `(requests per second, burst)`.
+        :param command_priorities: Minimum priority per command, see `COMMAND_PRIORITIES` (the default).
+        """
+        super().__init__(ec)
+
+        self.default_priority: Priority = default_priority
+        """The priority of requests made directly on this object."""
+
+        self.memmap_priority: Priority = default_priority if memmap_priority is None else memmap_priority
+        """The priority of memmap reads made directly on this object."""
+
+        self.command_priorities: dict[int, Priority] = (
+            dict(COMMAND_PRIORITIES) if command_priorities is None else command_priorities
+        )
+        """Minimum priority per command."""
+
+        self.class_buckets: dict[Priority, TokenBucket] = {
+            priority: TokenBucket(*limit) for priority, limit in (class_limits or {}).items()
+        }
+        """Rate limits per priority class."""
+
+        self.command_buckets: dict[int, TokenBucket] = {
+            command: TokenBucket(*limit) for command, limit in (command_limits or {}).items()
+        }
+        """Rate limits per command."""
+
+        self._cond = threading.Condition()
+        self._waiting: list[_Waiter] = []
+        self._busy = False
+        self._seq = itertools.count()
+
+        self._requests = {priority: 0 for priority in Priority}
+        self._wait_time = {priority: 0.0 for priority in Priority}
+        self._max_wait = {priority: 0.0 for priority in Priority}
+        self._throttled = {priority: 0 for priority in Priority}
+
+    def view(self, priority: Priority) -> CrosEcClass:
+        """
+        Get a CrosEc object that sends all its requests at a given priority.
+        :param priority: The priority to use.
+        :return: A CrosEc object that can be passed to any command function.
+        """
+        return _PriorityView(self, priority)
+
+    def stats(self) -> dict[str, dict[Priority, int | float]]:
+        """
+        Get scheduler statistics per priority class.
+        :return: `queue_depth` is the number of requests currently waiting, `requests` is the total sent,
+        `wait_time` and `max_wait` are the total and longest time spent waiting in seconds,
+        and `throttled` is the number of requests delayed by a rate limit.
+        """
+        with self._cond:
+            depth = {priority: 0 for priority in Priority}
+            for waiter in self._waiting:
+                depth[waiter.priority] += 1
+            return {
+                "queue_depth": depth,
+                "requests": dict(self._requests),
+                "wait_time": dict(self._wait_time),
+                "max_wait": dict(self._max_wait),
+                "throttled": dict(self._throttled),
+            }
+
+    def _buckets(self, waiter: _Waiter) -> list[TokenBucket]:
+        buckets = []
+        if waiter.priority in self.class_buckets:
+            buckets.append(self.class_buckets[waiter.priority])
+        if waiter.command in self.command_buckets:
+            buckets.append(self.command_buckets[waiter.command])
+        return buckets
+
+    def _pick(self, now: float) -> tuple[_Waiter | None, float | None]:
+        """
+        Find the highest priority waiter that isn't rate limited.
+        Must be called with the lock held.
+        :return: The waiter to run (or None), and the time until a rate limited waiter could run (or None).
+        """
+        retry = None
+        for waiter in sorted(self._waiting):
+            delay = max((bucket.delay(now) for bucket in self._buckets(waiter)), default=0)
+            if not delay:
+                return waiter, retry
+            if not waiter.throttled:
+                waiter.throttled = True
+                self._throttled[waiter.priority] += 1
+            retry = delay if retry is None else min(retry, delay)
+        return None, retry
+
+    def _submit(self, priority: Priority, command: int | None, func: Callable, *args) -> bytes:
+        if self._owns_lock():
+            # The device is already ours, and the request being run may be stuck waiting for the lock
+            with self._cond:
+                self._requests[priority] += 1
+            return func(*args)
+
+        start = time.monotonic()
+        with self._cond:
+            waiter = _Waiter(priority, command, next(self._seq))
+            heapq.heappush(self._waiting, waiter)
+            while True:
+                timeout = None
+                if not self._busy:
+                    pick, timeout = self._pick(time.monotonic())
+                    if pick is waiter:
+                        break
+                # Woken by the running request finishing, or when a rate limited request could run
+                self._cond.wait(timeout)
+
+            self._waiting.remove(waiter)
+            heapq.heapify(self._waiting)
+            for bucket in self._buckets(waiter):
+                bucket.take()
+            self._busy = True
+
+            waited = time.monotonic() - start
+            self._requests[priority] += 1
+            self._wait_time[priority] += waited
+            self._max_wait[priority] = max(self._max_wait[priority], waited)
+
+        try:
+            return func(*args)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _command(
+        self,
+        priority: Priority,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        if (minimum := self.command_priorities.get(command)) is not None and minimum.value < priority.value:
+            priority = minimum
+        return self._submit(priority, command, self.ec.command, version, command, outsize, insize, data, warn)
+
+    def _memmap(self, priority: Priority, offset: Int32, num_bytes: Int32) -> bytes:
+        return self._submit(priority, None, self.ec.memmap, offset, num_bytes)
+
+    def command(
+        self,
+        version: Int32,
+        command: Int32,
+        outsize: Int32,
+        insize: Int32,
+        data: bytes = None,
+        warn: bool = True,
+    ) -> bytes:
+        return self._command(self.default_priority, version, command, outsize, insize, data, warn)
+
+    def memmap(self, offset: Int32, num_bytes: Int32) -> bytes:
+        return self._memmap(self.memmap_priority, offset, num_bytes)
@@ -0,0 +1,289 @@
+"""
+A lighting effects engine for the LEDs and keyboard backlight.
+
+Effects are lists of frames, built with `solid`, `fade`, `pulse` and `blink`, and joined together with `+`.
+When an effect is played, every frame is rendered to raw EC values up front
+(using the LED's brightness range, which is only queried once per LED), and repeated frames are merged.
+The engine then sends a frame only when it differs from the last one sent to that light,
+and caps the total command rate, dropping stale frames rather than queuing them up.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec
+from cros_ec_python.commands.leds import EcLedId, EcLedColors
+from cros_ec_python.lighting import LightingEngine, pulse, blink, fade
+
+ec = get_cros_ec()
+
+with LightingEngine(ec, fps=20, max_rate=30) as lights:
+    lights.play_keyboard(pulse(0.1, 1, period=3), loop=True)
+    lights.play_led(EcLedId.EC_LED_ID_POWER_LED, blink({EcLedColors.EC_LED_COLOR_WHITE: 1}, 0.5, 0.5), loop=True)
+    input("Press enter to stop...")
+# LEDs are back in automatic control, and the keyboard backlight is back to where it was
+```
+"""
+
+import bisect
+import threading
+import time
+from typing import Union
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+from .commands import leds, pwm
+from .commands.leds import EcLedId, EcLedColors
+from .layers.scheduler import TokenBucket
+from .watch import _Poller
+
+__all__ = ["LightingEngine", "Effect", "solid", "fade", "pulse", "blink"]
+
+Level = Union[float, dict[EcLedColors, float]]
+"""
+A brightness from 0 to 1. Either a single level, which applies to every color of an LED (or the keyboard backlight),
+or a level for each LED color, colors that are left out are off.
+"""
+
+
+class Effect:
+    """
+    A list of `(duration, level)` frames. Once the last frame is reached, it is held until something else is played.
+    """
+
+    def __init__(self, frames: list[tuple[float, Level]]):
+        """
+        Create an effect from a list of frames.
+        :param frames: A list of `(duration in seconds, level)` frames.
+        """
+        self.frames: list[tuple[float, Level]] = frames
+        """The `(duration in seconds, level)` frames."""
+
+    @property
+    def duration(self) -> float:
+        """The total duration of the effect in seconds."""
+        return sum(duration for duration, _ in self.frames)
+
+    def __add__(self, other: "Effect") -> "Effect":
+        return Effect(self.frames + other.frames)
+
+
+def _mix(start: Level, end: Level, t: float) -> Level:
+    if isinstance(start, dict) or isinstance(end, dict):
+        if not isinstance(start, dict):
+            start = {color: start for color in end}
+        if not isinstance(end, dict):
+            end = {color: end for color in start}
+        return {color: start.get(color, 0) + (end.get(color, 0) - start.get(color, 0)) * t for color in start | end}
+    return start + (end - start) * t
+
+
+def solid(level: Level, duration: float = 0) -> Effect:
+    """
+    Hold a single level.
+    :param level: The level.
+    :param duration: How long to hold it for, only matters if something follows it.
+    :return: The effect.
+    """
+    return Effect([(duration, level)])
+
+
+def fade(start: Level, end: Level, duration: float, steps: int = 20) -> Effect:
+    """
+    Fade linearly from one level to another.
+    :param start: The starting level.
+    :param end: The final level.
+    :param duration: How long the fade takes in seconds.
+    :param steps: The number of frames in the fade.
+    :return: The effect.
+    """
+    step = duration / steps
+    return Effect([(step, _mix(start, end, i / steps)) for i in range(steps)] + [(0, end)])
+
+
+def pulse(low: Level, high: Level, period: float, steps: int = 20) -> Effect:
+    """
+    Fade up and back down, play it with `loop=True` for a breathing effect.
+    :param low: The lowest level.
+    :param high: The highest level.
+    :param period: How long a full cycle takes in seconds.
+    :param steps: The number of frames in each direction.
+    :return: The effect.
+    """
+    up = fade(low, high, period / 2, steps)
+    down = fade(high, low, period / 2, steps)
+    # Drop the zero length end frames, they are the start of the next fade
+    return Effect(up.frames[:-1] + down.frames[:-1])
+
+
+def blink(level: Level, on_time: float, off_time: float, off_level: Level = 0) -> Effect:
+    """
+    Switch between two levels, play it with `loop=True` to keep blinking.
+    :param level: The on level.
+    :param on_time: Seconds on.
+    :param off_time: Seconds off.
+    :param off_level: The off level.
+    :return: The effect.
+    """
+    return Effect([(on_time, level), (off_time, off_level)])
+
+
+class _Playback:
+    """
+    An effect rendered to raw values for one light.
+    """
+
+    def __init__(self, offsets: list[float], raw: list[tuple], total: float, loop: bool, started: float):
+        self.offsets = offsets
+        self.raw = raw
+        self.total = total
+        self.loop = loop
+        self.started = started
+
+    def frame(self, now: float) -> tuple:
+        t = now - self.started
+        if self.loop and self.total > 0:
+            t %= self.total
+        return self.raw[bisect.bisect_right(self.offsets, t) - 1]
+
+
+class LightingEngine(_Poller):
+    """
+    Plays effects on the LEDs and keyboard backlight from a background thread.
+    """
+
+    def __init__(self, ec: CrosEcClass, fps: float = 20, max_rate: float = 30):
+        """
+        Create a lighting engine, use `play_led` and `play_keyboard` to play effects, and `start` to run them.
+        :param ec: The CrOS_EC object.
+        :param fps: Frames per second, the rate each light is updated at.
+        :param max_rate: The maximum number of commands per second, across every light.
+        """
+        super().__init__(1 / fps)
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.rate_limit: TokenBucket = TokenBucket(max_rate, max(1.0, max_rate / fps))
+        """Caps the total command rate. Frames that would go over it are dropped, not queued."""
+
+        self.stats: dict[str, int] = {"sent": 0, "duplicate": 0, "dropped": 0}
+        """Number of frames sent, skipped as identical to the last one sent, and dropped by the rate limit."""
+
+        self._max_values: dict[EcLedId, list[UInt8]] = {}
+        self._kb_original: dict[UInt8, UInt16] = {}
+        self._playing: dict[tuple, _Playback] = {}
+        self._last_sent: dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def led_max_values(self, led_id: EcLedId) -> list[UInt8]:
+        """
+        Get the brightness range of each color of an LED. This is only read from the EC once per LED.
+        :param led_id: The LED.
+        :return: The maximum brightness for each color, see `cros_ec_python.commands.leds.led_control_get_max_values`.
+        """
+        if led_id not in self._max_values:
+            self._max_values[led_id] = leds.led_control_get_max_values(self.ec, led_id)
+        return self._max_values[led_id]
+
+    def _render_led(self, led_id: EcLedId, level: Level) -> tuple:
+        max_values = self.led_max_values(led_id)
+        if not isinstance(level, dict):
+            level = {color: level for color in EcLedColors if color != EcLedColors.EC_LED_COLOR_COUNT}
+        raw = [0] * EcLedColors.EC_LED_COLOR_COUNT.value
+        for color, value in level.items():
+            raw[color.value] = round(min(max(value, 0), 1) * max_values[color.value])
+        return tuple(raw)
+
+    @staticmethod
+    def _render_keyboard(level: Level) -> tuple:
+        if isinstance(level, dict):
+            raise TypeError("The keyboard backlight only has a single level")
+        return (round(min(max(level, 0), 1) * pwm.EC_PWM_MAX_DUTY),)
+
+    def _play(self, key: tuple, effect: Effect, loop: bool, render) -> None:
+        offsets, raw = [], []
+        offset = 0
+        for duration, level in effect.frames:
+            frame = render(level)
+            if not raw or raw[-1] != frame:
+                offsets.append(offset)
+                raw.append(frame)
+            offset += duration
+        if not raw:
+            raise ValueError("Effect has no frames")
+
+        with self._lock:
+            self._playing[key] = _Playback(offsets, raw, offset, loop, time.monotonic())
+
+    def play_led(self, led_id: EcLedId, effect: Effect, loop: bool = False) -> None:
+        """
+        Play an effect on an LED, replacing anything already playing on it.
+        :param led_id: The LED.
+        :param effect: The effect to play.
+        :param loop: Repeat the effect forever, otherwise the last frame is held.
+        """
+        self._play(("led", led_id), effect, loop, lambda level: self._render_led(led_id, level))
+
+    def play_keyboard(self, effect: Effect, loop: bool = False, index: UInt8 = 0) -> None:
+        """
+        Play an effect on the keyboard backlight, replacing anything already playing on it.
+        :param effect: The effect to play.
+        :param loop: Repeat the effect forever, otherwise the last frame is held.
+        :param index: The keyboard backlight PWM index.
+        """
+        if index not in self._kb_original:
+            self._kb_original[index] = pwm.pwm_get_duty(self.ec, pwm.EcPwmType.EC_PWM_TYPE_KB_LIGHT, index)
+        self._play(("kb", index), effect, loop, self._render_keyboard)
+
+    def _send(self, key: tuple, raw: tuple) -> None:
+        kind, target = key
+        if kind == "led":
+            leds.led_control(self.ec, target, 0, list(raw))
+        else:
+            pwm.pwm_set_duty(self.ec, raw[0], pwm.EcPwmType.EC_PWM_TYPE_KB_LIGHT, target)
+
+    def poll(self) -> None:
+        """
+        Send the current frame of every playing effect, this is called automatically by the background thread.
+        """
+        now = time.monotonic()
+        with self._lock:
+            frames = [(key, playback.frame(now)) for key, playback in self._playing.items()]
+
+        for key, raw in frames:
+            if self._last_sent.get(key) == raw:
+                self.stats["duplicate"] += 1
+                continue
+            if self.rate_limit.delay(now):
+                self.stats["dropped"] += 1
+                continue
+            self.rate_limit.take()
+            self._send(key, raw)
+            self._last_sent[key] = raw
+            self.stats["sent"] += 1
+
+    def stop_effect(self, key: EcLedId | UInt8) -> None:
+        """
+        Stop the effect on a light and give it back, LEDs go back to automatic control,
+        and the keyboard backlight goes back to its level from before the first effect.
+        :param key: An LED, or a keyboard backlight index.
+        """
+        key = ("led", key) if isinstance(key, EcLedId) else ("kb", key)
+        with self._lock:
+            self._playing.pop(key, None)
+        self._last_sent.pop(key, None)
+
+        kind, target = key
+        if kind == "led":
+            leds.led_control_set_auto(self.ec, target)
+        elif target in self._kb_original:
+            pwm.pwm_set_duty(self.ec, self._kb_original.pop(target), pwm.EcPwmType.EC_PWM_TYPE_KB_LIGHT, target)
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, and give every light back, see `stop_effect`.
+        """
+        super().stop()
+        with self._lock:
+            keys = list(self._playing)
+        for _, target in keys:
+            self.stop_effect(target)
@@ -0,0 +1,144 @@
+"""
+A pool of every EC on the system.
+
+Some systems have more than one EC, each with its own device node,
+like a fingerprint MCU at `/dev/cros_fp` or a USB-PD controller at `/dev/cros_pd` alongside the main `/dev/cros_ec`.
+`EcPool` opens all of them, and runs queries against every device in parallel,
+so a slow device doesn't hold up the others.
+Results are returned per device, with any exception in place of the result for the devices that failed.
+
+Each device keeps its own `cros_ec_python.capabilities.EcCapabilities`,
+so feature and command version checks are only made once per device.
+
+## Example
+
+```python
+from cros_ec_python import general
+from cros_ec_python.pool import EcPool
+
+with EcPool.open() as pool:
+    for name, version in pool.map(general.get_version).items():
+        print(name, version)
+```
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .baseclass import CrosEcClass
+from .commands import general
+
+__all__ = ["EcPool"]
+
+
+class EcPool:
+    """
+    A group of EC devices, queried in parallel.
+    """
+
+    def __init__(self, devices: dict[str, CrosEcClass], max_workers: int | None = None):
+        """
+        Create a pool from devices that are already open, see `open` to find and open them automatically.
+        :param devices: The devices by name.
+        :param max_workers: The number of threads to query devices with, defaults to one per device.
+        """
+        self.devices: dict[str, CrosEcClass] = devices
+        """The devices by name."""
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(devices), 1), thread_name_prefix=type(self).__name__
+        )
+        self._owned: bool = False
+
+    @classmethod
+    def open(cls, paths: list[str] | None = None, max_workers: int | None = None, **kwargs) -> "EcPool":
+        """
+        Open every cros_ec device node, this is only supported on Linux.
+        :param paths: The device nodes to open, defaults to all of them, see `cros_ec_python.devices.dev.find_devices`.
+        :param max_workers: The number of threads to query devices with, defaults to one per device.
+        :param kwargs: Keyword arguments to pass to `cros_ec_python.devices.dev.CrosEcDev`.
+        :return: The pool, with devices named after their device node (e.g. `cros_ec`, `cros_fp`).
+        """
+        from .devices import dev
+
+        if paths is None:
+            paths = dev.find_devices()
+        if not paths:
+            raise OSError("No cros_ec devices found, check the cros_ec_dev kernel module is loaded.")
+
+        devices = {}
+        try:
+            for path in paths:
+                devices[os.path.basename(path)] = dev.CrosEcDev(path=path, **kwargs)
+        except BaseException:
+            for ec in devices.values():
+                ec.ec_exit()
+            raise
+        pool = cls(devices, max_workers)
+        pool._owned = True
+        return pool
+
+    def map(self, func: Callable[..., Any], *args, **kwargs) -> dict[str, Any]:
+        """
+        Call a function on every device in parallel.
+        :param func: A function that takes the device as its first argument, like any command wrapper.
+        :param args: Positional arguments to pass after the device.
+        :param kwargs: Keyword arguments to pass.
+        :return: The result for each device by name, or the exception raised for that device.
+        """
+        futures = {name: self._executor.submit(func, ec, *args, **kwargs) for name, ec in self.devices.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+        return results
+
+    def inventory(self) -> dict[str, dict[str, Any]]:
+        """
+        Identify every device.
+        :return: For each device by name, a dict of `version` (see `general.get_version`),
+        `build_info`, `chip_info` and `features` (the feature bitmask), with the exception in place of anything that failed.
+        """
+
+        def identify(ec: CrosEcClass) -> dict[str, Any]:
+            info = {}
+            for key, func in (
+                ("version", general.get_version),
+                ("build_info", general.get_build_info),
+                ("chip_info", general.get_chip_info),
+                ("features", lambda ec: ec.capabilities.features),
+            ):
+                try:
+                    info[key] = func(ec)
+                except Exception as e:
+                    info[key] = e
+            return info
+
+        return self.map(identify)
+
+    def close(self) -> None:
+        """
+        Stop the worker threads, and close every device if they were opened by `open`.
+        """
+        self._executor.shutdown()
+        if self._owned:
+            for ec in self.devices.values():
+                ec.ec_exit()
+
+    def __getitem__(self, name: str) -> CrosEcClass:
+        return self.devices[name]
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __enter__(self) -> "EcPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
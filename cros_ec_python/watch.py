@@ -0,0 +1,492 @@
+"""
+Background watchers that poll the EC and dispatch callbacks when something changes.
+
+Instead of several parts of a program each polling `cros_ec_python.commands.memmap.get_switches` or
+`cros_ec_python.commands.memmap.get_battery_values` at their own rate, they can all subscribe to a single
+`EcWatch`, which only reads the memmap regions that have subscribers, once per tick.
+
+`HostEventWatcher` is even cheaper, it only polls the 8 byte host event word, and fires on newly set events.
+
+`MkbpEventPump` drains queued MKBP events into a queue. On `cros_ec_python.devices.lpc.CrosEcLpc`
+it first checks the SCI/SMI pending bits in a single status byte, so nothing is sent to the EC while idle.
+
+## Example
+
+```python
+from cros_ec_python import get_cros_ec
+from cros_ec_python.commands.events import EcHostEvent
+from cros_ec_python.watch import EcWatch, HostEventWatcher
+
+ec = get_cros_ec()
+
+watch = EcWatch.shared(ec, interval=0.5)
+watch.on("lid_open", lambda field, old, new: print("Lid open:", new))
+watch.on("ac_present", lambda field, old, new: print("AC present:", new), debounce=1)
+# Fires when temp sensor 3 goes above 70°C, and again when it drops below 65°C
+watch.on("temp[3]", lambda field, old, new: print("CPU:", new), threshold=70, hysteresis=5)
+watch.start()
+
+# Host events only read 8 bytes per tick, so they can be polled quickly
+events = HostEventWatcher(ec, interval=0.05)
+events.on(EcHostEvent.EC_HOST_EVENT_AC_CONNECTED, lambda event: print("Plugged in"))
+events.start()
+```
+"""
+
+import abc
+import functools
+import queue
+import re
+import threading
+import time
+import warnings
+import weakref
+from typing import Any, Callable
+
+from .baseclass import CrosEcClass
+from .constants.COMMON import *
+from .commands import memmap, events, mkbp, general
+from .commands.events import EcHostEvent, EcHostEventAction, EcHostEventMaskType
+
+__all__ = ["EcWatch", "Subscription", "HostEventWatcher", "MkbpEventPump"]
+
+_NOTHING = object()
+
+
+class _Poller(metaclass=abc.ABCMeta):
+    """
+    Runs `poll` on a background thread at a fixed rate.
+    """
+
+    def __init__(self, interval: float):
+        self.interval: float = interval
+        """Time between polls in seconds."""
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @abc.abstractmethod
+    def poll(self) -> None:
+        """
+        Poll the EC once, called every `interval` seconds while running.
+        """
+        pass
+
+    def _run(self) -> None:
+        # Schedule against a fixed timeline so slow polls don't make the rate drift
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                warnings.warn(f"{type(self).__name__} poll failed: {e!r}", RuntimeWarning)
+            deadline += self.interval
+            now = time.monotonic()
+            if deadline < now:
+                # We've fallen behind, skip the missed ticks instead of bursting
+                deadline = now
+            self._stop.wait(deadline - now)
+
+    def start(self) -> None:
+        """
+        Start polling in a background thread.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, and wait for it to finish.
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """True if the background thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class Subscription:
+    """
+    A single callback registered with `EcWatch.on`.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        callback: Callable[[str, Any, Any], None],
+        threshold: int | float | None = None,
+        hysteresis: int | float = 0,
+        debounce: float = 0,
+    ):
+        self.field: str = field
+        """The field being watched, e.g. `lid_open` or `temp[3]`."""
+
+        self.callback: Callable[[str, Any, Any], None] = callback
+        """Called as `callback(field, old, new)`."""
+
+        self.threshold: int | float | None = threshold
+        """If set, only fire when the value crosses this threshold."""
+
+        self.hysteresis: int | float = hysteresis
+        """
+        With a threshold, the value must drop this far below the threshold before it counts as crossing back.
+        Without a threshold, numeric values must move at least this much before a change is reported.
+        """
+
+        self.debounce: float = debounce
+        """A new state must be held for this many seconds before it is reported."""
+
+        self._value: Any = None
+        self._state: Any = None
+        self._primed: bool = False
+        self._pending: Any = _NOTHING
+        self._pending_since: float = 0
+
+    def _candidate(self, value: Any) -> Any:
+        if self.threshold is not None:
+            if value is None:
+                return None
+            if self._state:
+                return value >= self.threshold - self.hysteresis
+            return value >= self.threshold
+
+        if (
+            self.hysteresis
+            and isinstance(value, (int, float))
+            and isinstance(self._state, (int, float))
+            and abs(value - self._state) < self.hysteresis
+        ):
+            return self._state
+        return value
+
+    def _update(self, value: Any, now: float) -> tuple[Any, Any] | None:
+        """
+        Feed a new sample in, returns `(old, new)` if the callback should fire.
+        """
+        candidate = self._candidate(value)
+
+        if not self._primed:
+            # First sample is the baseline
+            self._primed = True
+            self._state, self._value = candidate, value
+            return None
+
+        if candidate == self._state:
+            self._pending = _NOTHING
+            return None
+
+        if self.debounce:
+            if self._pending is _NOTHING or self._pending != candidate:
+                self._pending = candidate
+                self._pending_since = now
+                return None
+            if now - self._pending_since < self.debounce:
+                return None
+            self._pending = _NOTHING
+
+        old = self._value
+        self._state, self._value = candidate, value
+        return old, value
+
+
+class EcWatch(_Poller):
+    """
+    Polls the EC memmap and dispatches callbacks to subscribers when a field changes.
+
+    Only the memmap regions with at least one subscriber are read each tick.
+    """
+
+    # Keep entries at their sensor index, so an erroring sensor doesn't shift the ones after it
+    _indexed: dict[str, Callable[[CrosEcClass], list]] = {
+        "temp": functools.partial(memmap.get_temps, by_index=True),
+        "fan": functools.partial(memmap.get_fans, by_index=True),
+        "als": memmap.get_als,
+    }
+
+    _keyed: dict[str, Callable[[CrosEcClass], dict]] = {
+        "lid_open": memmap.get_switches,
+        "power_button_pressed": memmap.get_switches,
+        "write_protect_disabled": memmap.get_switches,
+        "dedicated_recovery": memmap.get_switches,
+        **{
+            key: memmap.get_battery_values
+            for key in (
+                "volt", "rate", "capacity", "ac_present", "batt_present", "discharging", "charging",
+                "level_critical", "invalid_data", "count", "index", "design_capacity", "design_voltage",
+                "last_full_charge_capacity", "cycle_count", "manufacturer", "model", "serial", "type",
+            )
+        },
+    }
+
+    _shared: "weakref.WeakKeyDictionary[CrosEcClass, EcWatch]" = weakref.WeakKeyDictionary()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ec: CrosEcClass, interval: float = 0.5):
+        """
+        Create a watcher. Use `EcWatch.shared` to share one watcher between multiple components.
+        :param ec: The CrOS_EC object.
+        :param interval: Time between polls in seconds.
+        """
+        super().__init__(interval)
+
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self._subs: list[Subscription] = []
+        self._subs_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, ec: CrosEcClass, interval: float | None = None) -> "EcWatch":
+        """
+        Get the shared watcher for a device, creating it if needed.
+        :param ec: The CrOS_EC object.
+        :param interval: The poll interval wanted by the caller. The shared watcher polls at the fastest rate requested.
+        :return: The shared `EcWatch` for this device.
+        """
+        with cls._shared_lock:
+            watch = cls._shared.get(ec)
+            if watch is None:
+                watch = cls._shared[ec] = cls(ec, 0.5 if interval is None else interval)
+            elif interval is not None:
+                watch.interval = min(watch.interval, interval)
+            return watch
+
+    @classmethod
+    def _parse_field(cls, field: str) -> tuple[Callable[[CrosEcClass], list | dict], str | int]:
+        if match := re.fullmatch(r"(\w+)\[(\d+)]", field):
+            name, index = match.group(1), int(match.group(2))
+            if name in cls._indexed:
+                return cls._indexed[name], index
+        elif field in cls._keyed:
+            return cls._keyed[field], field
+        raise ValueError(f"Unknown field '{field}'")
+
+    def on(
+        self,
+        field: str,
+        callback: Callable[[str, Any, Any], None],
+        threshold: int | float | None = None,
+        hysteresis: int | float = 0,
+        debounce: float = 0,
+    ) -> Subscription:
+        """
+        Subscribe to changes of a field.
+        :param field: The field to watch. Either a key from `get_switches` or `get_battery_values`
+        (e.g. `lid_open`, `ac_present`), or an indexed value like `temp[3]`, `fan[0]` or `als[0]`.
+        Temperatures and fans are by sensor index, and None while that sensor isn't present or has an error.
+        :param callback: Called as `callback(field, old, new)` from the watcher thread.
+        :param threshold: If set, only fire when the value crosses this threshold, instead of on every change.
+        :param hysteresis: Deadband for thresholds and numeric changes, see `Subscription.hysteresis`.
+        :param debounce: A change must be held for this many seconds before it is reported.
+        :return: The subscription, pass this to `off` to unsubscribe.
+        """
+        self._parse_field(field)
+        sub = Subscription(field, callback, threshold, hysteresis, debounce)
+        with self._subs_lock:
+            self._subs.append(sub)
+        return sub
+
+    def off(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription.
+        :param subscription: The subscription returned from `on`.
+        """
+        with self._subs_lock:
+            self._subs.remove(subscription)
+
+    def poll(self) -> None:
+        """
+        Read every subscribed field once, and dispatch callbacks for any changes.
+        This is called from the background thread, but can also be called manually instead of using `start`.
+        """
+        with self._subs_lock:
+            subs = list(self._subs)
+
+        # Each source is read at most once per tick, no matter how many subscribers
+        samples = {}
+        now = time.monotonic()
+        for sub in subs:
+            source, key = self._parse_field(sub.field)
+            if source not in samples:
+                samples[source] = source(self.ec)
+            data = samples[source]
+            if isinstance(data, dict):
+                value = data.get(key)
+            else:
+                value = data[key] if key < len(data) else None
+
+            if (change := sub._update(value, now)) is not None:
+                try:
+                    sub.callback(sub.field, *change)
+                except Exception as e:
+                    warnings.warn(f"Callback for '{sub.field}' failed: {e!r}", RuntimeWarning)
+
+
+class HostEventWatcher(_Poller):
+    """
+    Polls the host event word in the memmap, and dispatches callbacks for newly set events.
+    """
+
+    def __init__(self, ec: CrosEcClass, interval: float = 0.05, clear: bool = False):
+        """
+        Create a host event watcher.
+        :param ec: The CrOS_EC object.
+        :param interval: Time between polls in seconds.
+        :param clear: Acknowledge events after they have been dispatched, see `ack`.
+        """
+        super().__init__(interval)
+
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.clear: bool = clear
+        """Acknowledge events after they have been dispatched."""
+
+        self.events: int | None = None
+        """The last host event word read, None if it hasn't been read yet."""
+
+        self._callbacks: list[tuple[EcHostEvent | None, Callable[[EcHostEvent], None]]] = []
+        self._callbacks_lock = threading.Lock()
+
+    def on(self, event: EcHostEvent | None, callback: Callable[[EcHostEvent], None]) -> None:
+        """
+        Register a callback for an event.
+        :param event: The event to watch, or None for every event.
+        :param callback: Called as `callback(event)` from the watcher thread.
+        """
+        with self._callbacks_lock:
+            self._callbacks.append((event, callback))
+
+    def off(self, callback: Callable[[EcHostEvent], None]) -> None:
+        """
+        Remove every registration of a callback.
+        :param callback: The callback passed to `on`.
+        """
+        with self._callbacks_lock:
+            self._callbacks = [(e, cb) for e, cb in self._callbacks if cb is not callback]
+
+    def ack(self, mask: UInt64) -> None:
+        """
+        Clear events on the EC, so they will fire again next time they are set.
+        This clears the main copy of the host events, which the OS may also be waiting on.
+        :param mask: The events to clear as a bitmask.
+        """
+        if mask >> 32:
+            events.host_event(
+                self.ec, EcHostEventAction.EC_HOST_EVENT_CLEAR, EcHostEventMaskType.EC_HOST_EVENT_MAIN, mask
+            )
+        else:
+            events.host_event_clear(self.ec, mask)
+        if self.events is not None:
+            self.events &= ~mask
+
+    def poll(self) -> list[EcHostEvent]:
+        """
+        Read the host events once, and dispatch callbacks for any newly set events.
+        :return: The newly set events.
+        """
+        current = events.get_host_events(self.ec)
+        previous, self.events = self.events, current
+        if previous is None or current & events.EC_HOST_EVENT_MASK(EcHostEvent.EC_HOST_EVENT_INVALID):
+            return []
+
+        new = current & ~previous
+        if not new:
+            return []
+
+        decoded = events.decode_host_events(new)
+        with self._callbacks_lock:
+            callbacks = list(self._callbacks)
+        for event in decoded:
+            for wanted, callback in callbacks:
+                if wanted is None or wanted == event:
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        warnings.warn(f"Callback for {event.name} failed: {e!r}", RuntimeWarning)
+
+        if self.clear:
+            self.ack(new)
+        return decoded
+
+
+class MkbpEventPump(_Poller):
+    """
+    Drains MKBP events from the EC with `EC_CMD_GET_NEXT_EVENT`, and puts them on a queue.
+
+    If the device has an `event_pending` method (like `cros_ec_python.devices.lpc.CrosEcLpc`),
+    the EC is only asked for events when the SCI/SMI pending bits are set,
+    so an idle tick costs a single status byte read.
+    """
+
+    def __init__(
+        self,
+        ec: CrosEcClass,
+        interval: float = 0.02,
+        max_batch: int = 16,
+        ack: bool = False,
+        event_queue: queue.Queue | None = None,
+    ):
+        """
+        Create an MKBP event pump.
+        :param ec: The CrOS_EC object.
+        :param interval: Time between checks in seconds.
+        :param max_batch: The maximum number of events to drain per wakeup.
+        :param ack: Clear `EC_HOST_EVENT_MKBP` after draining events, so the pending bits are released.
+        Only use this if there isn't an OS driver handling host events, as it also consumes this event.
+        :param event_queue: The queue to deliver events to, a new one is created by default.
+        """
+        super().__init__(interval)
+
+        self.ec: CrosEcClass = ec
+        """The CrOS_EC object."""
+
+        self.max_batch: int = max_batch
+        """The maximum number of events to drain per wakeup."""
+
+        self.ack: bool = ack
+        """Clear `EC_HOST_EVENT_MKBP` after draining events."""
+
+        self.queue: queue.Queue = queue.Queue() if event_queue is None else event_queue
+        """Events parsed with `cros_ec_python.commands.mkbp.parse_event` are put here."""
+
+        self._version: int | None = None
+
+    @property
+    def version(self) -> int:
+        """The `EC_CMD_GET_NEXT_EVENT` version used, the newest one supported by both the EC and the library."""
+        if self._version is None:
+            versions = general.get_cmd_versions(self.ec, mkbp.EC_CMD_GET_NEXT_EVENT) or 1
+            self._version = max(v for v in range(4) if versions & BIT(v))
+        return self._version
+
+    def poll(self) -> list[dict]:
+        """
+        Check for pending events, and drain them into the queue.
+        :return: The events drained this call.
+        """
+        event_pending = getattr(self.ec, "event_pending", None)
+        if event_pending is not None and not event_pending():
+            return []
+
+        drained = mkbp.drain_events(self.ec, self.max_batch, self.version)
+        for event in drained:
+            self.queue.put(event)
+
+        if self.ack and drained and event_pending is not None:
+            events.host_event_clear(self.ec, events.EC_HOST_EVENT_MASK(EcHostEvent.EC_HOST_EVENT_MKBP))
+        return drained
@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+from cros_ec_python import get_cros_ec, general as ec_general
+from cros_ec_python.aio import AsyncCrosEc
+from cros_ec_python.constants import MEMMAP
+
+ec = get_cros_ec()
+
+
+class TestAsyncCrosEc(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.aec = AsyncCrosEc(ec, timeout=5)
+
+    async def asyncTearDown(self):
+        await self.aec.close()
+
+    async def test_memmap(self):
+        resp = await self.aec.memmap(MEMMAP.EC_MEMMAP_ID, 2)
+        self.assertEqual(resp, b'EC')
+
+    async def test_command(self):
+        data = b'\xa0\xb0\xc0\xd0'
+        resp = await self.aec.command(0, ec_general.EC_CMD_HELLO, len(data), 4, data)
+        self.assertEqual(resp, b'\xa4\xb3\xc2\xd1')
+
+    async def test_module(self):
+        resp = await self.aec.general.hello(42)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertEqual(resp, 42 + 0x01020304)
+
+    async def test_ordering(self):
+        resp = await asyncio.gather(*(self.aec.general.hello(i) for i in range(8)))
+        self.assertEqual(resp, [i + 0x01020304 for i in range(8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from cros_ec_python import get_cros_ec, general as ec_general, memmap as ec_memmap
+from cros_ec_python.constants.MEMMAP import EC_MEMMAP_ID
+
+ec = get_cros_ec()
+
+
+class TestBatch(unittest.TestCase):
+    def test_batch(self):
+        with ec.batch() as b:
+            hello = b.call(ec_general.hello, 42)
+            temps = b.call(ec_memmap.get_temps)
+            ident = b.memmap(EC_MEMMAP_ID, 2)
+        print(type(self).__name__, "-", "Results:", b.results)
+        self.assertEqual(hello.result(), 42 + 0x01020304)
+        self.assertIsInstance(temps.result(), list)
+        self.assertEqual(ident.result(), b"EC")
+        self.assertEqual(len(b.results), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
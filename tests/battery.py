@@ -0,0 +1,33 @@
+import unittest
+from cros_ec_python import get_cros_ec, battery as ec_battery
+
+ec = get_cros_ec()
+
+
+class TestBattery(unittest.TestCase):
+    def test_count(self):
+        resp = ec_battery.battery_count(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+    def test_static(self):
+        resp = ec_battery.battery_get_static(ec, 0)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIn("serial", resp)
+
+    def test_dynamic(self):
+        resp = ec_battery.battery_get_dynamic(ec, 0)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIn("remaining_capacity", resp)
+
+    def test_get_batteries(self):
+        resp = ec_battery.get_batteries(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertEqual(len(resp), ec_battery.battery_count(ec))
+        # Static info comes from the cache the second time
+        again = ec_battery.get_batteries(ec)
+        self.assertEqual([b.get("serial") for b in resp], [b.get("serial") for b in again])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from cros_ec_python import pwm as ec_pwm, thermal as ec_thermal
+from cros_ec_python.layers.cache import SettingsCache
+from cros_ec_python.constants.COMMON import EcStatus
+from cros_ec_python.exceptions import ECError
+from fake_ec import FakeEc
+
+# These use a fake EC, so they don't change any settings.
+
+
+class TestCacheGetters(unittest.TestCase):
+    def test_hit(self):
+        fake = FakeEc({ec_pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT: [bytes([42, 1])]})
+        cec = SettingsCache(fake)
+        first = ec_pwm.pwm_get_keyboard_backlight(cec)
+        second = ec_pwm.pwm_get_keyboard_backlight(cec)
+        print(type(self).__name__, "-", "Stats:", cec.stats)
+        self.assertEqual(first, second)
+        self.assertEqual(first["percent"], 42)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT), 1)
+        self.assertEqual(cec.stats, {"hits": 1, "misses": 1, "skipped": 0})
+
+    def test_write_through_only(self):
+        fake = FakeEc({ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: [(1000).to_bytes(4, "little")] * 2})
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_get_fan_rpm(cec)
+        ec_pwm.pwm_get_fan_rpm(cec)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM), 2)
+        self.assertEqual(cec.stats["hits"], 0)
+
+    def test_refresh(self):
+        fake = FakeEc({ec_pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT: [bytes([42, 1]), bytes([10, 1])]})
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_get_keyboard_backlight(cec)
+        cec.refresh()
+        self.assertEqual(ec_pwm.pwm_get_keyboard_backlight(cec)["percent"], 10)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_GET_KEYBOARD_BACKLIGHT), 2)
+
+
+class TestCacheSetters(unittest.TestCase):
+    def test_write_through(self):
+        fake = FakeEc()
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        self.assertEqual(ec_pwm.pwm_get_fan_rpm(cec), 2000)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM), 0)
+
+    def test_skip_unchanged(self):
+        fake = FakeEc()
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_SET_FAN_TARGET_RPM), 1)
+        self.assertEqual(cec.stats["skipped"], 1)
+
+        cec.skip_unchanged = False
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_SET_FAN_TARGET_RPM), 2)
+
+    def test_invalidate(self):
+        fake = FakeEc({ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: [(1500).to_bytes(4, "little")] * 2})
+        cec = SettingsCache(fake)
+        for invalidate in (
+            lambda: ec_pwm.pwm_set_fan_duty(cec, 50),
+            lambda: ec_thermal.thermal_auto_fan_ctrl(cec),
+        ):
+            ec_pwm.pwm_set_fan_rpm(cec, 2000)
+            invalidate()
+            self.assertEqual(ec_pwm.pwm_get_fan_rpm(cec), 1500)
+        self.assertEqual(fake.sent(ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM), 2)
+
+    def test_single_fan(self):
+        fake = FakeEc({ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: [(1500).to_bytes(4, "little")]})
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        ec_pwm.pwm_set_fan_rpm(cec, 3000, 1)
+        self.assertEqual(ec_pwm.pwm_get_fan_rpm(cec), 1500)
+
+    def test_failed_setter(self):
+        fake = FakeEc({
+            ec_pwm.EC_CMD_PWM_SET_FAN_TARGET_RPM: [bytes(0), EcStatus.EC_RES_ERROR.value],
+            ec_pwm.EC_CMD_PWM_GET_FAN_TARGET_RPM: [(1500).to_bytes(4, "little")],
+        })
+        cec = SettingsCache(fake)
+        ec_pwm.pwm_set_fan_rpm(cec, 2000)
+        with self.assertRaises(ECError):
+            ec_pwm.pwm_set_fan_rpm(cec, 3000)
+        self.assertEqual(ec_pwm.pwm_get_fan_rpm(cec), 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from cros_ec_python import get_cros_ec, memmap as ec_memmap
+from cros_ec_python.charge_policy import ChargePolicy, ChargeRule, ChargeTarget, on_ac, on_battery
+
+ec = get_cros_ec()
+
+
+class TestChargePolicy(unittest.TestCase):
+    def test_evaluate(self):
+        ac = ChargeRule(ChargeTarget(60), when=on_ac(), name="ac")
+        battery = ChargeRule(ChargeTarget(100), when=on_battery(), name="battery")
+        policy = ChargePolicy(ec, [ac, battery])
+        # Take a snapshot without applying anything
+        policy._battery = ec_memmap.get_battery_values(ec)
+        resp = policy.evaluate()
+        print(type(self).__name__, "-", "State:", policy.state, "Rule:", resp)
+        self.assertIn(resp, (ac, battery))
+
+
+if __name__ == '__main__':
+    unittest.main()
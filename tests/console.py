@@ -0,0 +1,22 @@
+import unittest
+from cros_ec_python import get_cros_ec, console as ec_console
+
+ec = get_cros_ec()
+
+
+class TestConsole(unittest.TestCase):
+    def test_read(self):
+        ec_console.console_snapshot(ec)
+        resp = ec_console.console_read(ec)
+        print(type(self).__name__, "-", "Resp:", resp[:64])
+        self.assertIsInstance(resp, bytes)
+
+    def test_reader(self):
+        reader = ec_console.ConsoleReader(ec)
+        resp = reader.read()
+        print(type(self).__name__, "-", "Lines:", len(resp))
+        self.assertIsInstance(resp, list)
+
+
+if __name__ == '__main__':
+    unittest.main()
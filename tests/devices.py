@@ -29,6 +29,13 @@ class TestLinuxDev(unittest.TestCase):
         resp = ec.command(0, general.EC_CMD_HELLO, len(data), 4, data)
         self.assertEqual(resp, b'\xa4\xb3\xc2\xd1')
 
+    def test4_events(self):
+        ec_events = CrosEcDev(events=True)
+        ec_events.event_mask(0xFFFFFFFF)
+        resp = ec_events.read_event(timeout=0)
+        print(type(self).__name__, "-", "Event:", resp)
+        self.assertTrue(resp is None or isinstance(resp, dict))
+
 @unittest.skipUnless(sys.platform == "win32", "requires Windows")
 class TestWinPawnIO(unittest.TestCase):
     def test1_init(self):
@@ -0,0 +1,56 @@
+import unittest
+from cros_ec_python import get_cros_ec, events as ec_events
+
+ec = get_cros_ec()
+
+
+class TestGetHostEvents(unittest.TestCase):
+    def test(self):
+        resp = ec_events.get_host_events(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+    def test_decode(self):
+        resp = ec_events.get_host_events(ec)
+        decode = ec_events.decode_host_events(resp)
+        print(type(self).__name__, "-", "Decode:", decode)
+        self.assertIsInstance(decode, list)
+
+
+class TestHostEventB(unittest.TestCase):
+    def test_get(self):
+        resp = ec_events.host_event_get_b(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+
+class TestHostEventMasks(unittest.TestCase):
+    def test_smi(self):
+        resp = ec_events.host_event_get_smi_mask(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+    def test_sci(self):
+        resp = ec_events.host_event_get_sci_mask(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+    def test_wake(self):
+        resp = ec_events.host_event_get_wake_mask(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+
+class TestHostEvent64(unittest.TestCase):
+    def test_get_main(self):
+        resp = ec_events.host_event(
+            ec,
+            ec_events.EcHostEventAction.EC_HOST_EVENT_GET,
+            ec_events.EcHostEventMaskType.EC_HOST_EVENT_MAIN,
+        )
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+from cros_ec_python.baseclass import CrosEcClass
+from cros_ec_python.exceptions import ECError
+
+
+class FakeEc(CrosEcClass):
+    """
+    A CrosEc object that answers from a script instead of hardware, for testing layers.
+
+    Each command is answered from its list in `script` in order, a bytes item is returned and
+    an int item is raised as an ECError with that status. Once a list runs out, or for commands
+    without one, `bytes(insize)` is returned.
+    """
+
+    def __init__(self, script: dict[int, list[bytes | int]] | None = None):
+        self.script: dict[int, list[bytes | int]] = {
+            command: list(items) for command, items in (script or {}).items()
+        }
+        self.calls: list[tuple[int, int, bytes]] = []
+        """Every request as (command, version, data)."""
+
+    @staticmethod
+    def detect() -> bool:
+        return False
+
+    def ec_init(self) -> None:
+        pass
+
+    def ec_exit(self) -> None:
+        pass
+
+    def command(self, version, command, outsize, insize, data=None, warn=True) -> bytes:
+        self.calls.append((command, version, bytes(data[:outsize]) if data is not None else b""))
+        items = self.script.get(command)
+        if not items:
+            return bytes(insize)
+        item = items.pop(0)
+        if isinstance(item, int):
+            raise ECError(item)
+        return item
+
+    def memmap(self, offset, num_bytes) -> bytes:
+        return bytes(num_bytes)
+
+    def sent(self, command: int) -> int:
+        """The number of times a command was sent."""
+        return sum(1 for call in self.calls if call[0] == command)
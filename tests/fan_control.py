@@ -0,0 +1,30 @@
+import unittest
+from cros_ec_python import get_cros_ec
+from cros_ec_python.fan_control import FanController, FanCurve, PID
+
+ec = get_cros_ec()
+
+
+class TestFanController(unittest.TestCase):
+    def test_poll(self):
+        # No fans added, so this only reads the temperatures
+        controller = FanController(ec)
+        controller.poll()
+        print(type(self).__name__, "-", "Temps:", controller.temps)
+        self.assertIsInstance(controller.temps, list)
+        self.assertTrue(any(temp is not None for temp in controller.temps))
+
+    def test_curve(self):
+        curve = FanCurve([(40, 0), (80, 100)])
+        self.assertEqual(curve(20), 0)
+        self.assertEqual(curve(60), 50)
+        self.assertEqual(curve(90), 100)
+
+    def test_pid(self):
+        pid = PID(kp=10, ki=1, kd=0, setpoint=60)
+        self.assertEqual(pid(70, 1), 100)
+        self.assertEqual(pid(50, 1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
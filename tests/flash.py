@@ -0,0 +1,29 @@
+import unittest
+from cros_ec_python import get_cros_ec, flash as ec_flash
+
+ec = get_cros_ec()
+
+
+class TestFlashInfo(unittest.TestCase):
+    def test_info(self):
+        resp = ec_flash.flash_info(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertGreater(resp["flash_size"], 0)
+
+    def test_region_info(self):
+        resp = ec_flash.flash_region_info(ec, ec_flash.EcFlashRegion.EC_FLASH_REGION_RO)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertGreater(resp["size"], 0)
+
+
+class TestFlashRead(unittest.TestCase):
+    def test_read_into(self):
+        size = ec.capabilities.max_response_size * 2 + 1
+        buf = bytearray(size)
+        resp = ec_flash.flash_read_into(ec, buf, 0)
+        self.assertEqual(resp, size)
+        self.assertEqual(bytes(buf), b"".join(ec_flash.flash_iter(ec, 0, size)))
+
+
+if __name__ == '__main__':
+    unittest.main()
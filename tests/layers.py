@@ -0,0 +1,90 @@
+import threading
+import unittest
+from cros_ec_python import get_cros_ec, general as ec_general, memmap as ec_memmap
+from cros_ec_python.layers.coalesce import CoalescingCrosEc
+from cros_ec_python.layers.scheduler import ScheduledCrosEc, Priority
+from cros_ec_python.layers.cache import SettingsCache
+from cros_ec_python.layers.passthru import PassthruCrosEc
+from cros_ec_python.layers.retry import RetryingCrosEc
+from cros_ec_python.exceptions import ECError
+
+ec = get_cros_ec()
+
+
+class TestCoalescing(unittest.TestCase):
+    def test_command(self):
+        cec = CoalescingCrosEc(ec)
+        resp = ec_general.hello(cec, 42)
+        self.assertEqual(resp, 42 + 0x01020304)
+
+    def test_concurrent(self):
+        cec = CoalescingCrosEc(ec)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(ec_memmap.get_temps(cec))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(type(self).__name__, "-", "Stats:", cec.stats)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(cec.stats["passthrough"], 0)
+
+
+class TestScheduler(unittest.TestCase):
+    def test_view(self):
+        sched = ScheduledCrosEc(ec, class_limits={Priority.TELEMETRY: (100, 2)})
+        telemetry = sched.view(Priority.TELEMETRY)
+        for _ in range(4):
+            ec_memmap.get_temps(telemetry)
+        resp = ec_general.hello(sched, 42)
+        stats = sched.stats()
+        print(type(self).__name__, "-", "Stats:", stats)
+        self.assertEqual(resp, 42 + 0x01020304)
+        self.assertEqual(stats["requests"][Priority.INTERACTIVE], 1)
+        self.assertGreater(stats["throttled"][Priority.TELEMETRY], 0)
+
+
+class TestSettingsCache(unittest.TestCase):
+    def test_cache(self):
+        cec = SettingsCache(ec, getters={ec_general.EC_CMD_GET_VERSION: None})
+        first = ec_general.get_version(cec)
+        second = ec_general.get_version(cec)
+        print(type(self).__name__, "-", "Stats:", cec.stats)
+        self.assertEqual(first, second)
+        self.assertEqual(cec.stats["hits"], 1)
+        cec.refresh()
+        self.assertEqual(ec_general.get_version(cec), first)
+        self.assertEqual(cec.stats["hits"], 2)
+
+
+class TestPassthru(unittest.TestCase):
+    def test_hello(self):
+        pd = PassthruCrosEc(ec)
+        try:
+            resp = ec_general.hello(pd, 42)
+        except ECError as e:
+            self.skipTest(f"No PD MCU: {e}")
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertEqual(resp, 42 + 0x01020304)
+        self.assertIsNot(pd.capabilities, ec.capabilities)
+
+
+class TestRetrying(unittest.TestCase):
+    def test_hello(self):
+        rec = RetryingCrosEc(ec)
+        resp = ec_general.hello(rec, 42)
+        self.assertEqual(resp, 42 + 0x01020304)
+        self.assertEqual(rec.stats["commands"], 1)
+
+    def test_comms_status(self):
+        rec = RetryingCrosEc(ec)
+        try:
+            resp = ec_general.get_comms_status(rec)
+        except ECError as e:
+            self.skipTest(f"Comms status not supported: {e}")
+        print(type(self).__name__, "-", "Resp:", resp, "Stats:", rec.stats)
+        self.assertFalse(resp & ec_general.EC_COMMS_STATUS_PROCESSING)
+
+
+if __name__ == '__main__':
+    unittest.main()
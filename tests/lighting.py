@@ -0,0 +1,29 @@
+import time
+import unittest
+from cros_ec_python import get_cros_ec, leds as ec_leds
+from cros_ec_python.lighting import LightingEngine, blink, pulse
+
+ec = get_cros_ec()
+
+
+class TestLightingEngine(unittest.TestCase):
+    def test1_led(self):
+        with LightingEngine(ec) as lights:
+            lights.play_led(ec_leds.EcLedId.EC_LED_ID_BATTERY_LED,
+                            blink({ec_leds.EcLedColors.EC_LED_COLOR_GREEN: 1}, 0.5, 0.5), loop=True)
+            time.sleep(3)
+        print(type(self).__name__, "-", "Stats:", lights.stats)
+        self.assertGreater(lights.stats["sent"], 0)
+        self.assertEqual(input("Did the battery indicator blink green? [y/N]: "), "y")
+
+    def test2_keyboard(self):
+        with LightingEngine(ec) as lights:
+            lights.play_keyboard(pulse(0, 1, period=2), loop=True)
+            time.sleep(4)
+        print(type(self).__name__, "-", "Stats:", lights.stats)
+        self.assertGreater(lights.stats["duplicate"] + lights.stats["sent"], 0)
+        self.assertEqual(input("Did the keyboard backlight pulse? [y/N]: "), "y")
+
+
+if __name__ == '__main__':
+    unittest.main()
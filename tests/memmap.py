@@ -11,6 +11,16 @@ class TestGetTemps(unittest.TestCase):
         self.assertIsInstance(resp, list)
 
 
+class TestGetTempIndexes(unittest.TestCase):
+    def test(self):
+        resp = ec_memmap.get_temp_indexes(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        temps = ec_memmap.get_temps(ec, by_index=True)
+        for index, temp in enumerate(temps):
+            if temp is not None:
+                self.assertIn(index, resp)
+
+
 class TestGetFans(unittest.TestCase):
     def test(self):
         resp = ec_memmap.get_fans(ec)
@@ -31,6 +41,12 @@ class TestGetBattery(unittest.TestCase):
         print(type(self).__name__, "-", "Resp:", resp)
         self.assertIsInstance(resp, dict)
 
+    def test_cached(self):
+        fresh = ec_memmap.get_battery_values(ec, refresh=True)
+        cached = ec_memmap.get_battery_values(ec)
+        for key in ("manufacturer", "model", "serial", "type"):
+            self.assertEqual(fresh.get(key), cached.get(key))
+
 
 class TestGetALS(unittest.TestCase):
     def test(self):
@@ -46,5 +62,17 @@ class TestGetAccel(unittest.TestCase):
         self.assertIsInstance(resp, list)
 
 
+class TestGetMotionData(unittest.TestCase):
+    def test(self):
+        resp = ec_memmap.get_motion_data(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        if resp is None:
+            self.skipTest("EC doesn't report motion data in the memmap")
+        self.assertEqual(len(resp["gyro"]), 3)
+        # Only a new sample is returned
+        resp2 = ec_memmap.get_motion_data(ec, resp["sample_id"])
+        self.assertTrue(resp2 is None or resp2["sample_id"] != resp["sample_id"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from cros_ec_python import get_cros_ec, mkbp as ec_mkbp
+
+ec = get_cros_ec()
+
+
+class TestGetNextEvent(unittest.TestCase):
+    def test_version0(self):
+        resp = ec_mkbp.get_next_event(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertTrue(resp is None or isinstance(resp, dict))
+
+
+class TestDrainEvents(unittest.TestCase):
+    def test(self):
+        resp = ec_mkbp.drain_events(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, list)
+
+
+class TestParseEvent(unittest.TestCase):
+    def test_switch(self):
+        resp = ec_mkbp.parse_event(bytes([0x84, 1, 0, 0, 0]))
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertEqual(resp["event_type"], ec_mkbp.EcMkbpEvent.EC_MKBP_EVENT_SWITCH)
+        self.assertTrue(resp["has_more"])
+        self.assertEqual(resp["data"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from cros_ec_python import get_cros_ec, motion_sense as ec_motion_sense
+from cros_ec_python.commands.features import EcFeatureCode
+
+ec = get_cros_ec()
+
+
+@unittest.skipUnless(ec.capabilities.has_feature(EcFeatureCode.EC_FEATURE_MOTION_SENSE), "no motion sensors")
+class TestMotionSense(unittest.TestCase):
+    def test_info(self):
+        count = ec_motion_sense.motion_sense_sensor_count(ec)
+        for sensor in range(count):
+            resp = ec_motion_sense.motion_sense_info(ec, sensor)
+            print(type(self).__name__, "-", "Sensor:", sensor, "Resp:", resp)
+            self.assertIsInstance(resp["type"], (ec_motion_sense.MotionSensorType, int))
+
+    @unittest.skipUnless(ec.capabilities.has_feature(EcFeatureCode.EC_FEATURE_MOTION_SENSE_FIFO), "no FIFO")
+    def test_fifo(self):
+        fifo = ec_motion_sense.MotionSenseFifo(ec)
+        resp = fifo.flush()
+        print(type(self).__name__, "-", "Samples:", len(resp["sensor"]), "Lost:", fifo.lost)
+        self.assertEqual(len(resp["data"]), len(resp["sensor"]) * 3)
+        self.assertEqual(len(resp["timestamp"]), len(resp["sensor"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import sys
+from cros_ec_python import get_cros_ec, general
+from cros_ec_python.commands.features import EcFeatureCode
+from cros_ec_python.pool import EcPool
+
+ec = get_cros_ec()
+
+
+class TestCapabilities(unittest.TestCase):
+    def test_features(self):
+        resp = ec.capabilities.has_feature(EcFeatureCode.EC_FEATURE_PWM_FAN)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, bool)
+
+    def test_max_version(self):
+        resp = ec.capabilities.max_version(general.EC_CMD_GET_VERSION)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsNotNone(resp)
+        self.assertTrue(ec.capabilities.supports(general.EC_CMD_GET_VERSION, resp))
+
+    def test_payload_sizes(self):
+        resp = (ec.capabilities.max_request_size, ec.capabilities.max_response_size)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertGreater(resp[0], 0)
+        self.assertGreater(resp[1], 0)
+
+
+class TestEcPool(unittest.TestCase):
+    def test_map(self):
+        with EcPool({"ec": ec}) as pool:
+            resp = pool.map(general.get_version)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp["ec"], dict)
+
+    @unittest.skipUnless(sys.platform == "linux", "requires Linux")
+    def test_inventory(self):
+        with EcPool.open() as pool:
+            resp = pool.inventory()
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIn("cros_ec", resp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import struct
+import unittest
+from cros_ec_python import general as ec_general, system as ec_system
+from cros_ec_python.layers.retry import RetryingCrosEc
+from cros_ec_python.constants.COMMON import EcStatus
+from cros_ec_python.exceptions import ECError
+from fake_ec import FakeEc
+
+# These use a fake EC, so the EC never has to be busy.
+
+BUSY = EcStatus.EC_RES_BUSY.value
+IN_PROGRESS = EcStatus.EC_RES_IN_PROGRESS.value
+HELLO = struct.pack("<I", 42 + 0x01020304)
+PROCESSING = struct.pack("<I", ec_general.EC_COMMS_STATUS_PROCESSING)
+IDLE = struct.pack("<I", 0)
+
+
+class TestRetryBusy(unittest.TestCase):
+    def test_retry(self):
+        fake = FakeEc({ec_general.EC_CMD_HELLO: [BUSY, BUSY, HELLO]})
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        resp = ec_general.hello(rec, 42)
+        print(type(self).__name__, "-", "Stats:", rec.stats)
+        self.assertEqual(resp, 42 + 0x01020304)
+        self.assertEqual(fake.sent(ec_general.EC_CMD_HELLO), 3)
+        self.assertEqual(rec.stats["busy_retries"], 2)
+
+    def test_retries_exhausted(self):
+        fake = FakeEc({ec_general.EC_CMD_HELLO: [BUSY] * 3})
+        rec = RetryingCrosEc(fake, retries=2, initial_delay=0.001)
+        with self.assertRaises(ECError) as cm:
+            ec_general.hello(rec, 42)
+        self.assertEqual(cm.exception.status, BUSY)
+        self.assertEqual(fake.sent(ec_general.EC_CMD_HELLO), 3)
+
+    def test_other_error(self):
+        fake = FakeEc({ec_general.EC_CMD_HELLO: [EcStatus.EC_RES_INVALID_PARAM.value]})
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        with self.assertRaises(ECError):
+            ec_general.hello(rec, 42)
+        self.assertEqual(fake.sent(ec_general.EC_CMD_HELLO), 1)
+
+
+class TestRetryInProgress(unittest.TestCase):
+    def test_complete(self):
+        fake = FakeEc({
+            ec_general.EC_CMD_HELLO: [IN_PROGRESS],
+            ec_general.EC_CMD_GET_COMMS_STATUS: [PROCESSING, IDLE],
+            ec_system.EC_CMD_RESEND_RESPONSE: [HELLO],
+        })
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        resp = ec_general.hello(rec, 42)
+        print(type(self).__name__, "-", "Stats:", rec.stats)
+        self.assertEqual(resp, 42 + 0x01020304)
+        self.assertEqual(rec.stats["in_progress"], 1)
+        self.assertEqual(rec.stats["polls"], 2)
+        self.assertEqual(fake.sent(ec_general.EC_CMD_HELLO), 1)
+
+    def test_no_saved_response(self):
+        fake = FakeEc({
+            ec_general.EC_CMD_HELLO: [IN_PROGRESS],
+            ec_system.EC_CMD_RESEND_RESPONSE: [EcStatus.EC_RES_UNAVAILABLE.value],
+        })
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        self.assertEqual(rec.command(0, ec_general.EC_CMD_HELLO, 4, 4, bytes(4)), b"")
+
+    def test_failed(self):
+        fake = FakeEc({
+            ec_general.EC_CMD_HELLO: [IN_PROGRESS],
+            ec_system.EC_CMD_RESEND_RESPONSE: [EcStatus.EC_RES_ERROR.value],
+        })
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        with self.assertRaises(ECError) as cm:
+            ec_general.hello(rec, 42)
+        self.assertEqual(cm.exception.status, EcStatus.EC_RES_ERROR.value)
+
+    def test_deadline(self):
+        fake = FakeEc({
+            ec_general.EC_CMD_HELLO: [IN_PROGRESS],
+            ec_general.EC_CMD_GET_COMMS_STATUS: [PROCESSING] * 1000,
+        })
+        rec = RetryingCrosEc(fake, deadlines={ec_general.EC_CMD_HELLO: 0.05}, initial_delay=0.001, max_delay=0.01)
+        with self.assertRaises(TimeoutError):
+            ec_general.hello(rec, 42)
+        self.assertEqual(rec.stats["timeouts"], 1)
+        self.assertEqual(fake.sent(ec_system.EC_CMD_RESEND_RESPONSE), 0)
+
+    def test_waits_in_progress(self):
+        fake = FakeEc({ec_general.EC_CMD_HELLO: [IN_PROGRESS]})
+        fake.waits_in_progress = True
+        rec = RetryingCrosEc(fake, initial_delay=0.001)
+        with self.assertRaises(ECError) as cm:
+            ec_general.hello(rec, 42)
+        self.assertEqual(cm.exception.status, IN_PROGRESS)
+        self.assertEqual(fake.sent(ec_general.EC_CMD_GET_COMMS_STATUS), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from cros_ec_python import get_cros_ec, flash as ec_flash, system as ec_system
+
+ec = get_cros_ec()
+
+
+class TestVbootHash(unittest.TestCase):
+    def test_get(self):
+        resp = ec_system.vboot_hash(ec, ec_system.EcVbootHashCmd.EC_VBOOT_HASH_GET)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp["status"], ec_system.EcVbootHashStatus)
+
+    def test_verify_image(self):
+        region = ec_flash.flash_region_info(ec, ec_flash.EcFlashRegion.EC_FLASH_REGION_RO)
+        digest = ec_system.vboot_hash_region(ec, region["offset"], region["size"])
+        print(type(self).__name__, "-", "Digest:", digest.hex())
+        self.assertTrue(ec_system.verify_image(ec, digest, region["offset"], region["size"]))
+        self.assertFalse(ec_system.verify_image(ec, bytes(32), region["offset"], region["size"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
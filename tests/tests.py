@@ -5,7 +5,25 @@ from features import *
 # These have some user input, uncomment if you're human.
 # from pwm import *
 # from leds import *
+# from lighting import *
 from thermal import *
+from events import *
+from mkbp import *
+from batch import *
+from aio import *
+from layers import *
+from cache import *
+from retry import *
+from watch import *
+from fan_control import *
+from charge_policy import *
+from pool import *
+from flash import *
+from system import *
+from console import *
+from motion_sense import *
+from battery import *
+from usb import *
 
 
 if __name__ == '__main__':
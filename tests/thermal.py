@@ -11,6 +11,20 @@ class TestAutoFanControl(unittest.TestCase):
     def test_version1(self):
         ec_thermal.thermal_auto_fan_ctrl(ec, 0)
 
+class TestThermalConfig(unittest.TestCase):
+    def test_get(self):
+        resp = ec_thermal.thermal_get_config(ec, 0)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, dict)
+        self.assertEqual(len(resp["temp_host"]), ec_thermal.EcTempThresholds.EC_TEMP_THRESH_COUNT.value)
+
+    def test_snapshot(self):
+        snapshot = ec_thermal.thermal_get_configs(ec, refresh=True)
+        print(type(self).__name__, "-", "Snapshot:", snapshot)
+        self.assertIsInstance(snapshot, dict)
+        # Nothing has changed, so nothing should be sent
+        self.assertEqual(ec_thermal.thermal_apply_configs(ec, snapshot), [])
+
 class TestTempSensorInfo(unittest.TestCase):
     def test(self):
         resp = ec_thermal.temp_sensor_get_info(ec, 0)
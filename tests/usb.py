@@ -0,0 +1,33 @@
+import unittest
+from cros_ec_python import get_cros_ec, usb as ec_usb
+
+ec = get_cros_ec()
+
+
+class TestUsbPd(unittest.TestCase):
+    def test_ports(self):
+        resp = ec_usb.usb_pd_ports(ec)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp, int)
+
+    def test_power_info(self):
+        resp = ec_usb.usb_pd_power_info(ec, 0)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIsInstance(resp["role"], ec_usb.UsbPowerRole)
+
+    def test_control(self):
+        resp = ec_usb.usb_pd_control(ec, 0)
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertIn("enabled", resp)
+
+    def test_monitor(self):
+        monitor = ec_usb.UsbPdMonitor(ec)
+        resp = monitor.poll()
+        print(type(self).__name__, "-", "Resp:", resp)
+        self.assertEqual(len(resp), monitor.port_count)
+        # Only ports that changed are reported after the first poll
+        self.assertLessEqual(len(monitor.poll()), monitor.port_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
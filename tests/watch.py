@@ -0,0 +1,30 @@
+import unittest
+from cros_ec_python import get_cros_ec
+from cros_ec_python.watch import EcWatch
+
+ec = get_cros_ec()
+
+
+class TestEcWatch(unittest.TestCase):
+    def test_shared(self):
+        watch = EcWatch.shared(ec)
+        self.assertIs(watch, EcWatch.shared(ec))
+
+    def test_poll(self):
+        watch = EcWatch(ec)
+        changes = []
+        watch.on("lid_open", lambda *args: changes.append(args))
+        watch.on("temp[0]", lambda *args: changes.append(args), threshold=200)
+        watch.poll()
+        watch.poll()
+        print(type(self).__name__, "-", "Changes:", changes)
+        self.assertEqual(changes, [])
+
+    def test_invalid_field(self):
+        watch = EcWatch(ec)
+        with self.assertRaises(ValueError):
+            watch.on("not_a_field", print)
+
+
+if __name__ == '__main__':
+    unittest.main()